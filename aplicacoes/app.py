@@ -11,13 +11,12 @@ que prevê probabilidades de aprovação dos processos no CARF.
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
-import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import LabelEncoder
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.featurizador import obter_featurizador
+from lexcarf.gerenciador import gerenciador_pacote
 
 # Configuração da página
 st.set_page_config(
@@ -54,16 +53,13 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
 def load_model_and_preprocessors():
     """Carrega o modelo e os pré-processadores salvos"""
     try:
-        # Carregar modelo
-        model = joblib.load('modelo_carf_rf.pkl')
-        
-        # Carregar pré-processadores
-        with open('preprocessors.pkl', 'rb') as f:
-            preprocessors = pickle.load(f)
+        # Instância única do processo, recarregada quando os arquivos mudam; lê o pacote
+        # modelos/modelo_carf_rf.pacote ou, se ainda não existir, os arquivos antigos
+        gerenciador = gerenciador_pacote('rf', ['modelo_carf_rf.pkl', 'preprocessors.pkl'])
+        model, preprocessors = gerenciador.obter()
         
         return model, preprocessors
     except FileNotFoundError as e:
@@ -76,29 +72,9 @@ def prever_probabilidades_carf(texto_ementa, tributo, turma, model, preprocessor
     Função para prever probabilidades usando o modelo carregado
     """
     try:
-        # Extrair componentes
-        le_tributo = preprocessors['le_tributo']
-        le_turma = preprocessors['le_turma']
-        tfidf = preprocessors['tfidf']
-        tributos_frequentes = preprocessors['tributos_frequentes']
-        
-        # Preparar dados de entrada
-        texto_clean = str(texto_ementa)[:1000] if texto_ementa else ""
-        
-        # Codificar tributo
-        tributo_codificado = tributo if tributo in tributos_frequentes else 'OUTROS'
-        tributo_encoded = le_tributo.transform([tributo_codificado])[0]
-        
-        # Codificar turma
-        turma_simplificada = str(turma).split('ª')[0] + 'ª' if 'ª' in str(turma) else 'OUTROS'
-        turma_encoded = le_turma.transform([turma_simplificada])[0]
-        
-        # Criar embedding TF-IDF
-        texto_tfidf = tfidf.transform([texto_clean]).toarray()
-        
-        # Combinar features
-        X_input = np.hstack([[tributo_encoded, turma_encoded], texto_tfidf[0]])
-        X_input = X_input.reshape(1, -1)
+        # Montar features com o mesmo featurizador usado no treinamento
+        featurizador = obter_featurizador(preprocessors)
+        X_input = featurizador.transformar_linha(texto_ementa, tributo, turma)
         
         # Fazer predição
         probabilidades = model.predict_proba(X_input)[0]
@@ -206,7 +182,9 @@ def main():
                 # Exibir resultados
                 st.markdown("## 📊 Resultados da Predição")
                 
-                # Criar gráfico de barras
+                # Criar gráfico de barras (o plotly só é importado quando há resultado para exibir)
+                import plotly.express as px
+
                 fig = px.bar(
                     x=list(probabilidades.keys()),
                     y=list(probabilidades.values()),
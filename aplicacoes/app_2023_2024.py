@@ -8,9 +8,24 @@ Modelos treinados com dados de 2023 e testados com dados de 2024
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
-import joblib
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.latencia import REGISTRO, latencia_ativa
+from lexcarf.metricas import contador_predicoes, porta_metricas_ambiente, servir_metricas
+from lexcarf.gerenciador import gerenciador_modelos_2023
+from lexcarf.cache import CachePredicoes, TAMANHO_MAXIMO_PADRAO
+from lexcarf.cache_compartilhado import CacheCompartilhado, CAMINHO_PADRAO
+from lexcarf.antecipada import n_arvores
+from lexcarf.predicao import limiar_votacao_ambiente, prever_probabilidades_linha
+
+# Votação em cascata: com LEXCARF_LIMIAR_VOTACAO definido, o modelo de votação só é
+# avaliado quando a probabilidade de provimento atinge o limiar
+LIMIAR_VOTACAO = limiar_votacao_ambiente()
+
+# Predições pedidas na interface (inclusive as respondidas pelos caches), para lexcarf.metricas
+METRICA_PREDICOES = contador_predicoes('app')
 
 # Configuração da página
 st.set_page_config(
@@ -19,71 +34,86 @@ st.set_page_config(
     layout="wide"
 )
 
-@st.cache_data
 def load_models_and_preprocessors():
-    """Carrega os modelos e os pré-processadores salvos"""
+    """
+    Modelos e pré-processadores do gerenciador do processo (uma instância compartilhada, recarga a quente)
+    e a versão deles, usada na chave dos caches de predição
+    """
     try:
-        # Determinar o diretório base do projeto
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
-        # Carregar modelos
-        model_provimento = joblib.load(os.path.join(base_dir, 'modelos', 'modelo_carf_provimento_2023.pkl'))
-        model_votacao = joblib.load(os.path.join(base_dir, 'modelos', 'modelo_carf_votacao_2023.pkl'))
-        
-        # Carregar pré-processadores
-        with open(os.path.join(base_dir, 'modelos', 'preprocessors_2023.pkl'), 'rb') as f:
-            preprocessors = pickle.load(f)
-        
-        return model_provimento, model_votacao, preprocessors
+        return gerenciador_modelos_2023().obter_com_versao()
     except Exception as e:
         st.error(f"Erro ao carregar modelos: {e}")
-        return None, None, None
+        return (None, None, None), None
+
+@st.cache_resource
+def obter_cache_predicoes():
+    """Cache LRU de predições compartilhado entre sessões e reruns"""
+    return CachePredicoes(tamanho_maximo=int(os.environ.get('LEXCARF_CACHE_TAMANHO', TAMANHO_MAXIMO_PADRAO)))
 
-def prever_probabilidades_2023_2024(texto_ementa, tributo, turma, model_provimento, model_votacao, preprocessors):
-    """Função para prever probabilidades usando ambos os modelos"""
+@st.cache_resource
+def obter_cache_compartilhado():
+    """Cache SQLite compartilhado entre processos, ativado por LEXCARF_CACHE_COMPARTILHADO (1 ou caminho)"""
+    caminho = os.environ.get('LEXCARF_CACHE_COMPARTILHADO')
+    if not caminho:
+        return None
+    return CacheCompartilhado(caminho=CAMINHO_PADRAO if caminho == '1' else caminho)
+
+@st.cache_resource
+def iniciar_servidor_metricas():
+    """Servidor de métricas Prometheus (GET /metrics) do processo, ativado por LEXCARF_METRICAS_PORTA"""
+    porta = porta_metricas_ambiente()
+    if porta is None:
+        return None
     try:
-        # Extrair componentes
-        le_tributo = preprocessors['le_tributo']
-        le_turma = preprocessors['le_turma']
-        tfidf = preprocessors['tfidf']
-        tributos_frequentes = preprocessors['tributos_frequentes']
-        
-        # Preparar dados de entrada
-        texto_clean = str(texto_ementa)[:1000] if texto_ementa else ""
-        
-        # Codificar tributo
-        tributo_codificado = tributo if tributo in tributos_frequentes else 'OUTROS'
-        tributo_encoded = le_tributo.transform([tributo_codificado])[0]
-        
-        # Codificar turma
-        turma_simplificada = str(turma).split('ª')[0] + 'ª' if 'ª' in str(turma) else 'OUTROS'
-        turma_encoded = le_turma.transform([turma_simplificada])[0]
-        
-        # Criar embedding TF-IDF
-        texto_tfidf = tfidf.transform([texto_clean]).toarray()
-        
-        # Combinar features
-        X_input = np.hstack([[tributo_encoded, turma_encoded], texto_tfidf[0]])
-        X_input = X_input.reshape(1, -1)
-        
-        # Fazer predições
-        prob_provimento = model_provimento.predict_proba(X_input)[0]
-        prob_votacao = model_votacao.predict_proba(X_input)[0]
-        
-        # Criar resultados
-        resultado_provimento = {}
-        for i, classe in enumerate(model_provimento.classes_):
-            resultado_provimento[classe] = prob_provimento[i]
-        
-        resultado_votacao = {}
-        for i, classe in enumerate(model_votacao.classes_):
-            resultado_votacao[classe] = prob_votacao[i]
-        
+        return servir_metricas(porta)
+    except OSError as e:
+        print(f"Servidor de métricas não iniciado na porta {porta}: {e}")
+        return None
+
+def prever_probabilidades_2023_2024(texto_ementa, tributo, turma, model_provimento, model_votacao, preprocessors,
+                                    limiar_votacao=None, antecipada=None, arvores=None):
+    """
+    Função para prever probabilidades usando ambos os modelos
+
+    Usa lexcarf.predicao.prever_probabilidades_linha (cascata e predição antecipada);
+    retorna (provimento, votacao, erro), com votacao vazio quando não avaliada.
+    """
+    try:
+        resultado_provimento, resultado_votacao = prever_probabilidades_linha(
+            texto_ementa, tributo, turma, model_provimento, model_votacao, preprocessors,
+            limiar_votacao=limiar_votacao, antecipada=antecipada, arvores=arvores
+        )
         return resultado_provimento, resultado_votacao, None
-        
     except Exception as e:
         return None, None, str(e)
 
+def texto_votacao_nao_avaliada(limiar_votacao):
+    """Mensagem para votação vazia (cascata), sem supor que o limiar esteja definido"""
+    if limiar_votacao is None:
+        return "não avaliada"
+    return f"não avaliada (provimento abaixo do limiar de {limiar_votacao:.0%})"
+
+def exibir_latencias(painel):
+    """Percentis de latência por etapa do processo (janela deslizante) e exportação em JSON"""
+    painel.markdown("## ⏱️ Latência por Etapa")
+    percentis = REGISTRO.percentis()
+    if not percentis:
+        painel.caption("Nenhuma predição medida ainda.")
+        return
+    
+    painel.dataframe(
+        pd.DataFrame(percentis).T[['n', 'p50_ms', 'p95_ms', 'p99_ms']].round(3),
+        use_container_width=True
+    )
+    painel.caption(f"Últimas {REGISTRO.janela} medições por etapa, em ms")
+    painel.download_button("Exportar latências (JSON)", REGISTRO.exportar(), file_name='latencias_lexcarf.json',
+                           mime='application/json')
+    
+    # LEXCARF_LATENCIA_ARQUIVO: grava o mesmo JSON a cada execução, para coleta externa
+    arquivo = os.environ.get('LEXCARF_LATENCIA_ARQUIVO')
+    if arquivo:
+        REGISTRO.exportar(arquivo)
+
 def main():
     """Função principal da aplicação"""
     
@@ -92,9 +122,12 @@ def main():
     st.markdown("### O sistema de apoio a decisão do CARF")
     st.markdown("**Modelos treinados com dados de 2023 e testados com dados de 2024**")
     
+    # Métricas Prometheus (LEXCARF_METRICAS_PORTA): uma porta por processo, ao lado da interface
+    iniciar_servidor_metricas()
+    
     # Carregar modelos
     with st.spinner("Carregando modelos..."):
-        model_provimento, model_votacao, preprocessors = load_models_and_preprocessors()
+        (model_provimento, model_votacao, preprocessors), versao_modelos = load_models_and_preprocessors()
     
     if model_provimento is None or model_votacao is None or preprocessors is None:
         st.error("Não foi possível carregar os modelos. Verifique se os arquivos existem.")
@@ -147,6 +180,36 @@ def main():
     - **Empate**: Empate (Lei 13.988/2020)
     """)
     
+    estatisticas_cache = obter_cache_predicoes().estatisticas()
+    st.sidebar.markdown("## ⚡ Cache de Predições")
+    st.sidebar.caption(
+        f"Acertos: {estatisticas_cache['acertos']} | Falhas: {estatisticas_cache['falhas']} | "
+        f"Taxa: {estatisticas_cache['taxa_acerto']:.0%} | "
+        f"Itens: {estatisticas_cache['itens']}/{estatisticas_cache['tamanho_maximo']}"
+    )
+    
+    estatisticas_modelos = gerenciador_modelos_2023().estatisticas()
+    st.sidebar.markdown("## 🔄 Modelos em Memória")
+    st.sidebar.caption(
+        f"Versão: {estatisticas_modelos['versao']} | Cargas: {estatisticas_modelos['carregamentos']} | "
+        f"Última carga: {estatisticas_modelos['tempo_ultima_carga']:.2f}s | "
+        f"RSS: {estatisticas_modelos['rss_mb'] or 0:.0f} MB"
+    )
+    if estatisticas_modelos['ultimo_erro']:
+        st.sidebar.warning(f"Última recarga falhou, mantendo a versão anterior: {estatisticas_modelos['ultimo_erro']}")
+    if LIMIAR_VOTACAO is not None:
+        st.sidebar.caption(f"Votação em cascata: avaliada só com P(Provido Total) ≥ {LIMIAR_VOTACAO:.0%}")
+    
+    # Predição antecipada: menos árvores quando a classe líder já está estável (resposta aproximada)
+    st.sidebar.markdown("## ⏱️ Predição Antecipada")
+    antecipada = None
+    if st.sidebar.checkbox("Parar as árvores quando a resposta estabilizar", value=False):
+        orcamento_ms = st.sidebar.number_input("Orçamento de latência (ms, 0 = sem limite)", min_value=0, value=0, step=5)
+        antecipada = {'orcamento_ms': orcamento_ms or None}
+    
+    # Latência por etapa (LEXCARF_LATENCIA=1): preenchida depois da predição, para incluir a última medição
+    painel_latencia = st.sidebar.container() if latencia_ativa() else None
+    
     # Formulário principal
     st.markdown("## 📝 Dados do Processo")
     
@@ -203,14 +266,27 @@ def main():
     if st.button("🔮 Prever Probabilidades", type="primary"):
         if texto_ementa.strip():
             with st.spinner("Processando predição..."):
-                prob_provimento, prob_votacao, erro = prever_probabilidades_2023_2024(
+                # Cache em memória na frente do cache compartilhado (se ativado) e dos modelos, com a
+                # versão dos modelos em mãos na chave; respostas antecipadas são aproximadas e não passam pelos caches
+                prever = prever_probabilidades_2023_2024
+                arvores = {}
+                if antecipada is None:
+                    cache_compartilhado = obter_cache_compartilhado()
+                    if cache_compartilhado is not None:
+                        prever = cache_compartilhado.com_cache(prever, versao_modelos)
+                    prever = obter_cache_predicoes().com_cache(prever, versao_modelos)
+                prob_provimento, prob_votacao, erro = prever(
                     texto_ementa, 
                     tributo_selecionado, 
                     turma_selecionada,
                     model_provimento,
                     model_votacao,
-                    preprocessors
+                    preprocessors,
+                    limiar_votacao=LIMIAR_VOTACAO,
+                    antecipada=antecipada,
+                    arvores=arvores
                 )
+                METRICA_PREDICOES.inc()
             
             if erro:
                 st.error(f"Erro na predição: {erro}")
@@ -254,46 +330,54 @@ def main():
                     st.markdown("### 🗳️ Tipo de Votação")
                     
                     # Métricas de votação
-                    col_vot1, col_vot2, col_vot3, col_vot4 = st.columns(4)
+                    if prob_votacao:
+                        col_vot1, col_vot2, col_vot3, col_vot4 = st.columns(4)
                     
-                    with col_vot1:
-                        st.metric(
-                            "Unânime",
-                            f"{prob_votacao.get('Unânime', 0):.1%}",
-                            delta=None
-                        )
+                        with col_vot1:
+                            st.metric(
+                                "Unânime",
+                                f"{prob_votacao.get('Unânime', 0):.1%}",
+                                delta=None
+                            )
                     
-                    with col_vot2:
-                        st.metric(
-                            "Maioria", 
-                            f"{prob_votacao.get('Maioria', 0):.1%}",
-                            delta=None
-                        )
+                        with col_vot2:
+                            st.metric(
+                                "Maioria", 
+                                f"{prob_votacao.get('Maioria', 0):.1%}",
+                                delta=None
+                            )
                     
-                    with col_vot3:
-                        st.metric(
-                            "Qualidade",
-                            f"{prob_votacao.get('Qualidade', 0):.1%}",
-                            delta=None
-                        )
+                        with col_vot3:
+                            st.metric(
+                                "Qualidade",
+                                f"{prob_votacao.get('Qualidade', 0):.1%}",
+                                delta=None
+                            )
                     
-                    with col_vot4:
-                        st.metric(
-                            "Empate",
-                            f"{prob_votacao.get('Empate', 0):.1%}",
-                            delta=None
-                        )
+                        with col_vot4:
+                            st.metric(
+                                "Empate",
+                                f"{prob_votacao.get('Empate', 0):.1%}",
+                                delta=None
+                            )
                     
-                    # Predição principal de votação
-                    predicao_votacao = max(prob_votacao, key=prob_votacao.get)
-                    confianca_votacao = max(prob_votacao.values())
+                        # Predição principal de votação
+                        predicao_votacao = max(prob_votacao, key=prob_votacao.get)
+                        confianca_votacao = max(prob_votacao.values())
                     
-                    st.info(f"🗳️ **Votação:** {predicao_votacao} ({confianca_votacao:.1%})")
+                        st.info(f"🗳️ **Votação:** {predicao_votacao} ({confianca_votacao:.1%})")
+                    else:
+                        st.info(f"🗳️ **Votação:** {texto_votacao_nao_avaliada(LIMIAR_VOTACAO)}")
+                
+                if antecipada is not None:
+                    texto_votacao = f"{arvores['votacao']}/{n_arvores(model_votacao)}" if arvores['votacao'] else "não avaliada"
+                    st.caption(f"⏱️ Predição antecipada - árvores avaliadas: provimento "
+                               f"{arvores['provimento']}/{n_arvores(model_provimento)}, votação {texto_votacao}")
                 
                 # Resumo combinado
                 st.markdown("## 🎯 Resumo Combinado")
                 
-                if predicao_provimento == 'Provido Total':
+                if predicao_provimento == 'Provido Total' and prob_votacao:
                     st.success(f"""
                     **Resultado Esperado:** {predicao_provimento} por {predicao_votacao}
                     
@@ -301,6 +385,13 @@ def main():
                     - Tipo de Votação: {confianca_votacao:.1%}
                     - Confiança Combinada: {(confianca_provimento + confianca_votacao) / 2:.1%}
                     """)
+                elif predicao_provimento == 'Provido Total':
+                    st.success(f"""
+                    **Resultado Esperado:** {predicao_provimento}
+                    
+                    - Probabilidade de Provimento: {confianca_provimento:.1%}
+                    - Tipo de Votação: {texto_votacao_nao_avaliada(LIMIAR_VOTACAO)}
+                    """)
                 else:
                     st.error(f"""
                     **Resultado Esperado:** {predicao_provimento}
@@ -319,6 +410,9 @@ def main():
         else:
             st.warning("Por favor, digite o texto da ementa para fazer a predição.")
     
+    if painel_latencia is not None:
+        exibir_latencias(painel_latencia)
+    
     # Seção de exemplos
     st.markdown("---")
     st.markdown("## 💡 Exemplos de Uso")
@@ -7,8 +7,12 @@ Aplicação Web CARF ML Predictor - Versão Simplificada
 import streamlit as st
 import pandas as pd
 import numpy as np
-import pickle
-import joblib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.featurizador import obter_featurizador
+from lexcarf.gerenciador import gerenciador_pacote
 
 # Configuração da página
 st.set_page_config(
@@ -17,16 +21,13 @@ st.set_page_config(
     layout="wide"
 )
 
-@st.cache_data
 def load_model_and_preprocessors():
     """Carrega o modelo e os pré-processadores salvos"""
     try:
-        # Carregar modelo
-        model = joblib.load('modelo_carf_rf.pkl')
-        
-        # Carregar pré-processadores
-        with open('preprocessors.pkl', 'rb') as f:
-            preprocessors = pickle.load(f)
+        # Instância única do processo, recarregada quando os arquivos mudam; lê o pacote
+        # modelos/modelo_carf_rf.pacote ou, se ainda não existir, os arquivos antigos
+        gerenciador = gerenciador_pacote('rf', ['modelo_carf_rf.pkl', 'preprocessors.pkl'])
+        model, preprocessors = gerenciador.obter()
         
         return model, preprocessors
     except Exception as e:
@@ -36,29 +37,9 @@ def load_model_and_preprocessors():
 def prever_probabilidades_carf(texto_ementa, tributo, turma, model, preprocessors):
     """Função para prever probabilidades usando o modelo carregado"""
     try:
-        # Extrair componentes
-        le_tributo = preprocessors['le_tributo']
-        le_turma = preprocessors['le_turma']
-        tfidf = preprocessors['tfidf']
-        tributos_frequentes = preprocessors['tributos_frequentes']
-        
-        # Preparar dados de entrada
-        texto_clean = str(texto_ementa)[:1000] if texto_ementa else ""
-        
-        # Codificar tributo
-        tributo_codificado = tributo if tributo in tributos_frequentes else 'OUTROS'
-        tributo_encoded = le_tributo.transform([tributo_codificado])[0]
-        
-        # Codificar turma
-        turma_simplificada = str(turma).split('ª')[0] + 'ª' if 'ª' in str(turma) else 'OUTROS'
-        turma_encoded = le_turma.transform([turma_simplificada])[0]
-        
-        # Criar embedding TF-IDF
-        texto_tfidf = tfidf.transform([texto_clean]).toarray()
-        
-        # Combinar features
-        X_input = np.hstack([[tributo_encoded, turma_encoded], texto_tfidf[0]])
-        X_input = X_input.reshape(1, -1)
+        # Montar features com o mesmo featurizador usado no treinamento
+        featurizador = obter_featurizador(preprocessors)
+        X_input = featurizador.transformar_linha(texto_ementa, tributo, turma)
         
         # Fazer predição
         probabilidades = model.predict_proba(X_input)[0]
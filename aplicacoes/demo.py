@@ -10,17 +10,21 @@ probabilidades de aprovação dos processos no CARF.
 
 import pandas as pd
 import numpy as np
-import pickle
-import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import LabelEncoder
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.featurizador import obter_featurizador
+from lexcarf.modelos import caminho_pacote
+from lexcarf.pacote import carregar_modelos_pacote
 
 def carregar_modelo():
     """Carrega o modelo e os pré-processadores"""
     try:
-        model = joblib.load('modelo_carf_rf.pkl')
-        with open('preprocessors.pkl', 'rb') as f:
-            preprocessors = pickle.load(f)
+        # Pacote único em modelos/ ou, se ainda não existir, os arquivos antigos
+        model, preprocessors = carregar_modelos_pacote(
+            caminho_pacote('rf'), ['modelo_carf_rf.pkl', 'preprocessors.pkl']
+        )
         return model, preprocessors
     except Exception as e:
         print(f"Erro ao carregar modelo: {e}")
@@ -29,29 +33,9 @@ def carregar_modelo():
 def prever_probabilidades(texto_ementa, tributo, turma, model, preprocessors):
     """Faz predição das probabilidades"""
     try:
-        # Extrair componentes
-        le_tributo = preprocessors['le_tributo']
-        le_turma = preprocessors['le_turma']
-        tfidf = preprocessors['tfidf']
-        tributos_frequentes = preprocessors['tributos_frequentes']
-        
-        # Preparar dados de entrada
-        texto_clean = str(texto_ementa)[:1000] if texto_ementa else ""
-        
-        # Codificar tributo
-        tributo_codificado = tributo if tributo in tributos_frequentes else 'OUTROS'
-        tributo_encoded = le_tributo.transform([tributo_codificado])[0]
-        
-        # Codificar turma
-        turma_simplificada = str(turma).split('ª')[0] + 'ª' if 'ª' in str(turma) else 'OUTROS'
-        turma_encoded = le_turma.transform([turma_simplificada])[0]
-        
-        # Criar embedding TF-IDF
-        texto_tfidf = tfidf.transform([texto_clean]).toarray()
-        
-        # Combinar features
-        X_input = np.hstack([[tributo_encoded, turma_encoded], texto_tfidf[0]])
-        X_input = X_input.reshape(1, -1)
+        # Montar features com o mesmo featurizador usado no treinamento
+        featurizador = obter_featurizador(preprocessors)
+        X_input = featurizador.transformar_linha(texto_ementa, tributo, turma)
         
         # Fazer predição
         probabilidades = model.predict_proba(X_input)[0]
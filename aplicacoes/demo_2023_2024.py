@@ -7,71 +7,37 @@ Modelos treinados com dados de 2023 e testados com dados de 2024
 
 import pandas as pd
 import numpy as np
-import pickle
-import joblib
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import LabelEncoder
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.modelos import carregar_modelos_2023, compilar_ambiente
+from lexcarf.predicao import limiar_votacao_ambiente, prever_probabilidades_linha
 
 def carregar_modelos():
     """Carrega os modelos e os pré-processadores"""
     try:
-        # Determinar o diretório base do projeto
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
-        model_provimento = joblib.load(os.path.join(base_dir, 'modelos', 'modelo_carf_provimento_2023.pkl'))
-        model_votacao = joblib.load(os.path.join(base_dir, 'modelos', 'modelo_carf_votacao_2023.pkl'))
-        
-        with open(os.path.join(base_dir, 'modelos', 'preprocessors_2023.pkl'), 'rb') as f:
-            preprocessors = pickle.load(f)
-        
-        return model_provimento, model_votacao, preprocessors
+        # Pacote modelos/modelo_carf_2023.pacote ou, se não existir, os pickles em modelos/
+        # (LEXCARF_FLORESTA_COMPILADA=1 compila as florestas dos pickles; =0 usa os pickles mesmo com o pacote)
+        return carregar_modelos_2023(compilar=compilar_ambiente())
     except Exception as e:
         print(f"Erro ao carregar modelos: {e}")
         return None, None, None
 
-def prever_probabilidades_2023_2024(texto_ementa, tributo, turma, model_provimento, model_votacao, preprocessors):
-    """Faz predição das probabilidades usando ambos os modelos"""
+def prever_probabilidades_2023_2024(texto_ementa, tributo, turma, model_provimento, model_votacao, preprocessors,
+                                    limiar_votacao=None, antecipada=None, arvores=None):
+    """
+    Faz predição das probabilidades usando ambos os modelos
+
+    Usa lexcarf.predicao.prever_probabilidades_linha (cascata e predição antecipada);
+    retorna (provimento, votacao, erro), com votacao vazio quando não avaliada.
+    """
     try:
-        # Extrair componentes
-        le_tributo = preprocessors['le_tributo']
-        le_turma = preprocessors['le_turma']
-        tfidf = preprocessors['tfidf']
-        tributos_frequentes = preprocessors['tributos_frequentes']
-        
-        # Preparar dados de entrada
-        texto_clean = str(texto_ementa)[:1000] if texto_ementa else ""
-        
-        # Codificar tributo
-        tributo_codificado = tributo if tributo in tributos_frequentes else 'OUTROS'
-        tributo_encoded = le_tributo.transform([tributo_codificado])[0]
-        
-        # Codificar turma
-        turma_simplificada = str(turma).split('ª')[0] + 'ª' if 'ª' in str(turma) else 'OUTROS'
-        turma_encoded = le_turma.transform([turma_simplificada])[0]
-        
-        # Criar embedding TF-IDF
-        texto_tfidf = tfidf.transform([texto_clean]).toarray()
-        
-        # Combinar features
-        X_input = np.hstack([[tributo_encoded, turma_encoded], texto_tfidf[0]])
-        X_input = X_input.reshape(1, -1)
-        
-        # Fazer predições
-        prob_provimento = model_provimento.predict_proba(X_input)[0]
-        prob_votacao = model_votacao.predict_proba(X_input)[0]
-        
-        # Criar resultados
-        resultado_provimento = {}
-        for i, classe in enumerate(model_provimento.classes_):
-            resultado_provimento[classe] = prob_provimento[i]
-        
-        resultado_votacao = {}
-        for i, classe in enumerate(model_votacao.classes_):
-            resultado_votacao[classe] = prob_votacao[i]
-        
+        resultado_provimento, resultado_votacao = prever_probabilidades_linha(
+            texto_ementa, tributo, turma, model_provimento, model_votacao, preprocessors,
+            limiar_votacao=limiar_votacao, antecipada=antecipada, arvores=arvores
+        )
         return resultado_provimento, resultado_votacao, None
-        
     except Exception as e:
         return None, None, str(e)
 
@@ -161,7 +127,8 @@ def main():
             exemplo['turma'],
             model_provimento,
             model_votacao,
-            preprocessors
+            preprocessors,
+            limiar_votacao=limiar_votacao_ambiente()
         )
         
         if erro:
@@ -172,6 +139,8 @@ def main():
                 print(f"  {classe}: {prob:.1%}")
             
             print("\nPROBABILIDADES DE VOTACAO:")
+            if not prob_votacao:
+                print("  Nao avaliada (provimento abaixo do limiar LEXCARF_LIMIAR_VOTACAO)")
             for classe, prob in prob_votacao.items():
                 print(f"  {classe}: {prob:.1%}")
             
@@ -179,15 +148,15 @@ def main():
             predicao_provimento = max(prob_provimento, key=prob_provimento.get)
             confianca_provimento = max(prob_provimento.values())
             
-            predicao_votacao = max(prob_votacao, key=prob_votacao.get)
-            confianca_votacao = max(prob_votacao.values())
-            
             print(f"\nPREDICAO PRINCIPAL:")
             print(f"  Provimento: {predicao_provimento} ({confianca_provimento:.1%})")
-            print(f"  Votacao: {predicao_votacao} ({confianca_votacao:.1%})")
+            if prob_votacao:
+                predicao_votacao = max(prob_votacao, key=prob_votacao.get)
+                confianca_votacao = max(prob_votacao.values())
+                print(f"  Votacao: {predicao_votacao} ({confianca_votacao:.1%})")
             
             # Resumo combinado
-            if predicao_provimento == 'Provido Total':
+            if predicao_provimento == 'Provido Total' and prob_votacao:
                 print(f"\nRESULTADO ESPERADO: {predicao_provimento} por {predicao_votacao}")
                 print(f"Confianca combinada: {(confianca_provimento + confianca_votacao) / 2:.1%}")
             else:
@@ -7,19 +7,22 @@ Inclui probabilidade de provimento e tipo de votação
 
 import pandas as pd
 import numpy as np
-import pickle
-import joblib
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.preprocessing import LabelEncoder
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.featurizador import obter_featurizador
+from lexcarf.modelos import caminho_pacote
+from lexcarf.pacote import carregar_modelos_pacote
 
 def carregar_modelos():
     """Carrega os modelos e os pré-processadores"""
     try:
-        model_provimento = joblib.load('modelo_carf_provimento.pkl')
-        model_votacao = joblib.load('modelo_carf_votacao.pkl')
-        
-        with open('preprocessors_expandido.pkl', 'rb') as f:
-            preprocessors = pickle.load(f)
+        # Pacote único em modelos/ ou, se ainda não existir, os arquivos antigos
+        model_provimento, model_votacao, preprocessors = carregar_modelos_pacote(
+            caminho_pacote('expandido'),
+            ['modelo_carf_provimento.pkl', 'modelo_carf_votacao.pkl', 'preprocessors_expandido.pkl']
+        )
         
         return model_provimento, model_votacao, preprocessors
     except Exception as e:
@@ -29,29 +32,9 @@ def carregar_modelos():
 def prever_probabilidades_expandido(texto_ementa, tributo, turma, model_provimento, model_votacao, preprocessors):
     """Faz predição das probabilidades usando ambos os modelos"""
     try:
-        # Extrair componentes
-        le_tributo = preprocessors['le_tributo']
-        le_turma = preprocessors['le_turma']
-        tfidf = preprocessors['tfidf']
-        tributos_frequentes = preprocessors['tributos_frequentes']
-        
-        # Preparar dados de entrada
-        texto_clean = str(texto_ementa)[:1000] if texto_ementa else ""
-        
-        # Codificar tributo
-        tributo_codificado = tributo if tributo in tributos_frequentes else 'OUTROS'
-        tributo_encoded = le_tributo.transform([tributo_codificado])[0]
-        
-        # Codificar turma
-        turma_simplificada = str(turma).split('ª')[0] + 'ª' if 'ª' in str(turma) else 'OUTROS'
-        turma_encoded = le_turma.transform([turma_simplificada])[0]
-        
-        # Criar embedding TF-IDF
-        texto_tfidf = tfidf.transform([texto_clean]).toarray()
-        
-        # Combinar features
-        X_input = np.hstack([[tributo_encoded, turma_encoded], texto_tfidf[0]])
-        X_input = X_input.reshape(1, -1)
+        # Montar features com o mesmo featurizador usado no treinamento
+        featurizador = obter_featurizador(preprocessors)
+        X_input = featurizador.transformar_linha(texto_ementa, tributo, turma)
         
         # Fazer predições
         prob_provimento = model_provimento.predict_proba(X_input)[0]
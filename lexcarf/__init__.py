@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+"""
+LexCARF - Núcleo compartilhado de predição
+Funções reutilizadas pelas aplicações, demonstrações e scripts
+"""
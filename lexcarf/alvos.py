@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Construção dos alvos de treinamento (categoria de provimento e tipo de votação)
+Versões vetorizadas, compartilhadas pelos scripts de treinamento e análise: as
+regras de texto são avaliadas uma vez por valor distinto (pd.factorize + .str
+e np.select) e espalhadas para as linhas, em vez de um apply por linha. As
+funções *_linha são as regras originais, mantidas como referência de paridade
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORIAS_PROVIMENTO = ('Provido Total', 'Provido Parcial', 'Negado', 'Nao Conhecido', 'Outros')
+
+# Valor da coluna votacao -> alvo do modelo de votação
+VOTACOES = {
+    'Unânime': 'Unânime',
+    'Maioria': 'Maioria',
+    'Qualidade': 'Qualidade',
+    'Empate - Lei 13.988/2020': 'Empate',
+}
+
+# Sem a classe Empate (train_model.py e train_model_expandido.py)
+VOTACOES_SEM_EMPATE = {valor: alvo for valor, alvo in VOTACOES.items() if alvo != 'Empate'}
+
+
+def categorizar_provimento_linha(resultado):
+    """Categoriza o resultado do julgamento (um valor)"""
+    if pd.isna(resultado):
+        return None
+
+    resultado_str = str(resultado).lower()
+
+    if 'provido' in resultado_str and 'parcial' not in resultado_str and 'negado' not in resultado_str:
+        return 'Provido Total'
+    elif 'provido' in resultado_str and 'parcial' in resultado_str:
+        return 'Provido Parcial'
+    elif 'negado' in resultado_str:
+        return 'Negado'
+    elif 'nao conhecido' in resultado_str or 'não conhecido' in resultado_str:
+        return 'Nao Conhecido'
+    else:
+        return 'Outros'
+
+
+def criar_target_votacao_linha(votacao, resultado, votacoes=VOTACOES):
+    """Cria target para tipo de votação (um par de valores)"""
+    if pd.isna(votacao) or pd.isna(resultado):
+        return None
+
+    votacao_str = str(votacao).strip()
+    resultado_str = str(resultado).lower()
+
+    # Só considerar casos onde houve provimento
+    if 'provido' in resultado_str and 'negado' not in resultado_str:
+        return votacoes.get(votacao_str)
+
+    return None
+
+
+def _fatorar(valores):
+    """(códigos por linha, valores distintos em minúsculas); códigos -1 para valores ausentes"""
+    codigos, unicos = pd.factorize(pd.Series(valores), use_na_sentinel=True)
+    return codigos, pd.Series(unicos, dtype=object).astype(str).str.lower()
+
+
+def _espalhar(codigos, valores_unicos):
+    """Valor de cada linha a partir do valor do seu código; None para os ausentes (-1)"""
+    valores = np.append(np.asarray(valores_unicos, dtype=object), None)
+    return valores[codigos]
+
+
+def categorizar_provimento(resultados):
+    """Categoria de provimento de cada resultado de julgamento (Series com o mesmo índice, None se ausente)"""
+    codigos, resultado = _fatorar(resultados)
+    provido = resultado.str.contains('provido', regex=False).values
+    parcial = resultado.str.contains('parcial', regex=False).values
+    negado = resultado.str.contains('negado', regex=False).values
+    nao_conhecido = (resultado.str.contains('nao conhecido', regex=False)
+                     | resultado.str.contains('não conhecido', regex=False)).values
+
+    categorias = np.select(
+        [provido & ~parcial & ~negado, provido & parcial, negado, nao_conhecido],
+        list(CATEGORIAS_PROVIMENTO[:4]),
+        default=CATEGORIAS_PROVIMENTO[4]
+    ).astype(object)
+    return pd.Series(_espalhar(codigos, categorias), index=getattr(resultados, 'index', None), dtype=object)
+
+
+def criar_target_votacao(votacoes, resultados, mapa_votacoes=VOTACOES):
+    """
+    Tipo de votação de cada linha (Series com o índice de votacoes), só para resultados providos
+
+    None quando algum dos valores é ausente, quando o resultado não é de provimento
+    ou quando a votação não está em mapa_votacoes.
+    """
+    codigos_resultado, resultado = _fatorar(resultados)
+    provido = (resultado.str.contains('provido', regex=False)
+               & ~resultado.str.contains('negado', regex=False)).values
+    provido_linha = np.append(provido, False)[codigos_resultado]
+
+    codigos_votacao, unicos_votacao = pd.factorize(pd.Series(votacoes), use_na_sentinel=True)
+    alvos = pd.Series(unicos_votacao, dtype=object).astype(str).str.strip().map(mapa_votacoes)
+    alvos = alvos.astype(object).where(alvos.notna(), None)
+    alvo_linha = _espalhar(codigos_votacao, alvos)
+
+    alvo_linha[~provido_linha] = None
+    return pd.Series(alvo_linha, index=getattr(votacoes, 'index', None), dtype=object)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Predição antecipada (anytime) das florestas
+Avalia as árvores em grupos e, para cada linha, para assim que a margem da
+classe líder sobre a segunda é estatisticamente estável (limite inferior do
+intervalo de confiança da diferença média por árvore acima de zero) ou quando
+o orçamento de latência acaba. Retorna as probabilidades médias das árvores
+avaliadas e quantas árvores foram usadas em cada linha
+"""
+
+import time
+
+import numpy as np
+
+from lexcarf.floresta import TAMANHO_BLOCO
+
+# Árvores avaliadas por passo, mínimo antes do teste de parada e quantil normal do teste
+PASSO_PADRAO = 10
+MIN_ARVORES_PADRAO = 10
+Z_PADRAO = 2.0
+
+OPCOES_PADRAO = {'passo': PASSO_PADRAO, 'min_arvores': MIN_ARVORES_PADRAO, 'z': Z_PADRAO, 'orcamento_ms': None}
+
+
+def n_arvores(floresta):
+    """Número de árvores de uma FlorestaCompilada ou de um RandomForestClassifier"""
+    return floresta.n_arvores if hasattr(floresta, 'raizes') else len(floresta.estimators_)
+
+
+def opcoes_antecipada(antecipada):
+    """
+    Opções de prever_proba_antecipado a partir do parâmetro 'antecipada' das funções de predição
+
+    None/False: avaliação completa (retorna None); True: opções padrão; dict: sobrepõe
+    OPCOES_PADRAO. O orçamento (orcamento_ms) vira um prazo absoluto contado a partir
+    daqui, compartilhado pelos modelos de provimento e votação da mesma requisição;
+    por isso as funções de predição chamam esta função na entrada, antes da featurização.
+    """
+    if not antecipada:
+        return None
+    opcoes = dict(OPCOES_PADRAO, **(antecipada if isinstance(antecipada, dict) else {}))
+    desconhecidas = set(opcoes) - set(OPCOES_PADRAO)
+    if desconhecidas:
+        raise ValueError(f"Opções de predição antecipada desconhecidas: {sorted(desconhecidas)}")
+
+    orcamento_ms = opcoes.pop('orcamento_ms')
+    opcoes['prazo'] = None if orcamento_ms is None else time.perf_counter() + orcamento_ms / 1000
+    return opcoes
+
+
+def avaliar_floresta(floresta, X, opcoes=None):
+    """(probabilidades, árvores usadas por linha); opcoes None: predict_proba com todas as árvores"""
+    if opcoes is None:
+        return floresta.predict_proba(X), np.full(X.shape[0], n_arvores(floresta))
+    return prever_proba_antecipado(floresta, X, **opcoes)
+
+
+def _probs_arvores(floresta, X, inicio, fim):
+    """Probabilidades (n_linhas x árvores x classes) das árvores [inicio, fim) para um bloco denso float32"""
+    if hasattr(floresta, 'raizes'):
+        raizes = floresta.raizes[inicio:fim]
+        if X.shape[0] == 1:
+            return floresta.prob_nos[floresta._folhas_linha(X[0], raizes)][None]
+        return floresta.prob_nos[floresta._folhas_bloco(X, raizes)]
+    # X já é denso float32 contíguo: dispensa a validação que cada árvore do sklearn repetiria
+    return np.stack([arvore.predict_proba(X, check_input=False) for arvore in floresta.estimators_[inicio:fim]], axis=1)
+
+
+def margem_estavel(probs, z=Z_PADRAO):
+    """
+    Máscara das linhas cuja classe líder está estável
+
+    probs: (n_linhas x árvores x classes). A diferença por árvore entre a classe
+    líder e a segunda (pela média) tem média positiva com confiança z.
+    """
+    n_linhas, k, n_classes = probs.shape
+    if n_classes < 2:
+        return np.ones(n_linhas, dtype=bool)
+    if k < 2:
+        return np.zeros(n_linhas, dtype=bool)
+
+    linhas = np.arange(n_linhas)
+    ordem = np.argsort(probs.mean(axis=1), axis=1)
+    diferencas = probs[linhas, :, ordem[:, -1]] - probs[linhas, :, ordem[:, -2]]
+    erro_padrao = diferencas.std(axis=1, ddof=1) / np.sqrt(k)
+    return diferencas.mean(axis=1) - z * erro_padrao > 0
+
+
+def _prever_bloco(floresta, X, passo, min_arvores, z, prazo):
+    total = n_arvores(floresta)
+    probs = np.zeros((X.shape[0], total, len(floresta.classes_)))
+    usadas = np.zeros(X.shape[0], dtype=np.int64)
+    ativas = np.arange(X.shape[0])
+    inicio = 0
+
+    while ativas.size and inicio < total:
+        # O primeiro passo já cobre o mínimo de árvores do teste de parada
+        fim = min(total, max(inicio + passo, min_arvores))
+        probs[ativas, inicio:fim] = _probs_arvores(floresta, X[ativas], inicio, fim)
+        usadas[ativas] = fim
+        inicio = fim
+        if prazo is not None and time.perf_counter() >= prazo:
+            break
+        ativas = ativas[~margem_estavel(probs[ativas, :fim], z)]
+
+    return probs.sum(axis=1) / usadas[:, None], usadas
+
+
+def prever_proba_antecipado(floresta, X, passo=PASSO_PADRAO, min_arvores=MIN_ARVORES_PADRAO, z=Z_PADRAO, prazo=None):
+    """
+    Probabilidades com parada antecipada por linha
+
+    floresta: FlorestaCompilada ou RandomForestClassifier; X: CSR ou denso.
+    prazo: instante (time.perf_counter) após o qual nenhum novo passo é iniciado
+    (ao menos um passo é sempre avaliado). Retorna (probabilidades, árvores usadas por linha).
+    """
+    if hasattr(X, 'tocsr'):
+        X = X.tocsr()
+        blocos = [
+            _prever_bloco(floresta, np.ascontiguousarray(X[inicio:inicio + TAMANHO_BLOCO].toarray(), dtype=np.float32),
+                          passo, min_arvores, z, prazo)
+            for inicio in range(0, X.shape[0], TAMANHO_BLOCO)
+        ]
+        return np.vstack([prob for prob, _ in blocos]), np.concatenate([usadas for _, usadas in blocos])
+
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    return _prever_bloco(floresta, X, passo, min_arvores, z, prazo)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Utilitários compartilhados pelos scripts de benchmark
+Carrega os modelos 2023 ou, se não existirem, treina modelos substitutos
+com os mesmos hiperparâmetros sobre o vocabulário TF-IDF real
+"""
+
+import os
+import pickle
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIR_MODELOS = os.path.join(BASE_DIR, 'modelos')
+CSV_EXEMPLO = os.path.join(BASE_DIR, 'dados', 'carf_julgamentos_2024_exemplo.csv')
+
+
+def carregar_preprocessors():
+    """Carrega os pré-processadores 2023"""
+    with open(os.path.join(DIR_MODELOS, 'preprocessors_2023.pkl'), 'rb') as f:
+        return pickle.load(f)
+
+
+def gerar_corpus_sintetico(preprocessors, n_linhas, seed=42):
+    """Gera ementas sintéticas a partir do vocabulário TF-IDF, com rótulos correlacionados ao texto"""
+    rng = np.random.default_rng(seed)
+    vocabulario = np.array(sorted(preprocessors['tfidf'].vocabulary_))
+    tributos = np.array(list(preprocessors['tributos_frequentes']) + ['OUTROS'])
+    turmas = np.array([f'{turma} TO-CARF-MF-DF' for turma in preprocessors['le_turma'].classes_])
+
+    textos = [
+        ' '.join(rng.choice(vocabulario, size=rng.integers(20, 60)))
+        for _ in range(n_linhas)
+    ]
+    df = pd.DataFrame({
+        'texto_ementa': textos,
+        'tributo': rng.choice(tributos, size=n_linhas),
+        'turma': rng.choice(turmas, size=n_linhas),
+    })
+
+    # Rótulos dependentes de alguns termos para gerar árvores não triviais
+    termos = rng.choice(vocabulario, size=30, replace=False)
+    pontuacao = sum(df['texto_ementa'].str.contains(termo, regex=False).astype(int) for termo in termos)
+    ruido = rng.normal(0, 1, n_linhas)
+    df['categoria_provimento'] = np.where(pontuacao + ruido > np.median(pontuacao), 'Provido Total', 'Negado')
+    df['target_votacao'] = rng.choice(
+        ['Unânime', 'Maioria', 'Qualidade', 'Empate'], size=n_linhas, p=[0.8, 0.12, 0.06, 0.02]
+    )
+    return df
+
+
+def treinar_modelos_substitutos(preprocessors, n_linhas=3000):
+    """Treina florestas com os hiperparâmetros de train_model_2023_2024.py sobre o corpus sintético"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    from lexcarf.predicao import preparar_features_lote
+
+    df = gerar_corpus_sintetico(preprocessors, n_linhas)
+    X = preparar_features_lote(df, preprocessors, esparso=False)
+
+    modelos = []
+    for coluna in ['categoria_provimento', 'target_votacao']:
+        modelo = RandomForestClassifier(
+            n_estimators=100,
+            max_depth=20,
+            min_samples_split=5,
+            min_samples_leaf=2,
+            random_state=42,
+            class_weight='balanced'
+        )
+        modelo.fit(X, df[coluna].values)
+        modelos.append(modelo)
+
+    return modelos[0], modelos[1]
+
+
+def carregar_modelos_benchmark():
+    """Retorna (model_provimento, model_votacao, preprocessors, origem)"""
+    preprocessors = carregar_preprocessors()
+    caminho_provimento = os.path.join(DIR_MODELOS, 'modelo_carf_provimento_2023.pkl')
+    caminho_votacao = os.path.join(DIR_MODELOS, 'modelo_carf_votacao_2023.pkl')
+
+    if os.path.exists(caminho_provimento) and os.path.exists(caminho_votacao):
+        return joblib.load(caminho_provimento), joblib.load(caminho_votacao), preprocessors, 'modelos 2023'
+
+    model_provimento, model_votacao = treinar_modelos_substitutos(preprocessors)
+    return model_provimento, model_votacao, preprocessors, 'modelos substitutos (sintéticos)'
+
+
+def preparar_dir_modelos(pasta):
+    """
+    Diretório com os arquivos de modelo 2023 para processos que carregam do disco;
+    se os modelos 2023 não existirem, os substitutos são gravados em pasta.
+    Retorna (diretorio, origem).
+    """
+    from lexcarf.featurizador import preprocessors_serializaveis
+    from lexcarf.modelos import ARQUIVOS_2023
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    if origem == 'modelos 2023':
+        return DIR_MODELOS, origem
+
+    joblib.dump(model_provimento, os.path.join(pasta, ARQUIVOS_2023['provimento']))
+    joblib.dump(model_votacao, os.path.join(pasta, ARQUIVOS_2023['votacao']))
+    with open(os.path.join(pasta, ARQUIVOS_2023['preprocessors']), 'wb') as f:
+        pickle.dump(preprocessors_serializaveis(preprocessors), f)
+    return pasta, origem
+
+
+def carregar_entradas_exemplo(n_linhas):
+    """Replica o CSV de exemplo até n_linhas entradas (texto_ementa, tributo, turma)"""
+    df = pd.read_csv(CSV_EXEMPLO)[['texto_ementa', 'tributo', 'turma']]
+    repeticoes = int(np.ceil(n_linhas / len(df)))
+    return pd.concat([df] * repeticoes, ignore_index=True).iloc[:n_linhas]
+
+
+def cronometrar(funcao, repeticoes=1):
+    """Executa a função e retorna (melhor tempo em segundos, último resultado)"""
+    melhor = float('inf')
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
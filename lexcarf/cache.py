@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Cache LRU de predições em memória
+A chave é o hash da entrada normalizada (texto truncado em 1000 caracteres,
+tributo, turma), do limiar da votação em cascata e da versão dos modelos que
+calcularam o resultado, informada por quem chama (a de GerenciadorModelos.obter_com_versao); quando aparece
+uma versão nova, o cache é esvaziado automaticamente
+"""
+
+import functools
+import hashlib
+import os
+import threading
+from collections import OrderedDict, deque
+
+from lexcarf.featurizador import limpar_texto
+from lexcarf.metricas import contadores_cache
+
+TAMANHO_MAXIMO_PADRAO = 1024
+
+# Versões recentes lembradas: requisições ainda com os modelos anteriores não esvaziam o cache de novo
+VERSOES_LEMBRADAS = 4
+
+_METRICA_ACERTOS, _METRICA_FALHAS = contadores_cache('memoria')
+
+
+def versao_arquivos(caminhos):
+    """Identificador curto da versão de um conjunto de arquivos (caminho, mtime, tamanho)"""
+    partes = []
+    for caminho in caminhos:
+        try:
+            info = os.stat(caminho)
+            partes.append(f'{caminho}:{info.st_mtime_ns}:{info.st_size}')
+        except FileNotFoundError:
+            partes.append(f'{caminho}:ausente')
+    return hashlib.blake2b('|'.join(partes).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def normalizar_entrada(texto_ementa, tributo, turma):
+    """Mesma normalização do texto feita antes do TF-IDF"""
+    return limpar_texto(texto_ementa), str(tributo), str(turma)
+
+
+def copiar_resultado(resultado):
+    """Cópia rasa de um resultado (tupla com dicts de probabilidades), para que quem o recebe possa alterá-lo"""
+    return tuple(dict(valor) if isinstance(valor, dict) else valor for valor in resultado)
+
+
+def chave_predicao(texto_ementa, tributo, turma, versao='', limiar_votacao=None):
+    """
+    Hash da entrada normalizada, da versão do modelo e do limiar da votação em cascata
+    (com limiar, a votação pode vir vazia; sem limiar, sempre vem preenchida)
+    """
+    partes = normalizar_entrada(texto_ementa, tributo, turma) + (str(versao), repr(limiar_votacao))
+    return hashlib.blake2b('\x1f'.join(partes).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class CachePredicoes:
+    """
+    Cache LRU thread-safe de resultados de predição
+
+    Cada resultado é guardado com a versão dos modelos que o calcularam; a
+    primeira consulta com uma versão nova esvazia o cache. Os dicts são
+    copiados ao guardar e a cada acerto: o cache é compartilhado entre
+    sessões e quem altera o resultado recebido não afeta os demais.
+    """
+
+    def __init__(self, tamanho_maximo=TAMANHO_MAXIMO_PADRAO):
+        if tamanho_maximo < 1:
+            raise ValueError("tamanho_maximo deve ser pelo menos 1")
+
+        self.tamanho_maximo = tamanho_maximo
+
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self._versoes = deque(maxlen=VERSOES_LEMBRADAS)
+        self.versao = None
+
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+
+    def _verificar_versao(self, versao):
+        """Esvazia o cache na primeira vez que a versão aparece (chamado com o lock adquirido)"""
+        if versao == self.versao or versao in self._versoes:
+            return
+        if self.versao is not None:
+            self._itens.clear()
+            self.invalidacoes += 1
+        self.versao = versao
+        self._versoes.append(versao)
+
+    def obter(self, texto_ementa, tributo, turma, versao='', limiar_votacao=None):
+        """Retorna o resultado armazenado para essa versão dos modelos e esse limiar, ou None"""
+        with self._lock:
+            self._verificar_versao(versao)
+            chave = chave_predicao(texto_ementa, tributo, turma, versao, limiar_votacao)
+            resultado = self._itens.get(chave)
+            if resultado is None:
+                self.falhas += 1
+                _METRICA_FALHAS.inc()
+                return None
+
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            _METRICA_ACERTOS.inc()
+        return copiar_resultado(resultado)
+
+    def guardar(self, texto_ementa, tributo, turma, resultado, versao='', limiar_votacao=None):
+        """Armazena uma cópia do resultado, descartando o menos usado se o limite for atingido"""
+        resultado = copiar_resultado(resultado)
+        with self._lock:
+            self._verificar_versao(versao)
+            chave = chave_predicao(texto_ementa, tributo, turma, versao, limiar_votacao)
+            self._itens[chave] = resultado
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        """Remove todos os itens e zera os contadores"""
+        with self._lock:
+            self._itens.clear()
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self):
+        """Contadores de acertos/falhas e ocupação"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+                'itens': len(self._itens),
+                'tamanho_maximo': self.tamanho_maximo,
+                'invalidacoes': self.invalidacoes,
+                'versao': self.versao,
+            }
+
+    def com_cache(self, funcao, versao=''):
+        """Envolve uma função de predição com este cache (ver envolver_com_cache)"""
+        return envolver_com_cache(self, funcao, versao)
+
+
+def envolver_com_cache(cache, funcao, versao=''):
+    """
+    Envolve uma função de predição (texto_ementa, tributo, turma, ...) que
+    retorna uma tupla terminada em erro; resultados com erro não são armazenados
+
+    versao identifica os modelos passados à função (GerenciadorModelos.obter_com_versao);
+    o argumento nomeado limiar_votacao da chamada também entra na chave. O cache precisa
+    oferecer obter(texto, tributo, turma, versao, limiar_votacao) e
+    guardar(texto, tributo, turma, resultado, versao, limiar_votacao).
+    """
+    @functools.wraps(funcao)
+    def funcao_com_cache(texto_ementa, tributo, turma, *args, **kwargs):
+        limiar_votacao = kwargs.get('limiar_votacao')
+        resultado = cache.obter(texto_ementa, tributo, turma, versao, limiar_votacao)
+        if resultado is not None:
+            return resultado
+
+        resultado = funcao(texto_ementa, tributo, turma, *args, **kwargs)
+        if resultado[-1] is None:
+            cache.guardar(texto_ementa, tributo, turma, resultado, versao, limiar_votacao)
+        return resultado
+
+    return funcao_com_cache
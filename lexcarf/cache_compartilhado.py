@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Cache de predições persistente e compartilhado entre processos
+Usa SQLite em modo WAL: vários processos do mesmo host leem em paralelo e
+reaproveitam as predições uns dos outros. Mesma chave do cache em memória
+(entrada normalizada + limiar da votação em cascata + versão dos modelos
+informada por quem chama), com expiração por TTL e descarte dos itens mais
+antigos quando o limite de tamanho é atingido
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from lexcarf.cache import chave_predicao, envolver_com_cache
+from lexcarf.metricas import contadores_cache
+
+CAMINHO_PADRAO = os.path.join(tempfile.gettempdir(), 'lexcarf_cache_predicoes.sqlite')
+TTL_PADRAO = 24 * 3600
+TAMANHO_MAXIMO_PADRAO = 100_000
+
+# A cada quantas inserções o processo verifica TTL e limite de tamanho
+INTERVALO_LIMPEZA = 100
+
+_METRICA_ACERTOS, _METRICA_FALHAS = contadores_cache('compartilhado')
+
+
+class CacheCompartilhado:
+    """
+    Cache SQLite (WAL) de resultados (prob_provimento, prob_votacao, erro)
+
+    Cada thread usa a sua própria conexão. Os valores são gravados em JSON,
+    nunca em pickle, pois o arquivo é compartilhado entre processos.
+    """
+
+    def __init__(self, caminho=CAMINHO_PADRAO, ttl=TTL_PADRAO, tamanho_maximo=TAMANHO_MAXIMO_PADRAO):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._insercoes = 0
+        self.versao = None
+
+        self.acertos = 0
+        self.falhas = 0
+
+        conexao = self._conexao()
+        conexao.execute(
+            'CREATE TABLE IF NOT EXISTS predicoes ('
+            ' chave TEXT PRIMARY KEY,'
+            ' valor TEXT NOT NULL,'
+            ' criado REAL NOT NULL)'
+        )
+        conexao.execute('CREATE INDEX IF NOT EXISTS idx_predicoes_criado ON predicoes (criado)')
+
+    def _conexao(self):
+        """Conexão SQLite da thread atual"""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            conexao = sqlite3.connect(self.caminho, timeout=10.0, isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexao = conexao
+        return conexao
+
+    def _chave(self, texto_ementa, tributo, turma, versao, limiar_votacao):
+        """Chave da entrada na versão dos modelos; entradas de versões antigas saem por TTL/tamanho"""
+        self.versao = versao
+        return chave_predicao(texto_ementa, tributo, turma, versao, limiar_votacao)
+
+    def obter(self, texto_ementa, tributo, turma, versao='', limiar_votacao=None):
+        """Retorna (prob_provimento, prob_votacao, None) armazenado para essa versão e esse limiar, ou None"""
+        chave = self._chave(texto_ementa, tributo, turma, versao, limiar_votacao)
+        linha = self._conexao().execute(
+            'SELECT valor FROM predicoes WHERE chave = ? AND criado >= ?',
+            (chave, time.time() - self.ttl)
+        ).fetchone()
+
+        with self._lock:
+            if linha is None:
+                self.falhas += 1
+                _METRICA_FALHAS.inc()
+                return None
+            self.acertos += 1
+            _METRICA_ACERTOS.inc()
+
+        valor = json.loads(linha[0])
+        return valor['provimento'], valor['votacao'], None
+
+    def guardar(self, texto_ementa, tributo, turma, resultado, versao='', limiar_votacao=None):
+        """Armazena (prob_provimento, prob_votacao, erro)"""
+        prob_provimento, prob_votacao = resultado[0], resultado[1]
+        valor = json.dumps({
+            'provimento': {str(classe): float(prob) for classe, prob in prob_provimento.items()},
+            'votacao': {str(classe): float(prob) for classe, prob in prob_votacao.items()},
+        })
+
+        chave = self._chave(texto_ementa, tributo, turma, versao, limiar_votacao)
+        self._conexao().execute(
+            'INSERT OR REPLACE INTO predicoes (chave, valor, criado) VALUES (?, ?, ?)',
+            (chave, valor, time.time())
+        )
+
+        with self._lock:
+            self._insercoes += 1
+            limpar = self._insercoes % INTERVALO_LIMPEZA == 0
+        if limpar:
+            self.remover_excedentes()
+
+    def remover_excedentes(self):
+        """Remove itens expirados e, acima do limite, os mais antigos"""
+        conexao = self._conexao()
+        conexao.execute('DELETE FROM predicoes WHERE criado < ?', (time.time() - self.ttl,))
+        conexao.execute(
+            'DELETE FROM predicoes WHERE chave IN ('
+            ' SELECT chave FROM predicoes ORDER BY criado DESC LIMIT -1 OFFSET ?)',
+            (self.tamanho_maximo,)
+        )
+
+    def limpar(self):
+        """Remove todos os itens (de todos os processos)"""
+        self._conexao().execute('DELETE FROM predicoes')
+        with self._lock:
+            self.acertos = 0
+            self.falhas = 0
+
+    def estatisticas(self):
+        """Contadores deste processo e ocupação total do arquivo"""
+        itens = self._conexao().execute('SELECT COUNT(*) FROM predicoes').fetchone()[0]
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+                'itens': itens,
+                'tamanho_maximo': self.tamanho_maximo,
+                'versao': self.versao,
+            }
+
+    def com_cache(self, funcao, versao=''):
+        """Envolve uma função de predição com este cache (ver envolver_com_cache)"""
+        return envolver_com_cache(self, funcao, versao)
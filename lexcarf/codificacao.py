@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Tabelas de codificação de tributo e turma
+Dicionários simples construídos uma única vez a partir dos LabelEncoders,
+substituindo le_tributo.transform / le_turma.transform (validação de array
+e searchsorted a cada chamada). Rótulos desconhecidos não geram erro: caem
+no código de 'OUTROS' ou, se essa classe não existir, em CODIGO_DESCONHECIDO
+(ver a constante). As tabelas são só dados derivados dos encoders: a memória
+de turmas já simplificadas fica no processo (lru_cache), fora do pacote salvo
+"""
+
+import functools
+import re
+
+import numpy as np
+
+# Código de rótulos não vistos quando o encoder não tem a classe 'OUTROS' (no
+# treinamento, turma sem número ordinal e tributo pouco frequente viram 'OUTROS';
+# a classe só falta se nenhum caso assim existia). O antigo le.transform levantava
+# ValueError nesse caso. As florestas nunca viram -1, mas seus limiares ficam entre
+# códigos inteiros (0,5, 1,5, ...), então -1 segue sempre o mesmo caminho do código 0
+CODIGO_DESCONHECIDO = -1
+
+# Limite de turmas brutas memorizadas (há poucas dezenas de turmas distintas)
+LIMITE_TURMAS_BRUTAS = 4096
+
+# Regra de simplificação da turma (a mesma no treinamento e na inferência)
+PADRAO_TURMA = re.compile(r'(\d+ª)')
+
+
+@functools.lru_cache(maxsize=LIMITE_TURMAS_BRUTAS, typed=True)
+def simplificar_turma(turma):
+    """' 02ª TO-04ªCÂMARA-...' -> '02ª'; sem número ordinal -> 'OUTROS' (memorizada por turma bruta)"""
+    encontrado = PADRAO_TURMA.search(str(turma))
+    return encontrado.group(1) if encontrado else 'OUTROS'
+
+
+def simplificar_turmas(turmas):
+    """Versão vetorizada de simplificar_turma"""
+    import pandas as pd
+    return pd.Series(turmas).astype(str).str.extract(PADRAO_TURMA, expand=False).fillna('OUTROS')
+
+
+class CodificadorRotulos:
+    """Equivalente leve de um LabelEncoder já ajustado (classes_, transform, inverse_transform)"""
+
+    def __init__(self, classes):
+        self.classes_ = np.array(classes, dtype=object)
+        self._codigos = {classe: codigo for codigo, classe in enumerate(self.classes_)}
+
+    def transform(self, rotulos):
+        desconhecidos = [rotulo for rotulo in rotulos if rotulo not in self._codigos]
+        if desconhecidos:
+            raise ValueError(f"Rótulos não vistos no ajuste: {desconhecidos}")
+        return np.array([self._codigos[rotulo] for rotulo in rotulos], dtype=np.int64)
+
+    def inverse_transform(self, codigos):
+        return self.classes_[np.asarray(codigos)]
+
+
+def construir_tabelas_codificacao(le_tributo, le_turma, tributos_frequentes):
+    """Monta as tabelas {rótulo: código} com o fallback de 'OUTROS' já resolvido"""
+    codigos_tributo = {classe: codigo for codigo, classe in enumerate(le_tributo.classes_)}
+    codigos_turma = {classe: codigo for codigo, classe in enumerate(le_turma.classes_)}
+
+    return {
+        # Tributos não frequentes são tratados como 'OUTROS', como no treinamento
+        'tributo': {tributo: codigos_tributo[tributo] for tributo in tributos_frequentes if tributo in codigos_tributo},
+        'tributo_outros': codigos_tributo.get('OUTROS', CODIGO_DESCONHECIDO),
+        'turma': codigos_turma,
+        'turma_outros': codigos_turma.get('OUTROS', CODIGO_DESCONHECIDO),
+    }
+
+
+def obter_tabelas_codificacao(preprocessors):
+    """Tabelas do pacote de pré-processadores, construídas na primeira chamada se ainda não existirem"""
+    tabelas = preprocessors.get('tabelas_codificacao')
+    if tabelas is None:
+        tabelas = construir_tabelas_codificacao(
+            preprocessors['le_tributo'], preprocessors['le_turma'], preprocessors['tributos_frequentes']
+        )
+        preprocessors['tabelas_codificacao'] = tabelas
+    return tabelas
+
+
+def codificar_tributo(tabelas, tributo):
+    """Código de um tributo"""
+    return tabelas['tributo'].get(tributo, tabelas['tributo_outros'])
+
+
+def codificar_turma(tabelas, turma):
+    """Código de uma turma bruta (a simplificação de turmas já vistas vem da memória de simplificar_turma)"""
+    return tabelas['turma'].get(simplificar_turma(turma), tabelas['turma_outros'])
+
+
+def codificar_tributos(tabelas, tributos):
+    """Códigos de uma sequência de tributos"""
+    import pandas as pd
+    codigos = pd.Series(tributos).map(tabelas['tributo'])
+    return codigos.fillna(tabelas['tributo_outros']).to_numpy(dtype=np.int64)
+
+
+def codificar_turmas(tabelas, turmas):
+    """Códigos de uma sequência de turmas (a simplificação é feita uma vez por turma distinta)"""
+    import pandas as pd
+    turmas = pd.Series(turmas).astype(str)
+    codigos = {turma: codificar_turma(tabelas, turma) for turma in turmas.unique()}
+    return turmas.map(codigos).to_numpy(dtype=np.int64)
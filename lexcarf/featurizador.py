@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Featurizador compartilhado entre treinamento e inferência
+Uma única implementação de (texto_ementa, tributo, turma) -> features,
+ajustada pelos scripts train_model_* e serializada junto com os modelos,
+para que as features offline e online sejam idênticas bit a bit
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.codificacao import (
+    CodificadorRotulos, construir_tabelas_codificacao, codificar_tributo, codificar_turma, codificar_tributos, codificar_turmas,
+    simplificar_turmas
+)
+from lexcarf.latencia import etapa
+from lexcarf.tfidf_leve import TfidfLeve
+
+COLUNAS_ENTRADA = ['texto_ementa', 'tributo', 'turma']
+FEATURES_CATEGORICAS = ['tributo_encoded', 'turma_encoded']
+MAX_CARACTERES = 1000
+
+
+def normalizar_entradas(entradas):
+    """Converte um DataFrame ou lista de (texto_ementa, tributo, turma) em DataFrame"""
+    if isinstance(entradas, pd.DataFrame):
+        faltando = [coluna for coluna in COLUNAS_ENTRADA if coluna not in entradas.columns]
+        if faltando:
+            raise ValueError(f"Colunas ausentes na entrada: {faltando}")
+        return entradas[COLUNAS_ENTRADA]
+
+    return pd.DataFrame(list(entradas), columns=COLUNAS_ENTRADA)
+
+
+def limpar_texto(texto_ementa):
+    """Texto da ementa truncado; valores ausentes viram string vazia"""
+    if texto_ementa is None or (not isinstance(texto_ementa, str) and pd.isna(texto_ementa)):
+        return ""
+    return str(texto_ementa)[:MAX_CARACTERES]
+
+
+def limpar_textos(textos):
+    """Versão vetorizada de limpar_texto"""
+    return pd.Series(textos).fillna('').astype(str).str[:MAX_CARACTERES]
+
+
+def criar_tfidf():
+    """TF-IDF com os hiperparâmetros usados em todos os treinamentos"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    return TfidfVectorizer(
+        max_features=1000,
+        stop_words=None,
+        ngram_range=(1, 2),
+        min_df=2,
+        max_df=0.95,
+        dtype=np.float32
+    )
+
+
+class Featurizador:
+    """
+    Transforma (texto_ementa, tributo, turma) em [tributo_encoded, turma_encoded, TF-IDF...]
+
+    min_contagem_tributo: tributos com menos ocorrências no treino viram 'OUTROS'.
+    """
+
+    def __init__(self, min_contagem_tributo=30, tfidf=None):
+        self.min_contagem_tributo = min_contagem_tributo
+        self.tfidf = tfidf if tfidf is not None else criar_tfidf()
+        # LabelEncoders criados no ajuste (o sklearn só é importado para treinar)
+        self.le_tributo = None
+        self.le_turma = None
+        self.tributos_frequentes = []
+        self.tabelas = None
+
+    @classmethod
+    def de_preprocessors(cls, preprocessors):
+        """Reconstrói o featurizador a partir de um pacote de pré-processadores antigo"""
+        featurizador = cls(tfidf=preprocessors['tfidf'])
+        featurizador.le_tributo = preprocessors['le_tributo']
+        featurizador.le_turma = preprocessors['le_turma']
+        featurizador.tributos_frequentes = list(preprocessors['tributos_frequentes'])
+        featurizador.tabelas = construir_tabelas_codificacao(
+            featurizador.le_tributo, featurizador.le_turma, featurizador.tributos_frequentes
+        )
+        return featurizador
+
+    @property
+    def n_features(self):
+        return len(FEATURES_CATEGORICAS) + len(self.tfidf.vocabulary_)
+
+    @property
+    def nomes_features(self):
+        return FEATURES_CATEGORICAS + [f'tfidf_{i}' for i in range(len(self.tfidf.vocabulary_))]
+
+    def ajustar(self, entradas):
+        """Ajusta tributos frequentes, encoders e TF-IDF nos dados de treinamento"""
+        from sklearn.preprocessing import LabelEncoder
+
+        df = normalizar_entradas(entradas)
+        self.le_tributo = LabelEncoder()
+        self.le_turma = LabelEncoder()
+
+        contagens = df['tributo'].value_counts()
+        self.tributos_frequentes = contagens[contagens >= self.min_contagem_tributo].index.tolist()
+        tributos = df['tributo'].where(df['tributo'].isin(self.tributos_frequentes), 'OUTROS')
+        self.le_tributo.fit(tributos)
+
+        self.le_turma.fit(simplificar_turmas(df['turma']))
+        self.tfidf.fit(limpar_textos(df['texto_ementa']))
+
+        self.tabelas = construir_tabelas_codificacao(self.le_tributo, self.le_turma, self.tributos_frequentes)
+        return self
+
+    def transformar(self, entradas, esparso=True):
+        """
+        Matriz de features para várias linhas
+
+        Com esparso=True retorna CSR float32 (o dtype usado pelas árvores);
+        com esparso=False retorna a matriz densa float64.
+        """
+        df = normalizar_entradas(entradas)
+
+        with etapa('codificacao'):
+            X_categoricas = np.column_stack([
+                codificar_tributos(self.tabelas, df['tributo']),
+                codificar_turmas(self.tabelas, df['turma'])
+            ])
+        with etapa('tfidf'):
+            textos_tfidf = self.tfidf.transform(limpar_textos(df['texto_ementa']))
+
+        with etapa('montagem'):
+            if esparso:
+                return montar_matriz_esparsa(X_categoricas, textos_tfidf)
+            return np.hstack([X_categoricas, textos_tfidf.toarray()])
+
+    def ajustar_transformar(self, entradas, esparso=True):
+        """Ajusta e transforma (a transformação é a mesma usada na inferência)"""
+        return self.ajustar(entradas).transformar(entradas, esparso=esparso)
+
+    def transformar_linha(self, texto_ementa, tributo, turma):
+        """Linha única de features em CSR, sem passar pelo pandas"""
+        with etapa('codificacao'):
+            tributo_encoded = codificar_tributo(self.tabelas, tributo)
+            turma_encoded = codificar_turma(self.tabelas, turma)
+        with etapa('tfidf'):
+            texto_tfidf = self.tfidf.transform([limpar_texto(texto_ementa)])
+        with etapa('montagem'):
+            return montar_linha_esparsa(tributo_encoded, turma_encoded, texto_tfidf)
+
+    def exportar(self):
+        """
+        Featurizador em (configuração JSON, arrays NumPy), sem objetos do sklearn
+
+        O vocabulário vai na ordem dos índices das colunas; o vetor idf vai em arrays.
+        """
+        tfidf = self.tfidf if isinstance(self.tfidf, TfidfLeve) else TfidfLeve.de_sklearn(self.tfidf)
+        parametros_tfidf, idf = tfidf.exportar()
+
+        config = {
+            'min_contagem_tributo': self.min_contagem_tributo,
+            'tributos_frequentes': list(self.tributos_frequentes),
+            'classes_tributo': self.le_tributo.classes_.tolist(),
+            'classes_turma': self.le_turma.classes_.tolist(),
+            'max_caracteres': MAX_CARACTERES,
+            'tfidf': parametros_tfidf,
+            'vocabulario': tfidf.vocabulario,
+            'nomes_features': self.nomes_features,
+        }
+        return config, ({'idf': idf} if idf is not None else {})
+
+    @classmethod
+    def de_exportacao(cls, config, arrays):
+        """
+        Reconstrói o featurizador exportado por exportar, sem sklearn
+
+        Usa o TF-IDF leve (lexcarf.tfidf_leve) e CodificadorRotulos no lugar dos LabelEncoders.
+        """
+        tfidf = TfidfLeve.de_exportacao(config['tfidf'], config['vocabulario'], arrays.get('idf'))
+
+        featurizador = cls(min_contagem_tributo=config['min_contagem_tributo'], tfidf=tfidf)
+        featurizador.le_tributo = CodificadorRotulos(config['classes_tributo'])
+        featurizador.le_turma = CodificadorRotulos(config['classes_turma'])
+        featurizador.tributos_frequentes = list(config['tributos_frequentes'])
+        featurizador.tabelas = construir_tabelas_codificacao(
+            featurizador.le_tributo, featurizador.le_turma, featurizador.tributos_frequentes
+        )
+        return featurizador
+
+    def para_preprocessors(self):
+        """
+        Pacote de pré-processadores salvo ao lado dos modelos (mantém as chaves antigas)
+
+        Só objetos do sklearn e dicts, para que o .pkl não dependa de lexcarf;
+        o featurizador é reconstruído dessas partes por obter_featurizador.
+        """
+        return {
+            'le_tributo': self.le_tributo,
+            'le_turma': self.le_turma,
+            'tfidf': self.tfidf,
+            'tributos_frequentes': self.tributos_frequentes,
+            'feature_names': self.nomes_features,
+            'tabelas_codificacao': self.tabelas,
+        }
+
+    def para_memoria(self):
+        """para_preprocessors já com este featurizador guardado, como obter_featurizador faria"""
+        preprocessors = self.para_preprocessors()
+        preprocessors['featurizador'] = self
+        return preprocessors
+
+
+def obter_featurizador(preprocessors):
+    """
+    Featurizador do pacote de pré-processadores
+
+    Reconstruído na primeira chamada e guardado no dict em memória (chave
+    'featurizador'); para gravar o dict, use preprocessors_serializaveis.
+    """
+    featurizador = preprocessors.get('featurizador')
+    if featurizador is None:
+        featurizador = Featurizador.de_preprocessors(preprocessors)
+        preprocessors['featurizador'] = featurizador
+    return featurizador
+
+
+def preprocessors_serializaveis(preprocessors):
+    """Cópia rasa do pacote sem o featurizador guardado por obter_featurizador, para pickle"""
+    return {chave: valor for chave, valor in preprocessors.items() if chave != 'featurizador'}
+
+
+def salvar_preprocessors_compactos(preprocessors, caminho):
+    """
+    Grava os pré-processadores sem pickle em um .npz (sem compressão)
+
+    O arquivo tem o vetor idf e, no array 'config', o JSON com vocabulário,
+    parâmetros do TF-IDF e tabelas dos encoders (ver Featurizador.exportar).
+    """
+    config, arrays = obter_featurizador(preprocessors).exportar()
+    conteudo = np.frombuffer(json.dumps(config, ensure_ascii=False).encode('utf-8'), dtype=np.uint8)
+
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'wb') as f:
+        np.savez(f, config=conteudo, **arrays)
+    os.replace(temporario, caminho)
+
+
+def carregar_preprocessors_compactos(caminho):
+    """Pré-processadores gravados por salvar_preprocessors_compactos (com o TF-IDF leve)"""
+    with np.load(caminho, allow_pickle=False) as dados:
+        config = json.loads(dados['config'].tobytes().decode('utf-8'))
+        arrays = {nome: dados[nome] for nome in dados.files if nome != 'config'}
+    return Featurizador.de_exportacao(config, arrays).para_memoria()
+
+
+def montar_linha_esparsa(tributo_encoded, turma_encoded, texto_tfidf):
+    """Monta a linha de features (1 x 2+n_termos) em CSR float32 sem densificar o TF-IDF"""
+    import scipy.sparse as sp
+
+    n_valores = texto_tfidf.nnz + 2
+
+    dados = np.empty(n_valores, dtype=np.float32)
+    dados[0] = tributo_encoded
+    dados[1] = turma_encoded
+    dados[2:] = texto_tfidf.data
+
+    indices = np.empty(n_valores, dtype=np.int32)
+    indices[0] = 0
+    indices[1] = 1
+    indices[2:] = texto_tfidf.indices + 2
+
+    indptr = np.array([0, n_valores], dtype=np.int32)
+    return sp.csr_matrix((dados, indices, indptr), shape=(1, texto_tfidf.shape[1] + 2))
+
+
+def montar_matriz_esparsa(X_categoricas, textos_tfidf):
+    """Concatena as colunas categóricas e o TF-IDF em uma matriz CSR float32"""
+    import scipy.sparse as sp
+
+    categoricas = sp.csr_matrix(np.asarray(X_categoricas, dtype=np.float32))
+    return sp.hstack([categoricas, textos_tfidf.astype(np.float32)], format='csr')
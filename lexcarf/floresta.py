@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Avaliador compilado de florestas aleatórias
+Converte um RandomForestClassifier treinado em arrays NumPy planos e percorre
+todas as árvores ao mesmo tempo, sem a validação de entrada e o despacho
+joblib que o predict_proba do sklearn faz a cada chamada
+"""
+
+import os
+
+import numpy as np
+
+# Linhas densificadas por vez ao avaliar matrizes esparsas grandes
+TAMANHO_BLOCO = 512
+
+# Arrays de nós que podem ser mapeados em memória e compartilhados entre processos
+ARRAYS_NOS = ('esquerda', 'direita', 'feature', 'threshold', 'prob_nos', 'raizes')
+
+
+class FlorestaCompilada:
+    """
+    Floresta em arrays planos com a mesma interface de predição do sklearn
+
+    Folhas apontam para si mesmas (limiar +inf), de modo que todas as árvores
+    podem ser percorridas pelo mesmo número de passos (a profundidade máxima).
+    """
+
+    def __init__(self, esquerda, direita, feature, threshold, prob_nos, raizes, profundidade, classes, n_features):
+        self.esquerda = esquerda
+        self.direita = direita
+        self.feature = feature
+        self.threshold = threshold
+        self.prob_nos = prob_nos
+        self.raizes = raizes
+        self.profundidade = profundidade
+        self.classes_ = classes
+        self.n_features_in_ = n_features
+
+    @property
+    def n_arvores(self):
+        return len(self.raizes)
+
+    @classmethod
+    def de_sklearn(cls, floresta):
+        """Compila um RandomForestClassifier já treinado"""
+        if getattr(floresta, 'n_outputs_', 1) != 1:
+            raise ValueError("Apenas florestas com uma única saída podem ser compiladas")
+
+        esquerdas, direitas, features, thresholds, probs, raizes = [], [], [], [], [], []
+        profundidade = 0
+        deslocamento = 0
+
+        for arvore in floresta.estimators_:
+            tree = arvore.tree_
+            indices = np.arange(tree.node_count) + deslocamento
+            folha = tree.children_left == -1
+
+            esquerdas.append(np.where(folha, indices, tree.children_left + deslocamento))
+            direitas.append(np.where(folha, indices, tree.children_right + deslocamento))
+            features.append(np.where(folha, 0, tree.feature))
+            thresholds.append(np.where(folha, np.inf, tree.threshold))
+
+            # Mesma normalização de DecisionTreeClassifier.predict_proba
+            valores = tree.value[:, 0, :]
+            normalizador = valores.sum(axis=1, keepdims=True)
+            normalizador[normalizador == 0.0] = 1.0
+            probs.append(valores / normalizador)
+
+            raizes.append(deslocamento)
+            profundidade = max(profundidade, tree.max_depth)
+            deslocamento += tree.node_count
+
+        return cls(
+            esquerda=np.concatenate(esquerdas).astype(np.int32),
+            direita=np.concatenate(direitas).astype(np.int32),
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            prob_nos=np.concatenate(probs).astype(np.float64),
+            raizes=np.array(raizes, dtype=np.int32),
+            profundidade=profundidade,
+            classes=floresta.classes_,
+            n_features=floresta.n_features_in_
+        )
+
+    def _folhas_linha(self, x, raizes=None):
+        """Índices das folhas alcançadas por uma única linha densa (float32); raizes: subconjunto de árvores"""
+        nos = self.raizes if raizes is None else raizes
+        for _ in range(self.profundidade):
+            nos = np.where(x[self.feature[nos]] <= self.threshold[nos], self.esquerda[nos], self.direita[nos])
+        return nos
+
+    def _folhas_bloco(self, X, raizes=None):
+        """Índices das folhas (n_linhas x n_arvores) para um bloco denso float32; raizes: subconjunto de árvores"""
+        raizes = self.raizes if raizes is None else raizes
+        nos = np.broadcast_to(raizes, (X.shape[0], len(raizes))).copy()
+        linhas = np.arange(X.shape[0])[:, None]
+        for _ in range(self.profundidade):
+            nos = np.where(X[linhas, self.feature[nos]] <= self.threshold[nos], self.esquerda[nos], self.direita[nos])
+        return nos
+
+    def _linha_densa(self, X):
+        """Densifica uma linha CSR em um vetor float32 (as árvores comparam em float32)"""
+        x = np.zeros(self.n_features_in_, dtype=np.float32)
+        x[X.indices] = X.data
+        return x
+
+    def predict_proba(self, X):
+        """Probabilidades por classe, equivalentes às do sklearn dentro da tolerância de ponto flutuante"""
+        if hasattr(X, 'tocsr'):
+            # Matriz esparsa do scipy (o módulo só depende do NumPy para avaliar matrizes densas)
+            X = X.tocsr()
+            if X.shape[0] == 1:
+                folhas = self._folhas_linha(self._linha_densa(X))
+                return self.prob_nos[folhas].sum(axis=0, keepdims=True) / self.n_arvores
+
+            blocos = [
+                self._folhas_bloco(X[inicio:inicio + TAMANHO_BLOCO].toarray().astype(np.float32, copy=False))
+                for inicio in range(0, X.shape[0], TAMANHO_BLOCO)
+            ]
+            folhas = np.vstack(blocos)
+        else:
+            X = np.asarray(X, dtype=np.float32)
+            if X.ndim == 1:
+                X = X.reshape(1, -1)
+            folhas = self._folhas_bloco(X)
+
+        return self.prob_nos[folhas].sum(axis=1) / self.n_arvores
+
+    def predict(self, X):
+        """Classe mais provável para cada linha"""
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compilar_floresta(floresta):
+    """Atalho para FlorestaCompilada.de_sklearn"""
+    return FlorestaCompilada.de_sklearn(floresta)
+
+
+def salvar_floresta(floresta, caminho):
+    """
+    Grava uma FlorestaCompilada sem compressão, em formato mapeável com carregar_floresta
+
+    A gravação é feita em um arquivo temporário seguido de os.replace, de modo que
+    processos que já mapearam a versão anterior continuam lendo o arquivo antigo.
+    """
+    import joblib
+
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    joblib.dump(floresta, temporario)
+    os.replace(temporario, caminho)
+
+
+def carregar_floresta(caminho, mmap=True):
+    """
+    Carrega uma FlorestaCompilada gravada por salvar_floresta
+
+    Com mmap=True os arrays de nós são mapeados somente leitura: todos os processos
+    que carregam o mesmo arquivo compartilham as páginas pelo cache do sistema.
+    """
+    import joblib
+
+    floresta = joblib.load(caminho, mmap_mode='r' if mmap else None)
+    for nome in ARRAYS_NOS:
+        # Visão ndarray simples sobre o mapeamento (sem cópia), evitando o custo da subclasse memmap
+        setattr(floresta, nome, np.asarray(getattr(floresta, nome)))
+    return floresta
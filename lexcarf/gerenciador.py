@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Gerenciador de modelos do processo, com recarga a quente
+Cada conjunto de arquivos de modelo tem um único gerenciador por processo,
+compartilhado por todas as sessões/threads. Quando os arquivos mudam (mtime
+ou tamanho), a nova versão é carregada em uma thread de segundo plano e
+trocada atomicamente; enquanto isso, e nas requisições em andamento, os
+modelos anteriores continuam em uso. obter_com_versao() retorna os modelos
+junto com a versão deles, que é a que os caches de predição usam na chave
+"""
+
+import os
+import threading
+import time
+
+from lexcarf.cache import versao_arquivos
+from lexcarf.memoria import rss_atual_mb
+from lexcarf.metricas import contador_cargas, histograma_carga_modelos
+
+INTERVALO_VERIFICACAO_PADRAO = 2.0
+
+# Espera máxima entre novas tentativas de carregar uma versão que falhou (dobra a cada falha)
+ESPERA_MAXIMA_FALHA = 300.0
+
+_GERENCIADORES = {}
+_LOCK_GERENCIADORES = threading.Lock()
+
+_METRICA_TEMPO_CARGA = histograma_carga_modelos()
+_METRICA_CARGAS_OK = contador_cargas('ok')
+_METRICA_CARGAS_FALHA = contador_cargas('falha')
+
+
+def carregar_arquivos(caminhos):
+    """Carregador padrão: joblib.load de cada arquivo (também lê pickles comuns)"""
+    import joblib
+
+    return tuple(joblib.load(caminho) for caminho in caminhos)
+
+
+class GerenciadorModelos:
+    """
+    Mantém uma instância carregada dos modelos e a substitui quando os arquivos mudam
+
+    Uma versão nova só é carregada depois de ser vista igual em duas verificações
+    seguidas, para não carregar um conjunto de arquivos ainda sendo gravado. Se a
+    recarga falhar, os modelos anteriores continuam em uso, o erro fica registrado
+    e a mesma versão só é tentada de novo depois de uma espera que dobra a cada
+    falha (até ESPERA_MAXIMA_FALHA segundos).
+    """
+
+    def __init__(self, caminhos, carregar=None, intervalo_verificacao=INTERVALO_VERIFICACAO_PADRAO):
+        self.caminhos = tuple(os.path.abspath(caminho) for caminho in caminhos)
+        self._carregar = carregar if carregar is not None else (lambda: carregar_arquivos(self.caminhos))
+        self.intervalo_verificacao = intervalo_verificacao
+
+        self._lock = threading.Lock()
+        self._lock_carga = threading.Lock()
+        self._ultima_verificacao = 0.0
+        self._versao_pendente = None
+        self._thread_recarga = None
+
+        # Versão que falhou ao carregar, falhas seguidas e momento da próxima tentativa
+        self._versao_falha = None
+        self._falhas_seguidas = 0
+        self._proxima_tentativa = 0.0
+
+        # Estado trocado por atribuição única: (modelos, versao)
+        self._atual = None
+
+        self.carregamentos = 0
+        self.falhas = 0
+        self.ultimo_erro = None
+        self.tempo_ultima_carga = None
+        self.memoria_ultima_carga_mb = None
+        self.carregado_em = None
+
+    @property
+    def versao(self):
+        atual = self._atual
+        return atual[1] if atual is not None else None
+
+    def _carregar_versao(self, versao):
+        """Carrega os modelos e publica (chamado com _lock_carga adquirido)"""
+        rss_antes = rss_atual_mb()
+        inicio = time.perf_counter()
+        try:
+            modelos = self._carregar()
+        except Exception as e:
+            self.falhas += 1
+            self.ultimo_erro = str(e)
+            _METRICA_CARGAS_FALHA.inc()
+            with self._lock:
+                self._falhas_seguidas = self._falhas_seguidas + 1 if versao == self._versao_falha else 1
+                self._versao_falha = versao
+                espera = min(self.intervalo_verificacao * 2 ** self._falhas_seguidas, ESPERA_MAXIMA_FALHA)
+                self._proxima_tentativa = time.monotonic() + espera
+            raise
+
+        self.tempo_ultima_carga = time.perf_counter() - inicio
+        _METRICA_TEMPO_CARGA.observar(self.tempo_ultima_carga)
+        _METRICA_CARGAS_OK.inc()
+        rss_depois = rss_atual_mb()
+        if rss_antes is not None and rss_depois is not None:
+            self.memoria_ultima_carga_mb = rss_depois - rss_antes
+
+        # Se os arquivos mudaram durante a carga, a versão publicada (própria, para não
+        # coincidir com nenhuma versão de arquivos) faz a próxima verificação carregar de novo
+        versao_final = versao_arquivos(self.caminhos)
+        self._atual = (modelos, versao if versao_final == versao else f'{versao}:{versao_final}')
+        with self._lock:
+            self._versao_falha = None
+            self._falhas_seguidas = 0
+        self.carregamentos += 1
+        self.ultimo_erro = None
+        self.carregado_em = time.time()
+        return modelos
+
+    def _verificar(self):
+        """Retorna a versão nova estável a carregar, ou None"""
+        with self._lock:
+            agora = time.monotonic()
+            if agora - self._ultima_verificacao < self.intervalo_verificacao:
+                return None
+            self._ultima_verificacao = agora
+
+            versao = versao_arquivos(self.caminhos)
+            if versao == self.versao:
+                self._versao_pendente = None
+                return None
+            if versao == self._versao_falha and agora < self._proxima_tentativa:
+                return None
+            if versao != self._versao_pendente:
+                # Primeira vez que a versão aparece: espera a próxima verificação
+                self._versao_pendente = versao
+                return None
+            return versao
+
+    def obter(self):
+        """Modelos da versão atual, carregando na primeira chamada"""
+        return self.obter_com_versao()[0]
+
+    def obter_com_versao(self):
+        """
+        (modelos, versao) de um mesmo instante: a versão identifica os modelos
+        retornados e deve ser a usada nas chaves de cache das predições feitas com eles
+        """
+        atual = self._atual
+        if atual is None:
+            with self._lock_carga:
+                atual = self._atual
+                if atual is None:
+                    self._carregar_versao(versao_arquivos(self.caminhos))
+                    atual = self._atual
+            return atual
+
+        versao = self._verificar()
+        if versao is not None and self._lock_carga.acquire(blocking=False):
+            # Só uma recarga por vez, fora da requisição; as threads seguem com os modelos atuais
+            try:
+                self._thread_recarga = threading.Thread(target=self._recarregar_em_segundo_plano, args=(versao,),
+                                                        name='lexcarf-recarga', daemon=True)
+                self._thread_recarga.start()
+            except Exception:
+                self._lock_carga.release()
+                raise
+
+        return atual
+
+    def _recarregar_em_segundo_plano(self, versao):
+        """Corpo da thread de recarga (recebe _lock_carga adquirido); erros ficam nas estatísticas"""
+        try:
+            self._carregar_versao(versao)
+        except Exception:
+            pass
+        finally:
+            self._lock_carga.release()
+
+    def aguardar_recarga(self, timeout=None):
+        """Espera a recarga em segundo plano em andamento, se houver"""
+        thread = self._thread_recarga
+        if thread is not None:
+            thread.join(timeout)
+
+    def recarregar(self):
+        """Força a recarga imediata dos arquivos"""
+        with self._lock_carga:
+            return self._carregar_versao(versao_arquivos(self.caminhos))
+
+    def estatisticas(self):
+        """Versão, número de cargas, tempo e memória da última carga"""
+        return {
+            'versao': self.versao,
+            'carregamentos': self.carregamentos,
+            'falhas': self.falhas,
+            'falhas_seguidas': self._falhas_seguidas,
+            'ultimo_erro': self.ultimo_erro,
+            'tempo_ultima_carga': self.tempo_ultima_carga,
+            'memoria_ultima_carga_mb': self.memoria_ultima_carga_mb,
+            'carregado_em': self.carregado_em,
+            'rss_mb': rss_atual_mb(),
+        }
+
+
+def obter_gerenciador(nome, caminhos, carregar=None, intervalo_verificacao=INTERVALO_VERIFICACAO_PADRAO):
+    """Gerenciador único do processo com esse nome (criado na primeira chamada)"""
+    with _LOCK_GERENCIADORES:
+        gerenciador = _GERENCIADORES.get(nome)
+        if gerenciador is None:
+            gerenciador = GerenciadorModelos(caminhos, carregar, intervalo_verificacao)
+            _GERENCIADORES[nome] = gerenciador
+        return gerenciador
+
+
+def gerenciador_modelos_2023(dir_modelos=None):
+    """
+    Gerenciador dos modelos 2023 (provimento, votação, pré-processadores)
+
+    LEXCARF_FLORESTA_COMPILADA=1 compila as florestas e =0 usa as do sklearn (pickles,
+    mesmo com o pacote). O pacote é mapeado em memória
+    (LEXCARF_MMAP=0 o lê para a memória do processo); sem pacote, LEXCARF_MMAP=1 usa as
+    florestas compiladas mapeadas em memória (scripts/exportar_florestas.py).
+    """
+    from lexcarf.modelos import (DIR_MODELOS, caminhos_florestas_2023, caminhos_monitorados_2023,
+                                 carregar_modelos_2023, compilar_ambiente, mmap_ambiente)
+
+    dir_modelos = dir_modelos or DIR_MODELOS
+    compilar = compilar_ambiente()
+    mmap = mmap_ambiente()
+
+    caminhos = caminhos_monitorados_2023(dir_modelos)
+    if mmap:
+        caminhos += list(caminhos_florestas_2023(dir_modelos).values())
+
+    return obter_gerenciador(
+        f'2023:{dir_modelos}:compilada={compilar}:mmap={mmap}',
+        caminhos,
+        lambda: carregar_modelos_2023(dir_modelos, compilar=compilar, mmap=mmap)
+    )
+
+
+def gerenciador_pacote(nome, caminhos_legados, dir_modelos=None):
+    """
+    Gerenciador de um pacote único de modelos (lexcarf.pacote) em modelos/
+
+    Enquanto o pacote não existir, carrega os arquivos antigos caminhos_legados
+    (modelos e, por último, os pré-processadores), relativos ao diretório atual.
+    """
+    from lexcarf.modelos import DIR_MODELOS, caminho_pacote
+    from lexcarf.pacote import carregar_modelos_pacote
+
+    pacote = caminho_pacote(nome, dir_modelos or DIR_MODELOS)
+    legados = [os.path.abspath(caminho) for caminho in caminhos_legados]
+    return obter_gerenciador(
+        f'pacote:{pacote}:{"|".join(legados)}',
+        [pacote] + legados,
+        lambda: carregar_modelos_pacote(pacote, legados)
+    )
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+Runtime mínimo de inferência, só com NumPy
+Lê o pacote único de modelos (lexcarf.pacote) e faz TF-IDF + avaliação das
+florestas compiladas sem importar pandas, scipy, sklearn ou joblib, para que
+um processo de pontuação fique pronto para prever em uma fração de segundo.
+As features são as mesmas do Featurizador (comparadas em float32 pelas árvores)
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from lexcarf.codificacao import CodificadorRotulos, construir_tabelas_codificacao, codificar_tributo, codificar_turma
+from lexcarf.floresta import TAMANHO_BLOCO
+from lexcarf.modelos import caminho_pacote
+from lexcarf.pacote import arrays_featurizador, construir_florestas, ler_pacote
+from lexcarf.tfidf_leve import TfidfLeve
+
+COLUNAS_ENTRADA = ('texto_ementa', 'tributo', 'turma')
+N_CATEGORICAS = 2
+
+
+def limpar_texto(texto_ementa, max_caracteres):
+    """Como featurizador.limpar_texto, tratando NaN sem o pandas"""
+    if texto_ementa is None or (isinstance(texto_ementa, float) and texto_ementa != texto_ementa):
+        return ""
+    return str(texto_ementa)[:max_caracteres]
+
+
+class RuntimeInferencia:
+    """
+    Featurização e predição a partir do pacote de modelos
+
+    entradas são sequências de (texto_ementa, tributo, turma) ou dicts com essas chaves.
+    """
+
+    def __init__(self, caminho=None, mmap=True):
+        self.caminho = caminho or caminho_pacote('2023')
+        self.manifesto, arrays = ler_pacote(self.caminho, mmap=mmap)
+        self.versao = self.manifesto['versao']
+        self.modelos = construir_florestas(self.manifesto, arrays)
+
+        config = self.manifesto['featurizador']
+        self.tfidf = TfidfLeve.de_exportacao(config['tfidf'], config['vocabulario'], arrays_featurizador(arrays).get('idf'))
+        self.tabelas = construir_tabelas_codificacao(
+            CodificadorRotulos(config['classes_tributo']),
+            CodificadorRotulos(config['classes_turma']),
+            config['tributos_frequentes']
+        )
+        self.max_caracteres = config['max_caracteres']
+        self.n_features = N_CATEGORICAS + len(self.tfidf.vocabulario)
+
+    def features(self, entradas):
+        """Matriz densa float32 [tributo_encoded, turma_encoded, TF-IDF...]"""
+        linhas = [normalizar_entrada(entrada) for entrada in entradas]
+        X = np.zeros((len(linhas), self.n_features), dtype=np.float32)
+        if not linhas:
+            return X
+
+        X[:, 0] = [codificar_tributo(self.tabelas, tributo) for _, tributo, _ in linhas]
+        X[:, 1] = [codificar_turma(self.tabelas, turma) for _, _, turma in linhas]
+
+        indptr, indices, valores = self.tfidf.transformar_csr(
+            [limpar_texto(texto, self.max_caracteres) for texto, _, _ in linhas]
+        )
+        linhas_tfidf = np.repeat(np.arange(len(linhas)), np.diff(indptr))
+        X[linhas_tfidf, indices + N_CATEGORICAS] = valores.astype(np.float32)
+        return X
+
+    def prever_probabilidades(self, entradas):
+        """Dict nome do modelo -> matriz de probabilidades (n_linhas x n_classes)"""
+        entradas = list(entradas)
+        blocos = {nome: [] for nome in self.modelos}
+        for inicio in range(0, len(entradas), TAMANHO_BLOCO):
+            X = self.features(entradas[inicio:inicio + TAMANHO_BLOCO])
+            for nome, floresta in self.modelos.items():
+                blocos[nome].append(floresta.predict_proba(X))
+
+        return {
+            nome: np.vstack(partes) if partes else np.empty((0, len(self.modelos[nome].classes_)))
+            for nome, partes in blocos.items()
+        }
+
+    def prever(self, entradas):
+        """Lista de {modelo: {classe: probabilidade}}, no formato de resposta do serviço HTTP"""
+        probabilidades = self.prever_probabilidades(entradas)
+        classes = {nome: [str(classe) for classe in floresta.classes_] for nome, floresta in self.modelos.items()}
+        n_linhas = len(next(iter(probabilidades.values()))) if probabilidades else 0
+
+        return [
+            {nome: dict(zip(classes[nome], map(float, probabilidades[nome][i]))) for nome in self.modelos}
+            for i in range(n_linhas)
+        ]
+
+    def prever_linha(self, texto_ementa, tributo, turma):
+        """Predição de uma única ementa"""
+        return self.prever([(texto_ementa, tributo, turma)])[0]
+
+
+def normalizar_entrada(entrada):
+    """(texto_ementa, tributo, turma) de uma tupla ou dict"""
+    if isinstance(entrada, dict):
+        faltando = [coluna for coluna in COLUNAS_ENTRADA if coluna not in entrada]
+        if faltando:
+            raise ValueError(f"Campos ausentes: {faltando}")
+        return tuple(entrada[coluna] for coluna in COLUNAS_ENTRADA)
+
+    entrada = tuple(entrada)
+    if len(entrada) != len(COLUNAS_ENTRADA):
+        raise ValueError(f"Cada entrada deve ter {len(COLUNAS_ENTRADA)} campos: {list(COLUNAS_ENTRADA)}")
+    return entrada
+
+
+def main(argv=None, prog=None):
+    """Linha de comando: lê JSONL (um objeto por linha) e escreve as probabilidades em JSONL"""
+    parser = argparse.ArgumentParser(prog=prog, description='Predição CARF só com NumPy a partir do pacote de modelos')
+    parser.add_argument('entrada', nargs='?', help='Arquivo JSONL com texto_ementa, tributo e turma (padrão: stdin)')
+    parser.add_argument('-o', '--saida', help='Arquivo JSONL de saída (padrão: stdout)')
+    parser.add_argument('--pacote', help='Pacote de modelos (padrão: modelos/modelo_carf_2023.pacote)')
+    parser.add_argument('--sem-mmap', action='store_true', help='Lê os arrays para a memória em vez de mapear o arquivo')
+    args = parser.parse_args(argv)
+
+    runtime = RuntimeInferencia(args.pacote, mmap=not args.sem_mmap)
+
+    origem = open(args.entrada, encoding='utf-8') if args.entrada else sys.stdin
+    destino = open(args.saida, 'w', encoding='utf-8') if args.saida else sys.stdout
+    try:
+        entradas = [json.loads(linha) for linha in origem if linha.strip()]
+        for resultado in runtime.prever(entradas):
+            destino.write(json.dumps(resultado, ensure_ascii=False) + '\n')
+    finally:
+        if args.entrada:
+            origem.close()
+        if args.saida:
+            destino.close()
+
+
+if __name__ == "__main__":
+    main()
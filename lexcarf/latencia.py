@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Latência por etapa do caminho de predição
+Ganchos de medição em volta da codificação, do TF-IDF, da montagem da matriz
+e de cada predict_proba, alimentando janelas deslizantes das últimas medições
+(p50/p95/p99 por etapa). Desativados por padrão: com LEXCARF_LATENCIA=1 (ou
+ativar_latencia()), cada etapa custa uma chamada a perf_counter e um append;
+desativados, só a checagem de um booleano
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Medições mantidas por etapa (as mais antigas saem da janela)
+JANELA_PADRAO = 2048
+
+# Etapas em ordem de execução (etapas desconhecidas são listadas depois destas)
+ETAPAS = ('codificacao', 'tfidf', 'montagem', 'predict_proba_provimento', 'predict_proba_votacao', 'total')
+
+_ATIVA = os.environ.get('LEXCARF_LATENCIA', '').lower() in ('1', 'true', 'sim')
+
+# Funções (etapa, segundos) chamadas a cada medição, mesmo com o registro desligado (ex.: lexcarf.metricas)
+_OBSERVADORES = []
+
+
+def latencia_ativa():
+    """Se os ganchos de medição estão ligados"""
+    return _ATIVA
+
+
+def ativar_latencia(ativa=True):
+    """Liga ou desliga os ganchos de medição no processo"""
+    global _ATIVA
+    _ATIVA = bool(ativa)
+
+
+def adicionar_observador(funcao):
+    """Passa a chamar funcao(etapa, segundos) em cada medição dos ganchos"""
+    _OBSERVADORES.append(funcao)
+
+
+def remover_observador(funcao):
+    """Deixa de chamar um observador adicionado com adicionar_observador"""
+    if funcao in _OBSERVADORES:
+        _OBSERVADORES.remove(funcao)
+
+
+def _registrar(etapa, segundos):
+    if _ATIVA:
+        REGISTRO.registrar(etapa, segundos)
+    for observador in _OBSERVADORES:
+        observador(etapa, segundos)
+
+
+class _Medicao:
+    """Context manager de uma etapa: mede com perf_counter e registra ao sair"""
+
+    __slots__ = ('registro', 'etapa', 'inicio')
+
+    def __init__(self, registro, etapa):
+        self.registro = registro
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        self.registro.registrar(self.etapa, time.perf_counter() - self.inicio)
+        return False
+
+
+class _SemMedicao:
+    """Context manager vazio usado com os ganchos desligados"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+
+_SEM_MEDICAO = _SemMedicao()
+
+
+class RegistroLatencias:
+    """
+    Janelas deslizantes de latência (segundos) por etapa
+
+    Thread-safe: várias sessões do Streamlit e as threads do serviço HTTP
+    registram no mesmo objeto.
+    """
+
+    def __init__(self, janela=JANELA_PADRAO):
+        self.janela = janela
+        self._janelas = {}
+        self._contagens = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, etapa, segundos):
+        """Acrescenta uma medição à janela da etapa"""
+        with self._lock:
+            janela = self._janelas.get(etapa)
+            if janela is None:
+                janela = self._janelas[etapa] = deque(maxlen=self.janela)
+                self._contagens[etapa] = 0
+            janela.append(segundos)
+            self._contagens[etapa] += 1
+
+    def medir(self, etapa):
+        """Context manager que registra a duração do bloco (sempre, mesmo com os ganchos desligados)"""
+        return _Medicao(self, etapa)
+
+    def percentis(self):
+        """{etapa: {'n', 'n_janela', 'p50_ms', 'p95_ms', 'p99_ms', 'media_ms', 'max_ms'}} em ordem de ETAPAS"""
+        with self._lock:
+            janelas = {etapa: np.array(janela) for etapa, janela in self._janelas.items()}
+            contagens = dict(self._contagens)
+
+        ordem = [etapa for etapa in ETAPAS if etapa in janelas] + sorted(set(janelas) - set(ETAPAS))
+        resultado = {}
+        for etapa in ordem:
+            valores = janelas[etapa] * 1000
+            p50, p95, p99 = np.percentile(valores, [50, 95, 99])
+            resultado[etapa] = {
+                'n': contagens[etapa],
+                'n_janela': len(valores),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'media_ms': float(valores.mean()),
+                'max_ms': float(valores.max()),
+            }
+        return resultado
+
+    def exportar(self, caminho=None):
+        """JSON com os percentis e o instante da exportação; grava em caminho se informado"""
+        conteudo = json.dumps({'instante': time.time(), 'janela': self.janela, 'etapas': self.percentis()},
+                              ensure_ascii=False, indent=2)
+        if caminho:
+            temporario = f'{caminho}.{os.getpid()}.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                f.write(conteudo)
+            os.replace(temporario, caminho)
+        return conteudo
+
+    def limpar(self):
+        """Descarta todas as medições"""
+        with self._lock:
+            self._janelas.clear()
+            self._contagens.clear()
+
+
+# Registro do processo, compartilhado por todos os ganchos
+REGISTRO = RegistroLatencias(int(os.environ.get('LEXCARF_LATENCIA_JANELA', JANELA_PADRAO)))
+
+
+class _MedicaoGancho(_Medicao):
+    """Medição dos ganchos: vai para o registro do processo (se ativo) e para os observadores"""
+
+    __slots__ = ()
+
+    def __exit__(self, *excecao):
+        _registrar(self.etapa, time.perf_counter() - self.inicio)
+        return False
+
+
+def etapa(nome):
+    """Gancho de medição de uma etapa (vazio com o registro desligado e sem observadores)"""
+    if not _ATIVA and not _OBSERVADORES:
+        return _SEM_MEDICAO
+    return _MedicaoGancho(None, nome)
+
+
+def imprimir_percentis(percentis):
+    """Tabela de RegistroLatencias.percentis"""
+    print(f"{'etapa':<26} | {'n':>7} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'p99 (ms)':>9} | {'máx (ms)':>9}")
+    for nome, valores in percentis.items():
+        print(f"{nome:<26} | {valores['n']:>7} | {valores['p50_ms']:>9.3f} | {valores['p95_ms']:>9.3f} | "
+              f"{valores['p99_ms']:>9.3f} | {valores['max_ms']:>9.3f}")
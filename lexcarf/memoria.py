@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Medição de memória para os scripts de treinamento e benchmarks
+"""
+
+import os
+import sys
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def pico_rss_mb():
+    """Pico de memória residente (RSS) do processo em MB, ou None se indisponível"""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reporta em KB, macOS em bytes
+        return pico / 1024 ** 2 if sys.platform == 'darwin' else pico / 1024
+
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().peak_wset / 1024 ** 2
+
+
+def rss_atual_mb():
+    """Memória residente (RSS) atual do processo em MB, ou None se indisponível"""
+    try:
+        import psutil
+    except ImportError:
+        pass
+    else:
+        return psutil.Process().memory_info().rss / 1024 ** 2
+
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def memoria_compartilhada_bytes():
+    """
+    (RSS, USS, PSS) do processo em bytes, ou None se indisponível
+
+    Usa o psutil quando instalado; senão, /proc/self/smaps_rollup (Linux), em que
+    USS é a soma das páginas privadas.
+    """
+    try:
+        import psutil
+    except ImportError:
+        pass
+    else:
+        memoria = psutil.Process().memory_full_info()
+        return memoria.rss, memoria.uss, getattr(memoria, 'pss', memoria.uss)
+
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            campos = {linha.split(':')[0]: int(linha.split()[1]) * 1024 for linha in f if linha.strip().endswith('kB')}
+    except (OSError, ValueError, IndexError):
+        return None
+    return campos['Rss'], campos['Private_Clean'] + campos['Private_Dirty'], campos['Pss']
+
+
+def tamanho_matriz_mb(X):
+    """Memória ocupada por uma matriz densa ou esparsa em MB"""
+    if hasattr(X, 'tocsr'):  # matriz esparsa do scipy
+        return (X.data.nbytes + X.indices.nbytes + X.indptr.nbytes) / 1024 ** 2
+    return np.asarray(X).nbytes / 1024 ** 2
+
+
+def relatorio_memoria(etapa, X=None):
+    """Imprime o pico de RSS após uma etapa e, opcionalmente, o tamanho da matriz de features"""
+    pico = pico_rss_mb()
+    linha = f'[memória] {etapa}: pico RSS = ' + (f'{pico:.1f} MB' if pico is not None else 'indisponível')
+
+    if X is not None:
+        n_linhas, n_colunas = X.shape
+        denso_mb = n_linhas * n_colunas * 8 / 1024 ** 2
+        linha += f' | matriz {n_linhas}x{n_colunas}: {tamanho_matriz_mb(X):.1f} MB (densa float64 seria {denso_mb:.1f} MB)'
+
+    print(linha)
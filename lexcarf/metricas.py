@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas no formato texto do Prometheus
+Registro de contadores, medidores e histogramas usado pelo código de predição,
+pelos caches e pelo carregador de modelos, exposto em GET /metrics por um
+servidor HTTP local (servir_metricas) ao lado da interface ou do serviço.
+
+Contadores e histogramas não usam lock: cada thread incrementa a sua própria
+célula e a leitura soma as células, de modo que um incremento custa um
+get_ident e uma soma em lista
+"""
+
+import os
+import threading
+from bisect import bisect_left
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8503
+
+# Limites dos histogramas: latências (s), tamanhos de lote (linhas) e carga de modelos (s)
+LIMITES_SEGUNDOS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LIMITES_LOTE = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+LIMITES_CARGA = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _PorThread:
+    """Células por thread: só a thread dona escreve na sua célula, sem lock"""
+
+    def __init__(self, tamanho):
+        self._tamanho = tamanho
+        self._celulas = {}
+
+    def celula(self):
+        ident = threading.get_ident()
+        celula = self._celulas.get(ident)
+        if celula is None:
+            celula = self._celulas.setdefault(ident, [0] * self._tamanho)
+        return celula
+
+    def somar(self):
+        """Soma elemento a elemento das células (list() do dict é atômico no CPython)"""
+        total = [0] * self._tamanho
+        for celula in list(self._celulas.values()):
+            for i, valor in enumerate(celula):
+                total[i] += valor
+        return total
+
+
+class Contador:
+    """Contador monotônico"""
+
+    tipo = 'counter'
+
+    def __init__(self):
+        self._celulas = _PorThread(1)
+
+    def inc(self, valor=1):
+        self._celulas.celula()[0] += valor
+
+    def valor(self):
+        return self._celulas.somar()[0]
+
+    def amostras(self, nome, rotulos):
+        return [(nome, rotulos, self.valor())]
+
+
+class Medidor:
+    """Valor instantâneo: definido com definir() ou lido de uma função no momento da coleta"""
+
+    tipo = 'gauge'
+
+    def __init__(self, funcao=None):
+        self.funcao = funcao
+        self._valor = 0.0
+
+    def definir(self, valor):
+        self._valor = valor
+
+    def valor(self):
+        return self.funcao() if self.funcao is not None else self._valor
+
+    def amostras(self, nome, rotulos):
+        return [(nome, rotulos, self.valor())]
+
+
+class Histograma:
+    """Histograma com limites fixos (buckets 'le' cumulativos, _sum e _count)"""
+
+    tipo = 'histogram'
+
+    def __init__(self, limites=LIMITES_SEGUNDOS):
+        self.limites = tuple(limites)
+        # Uma posição por limite, +Inf, soma e contagem
+        self._celulas = _PorThread(len(self.limites) + 3)
+
+    def observar(self, valor):
+        celula = self._celulas.celula()
+        celula[bisect_left(self.limites, valor)] += 1
+        celula[-2] += valor
+        celula[-1] += 1
+
+    def amostras(self, nome, rotulos):
+        total = self._celulas.somar()
+        amostras = []
+        acumulado = 0
+        for limite, contagem in zip(self.limites + (float('inf'),), total):
+            acumulado += contagem
+            amostras.append((f'{nome}_bucket', rotulos + (('le', _formatar_numero(limite)),), acumulado))
+        amostras.append((f'{nome}_sum', rotulos, total[-2]))
+        amostras.append((f'{nome}_count', rotulos, total[-1]))
+        return amostras
+
+
+class RegistroMetricas:
+    """
+    Famílias de métricas por nome, com uma métrica por combinação de rótulos
+
+    contador/medidor/histograma criam a métrica na primeira chamada e depois
+    retornam a mesma instância (guarde-a para usar no caminho quente).
+    """
+
+    def __init__(self):
+        self._familias = {}
+        self._lock = threading.Lock()
+
+    def _obter(self, classe, nome, ajuda, rotulos, **parametros):
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            familia = self._familias.get(nome)
+            if familia is None:
+                familia = self._familias[nome] = (classe.tipo, ajuda, {})
+            elif familia[0] != classe.tipo:
+                raise ValueError(f"Métrica '{nome}' já registrada como {familia[0]}")
+            metrica = familia[2].get(chave)
+            if metrica is None:
+                metrica = familia[2][chave] = classe(**parametros)
+            return metrica
+
+    def contador(self, nome, ajuda, **rotulos):
+        return self._obter(Contador, nome, ajuda, rotulos)
+
+    def medidor(self, nome, ajuda, funcao=None, **rotulos):
+        medidor = self._obter(Medidor, nome, ajuda, rotulos)
+        if funcao is not None:
+            medidor.funcao = funcao
+        return medidor
+
+    def histograma(self, nome, ajuda, limites=LIMITES_SEGUNDOS, **rotulos):
+        return self._obter(Histograma, nome, ajuda, rotulos, limites=limites)
+
+    def texto(self):
+        """Todas as métricas no formato de exposição texto do Prometheus (0.0.4)"""
+        with self._lock:
+            familias = [(nome, tipo, ajuda, list(metricas.items()))
+                        for nome, (tipo, ajuda, metricas) in sorted(self._familias.items())]
+
+        linhas = []
+        for nome, tipo, ajuda, metricas in familias:
+            linhas.append(f'# HELP {nome} {_escapar(ajuda, ajuda=True)}')
+            linhas.append(f'# TYPE {nome} {tipo}')
+            for rotulos, metrica in metricas:
+                try:
+                    amostras = metrica.amostras(nome, rotulos)
+                except Exception:
+                    # Medidor cuja função falhou (ex.: serviço encerrado): omitido nesta coleta
+                    continue
+                for nome_amostra, rotulos_amostra, valor in amostras:
+                    linhas.append(f'{nome_amostra}{_formatar_rotulos(rotulos_amostra)} {_formatar_numero(valor)}')
+        return '\n'.join(linhas) + '\n'
+
+
+def _escapar(texto, ajuda=False):
+    texto = str(texto).replace('\\', '\\\\').replace('\n', '\\n')
+    return texto if ajuda else texto.replace('"', '\\"')
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ''
+    return '{' + ','.join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos) + '}'
+
+
+def _formatar_numero(valor):
+    if valor == float('inf'):
+        return '+Inf'
+    if isinstance(valor, int) or float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+# Registro do processo
+METRICAS = RegistroMetricas()
+
+
+def contador_predicoes(origem):
+    """Linhas previstas por origem (app, servico, lote...)"""
+    return METRICAS.contador('lexcarf_predicoes_total', 'Linhas previstas', origem=origem)
+
+
+def histograma_lote(origem):
+    """Distribuição do tamanho dos lotes de predição"""
+    return METRICAS.histograma('lexcarf_tamanho_lote', 'Linhas por lote de predição', limites=LIMITES_LOTE,
+                               origem=origem)
+
+
+def contadores_cache(cache):
+    """(acertos, falhas) das consultas a um cache de predições"""
+    return (
+        METRICAS.contador('lexcarf_cache_acertos_total', 'Consultas ao cache de predições com acerto', cache=cache),
+        METRICAS.contador('lexcarf_cache_falhas_total', 'Consultas ao cache de predições sem acerto', cache=cache),
+    )
+
+
+def histograma_carga_modelos():
+    """Tempo de carga dos modelos"""
+    return METRICAS.histograma('lexcarf_carga_modelos_segundos', 'Tempo de carga dos modelos', limites=LIMITES_CARGA)
+
+
+def contador_cargas(resultado):
+    """Cargas de modelos por resultado (ok, falha)"""
+    return METRICAS.contador('lexcarf_cargas_modelos_total', 'Cargas de modelos', resultado=resultado)
+
+
+# Observador de lexcarf.latencia que alimenta lexcarf_etapa_segundos (None com a coleta desligada)
+_OBSERVADOR = None
+
+
+def metricas_ativas():
+    """Se a latência por etapa está sendo coletada no histograma lexcarf_etapa_segundos"""
+    return _OBSERVADOR is not None
+
+
+def ativar_metricas(ativas=True):
+    """
+    Liga ou desliga a coleta de latência por etapa (lexcarf.latencia) em lexcarf_etapa_segundos
+
+    Os contadores são sempre incrementados; a latência por etapa só é medida
+    com a coleta ligada (servir_metricas liga).
+    """
+    global _OBSERVADOR
+    from lexcarf.latencia import adicionar_observador, remover_observador
+
+    if not ativas:
+        if _OBSERVADOR is not None:
+            remover_observador(_OBSERVADOR)
+            _OBSERVADOR = None
+        return
+    if _OBSERVADOR is not None:
+        return
+
+    histogramas = {}
+
+    def observar(etapa, segundos):
+        histograma = histogramas.get(etapa)
+        if histograma is None:
+            histograma = histogramas[etapa] = METRICAS.histograma(
+                'lexcarf_etapa_segundos', 'Latência por etapa da predição (predict_proba_<modelo> por modelo)',
+                etapa=etapa
+            )
+        histograma.observar(segundos)
+
+    adicionar_observador(observar)
+    _OBSERVADOR = observar
+
+
+def servir_metricas(porta=PORTA_PADRAO, host=HOST_PADRAO, registro=None):
+    """
+    Inicia o servidor HTTP de métricas (GET /metrics) em uma thread daemon
+
+    Retorna o servidor (servidor.server_address tem a porta real se porta=0).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    registro = registro if registro is not None else METRICAS
+
+    class ManipuladorMetricas(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            corpo = registro.texto().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorMetricas)
+    servidor.daemon_threads = True
+    threading.Thread(target=servidor.serve_forever, name='lexcarf-metricas', daemon=True).start()
+    ativar_metricas()
+    return servidor
+
+
+def porta_metricas_ambiente():
+    """Porta em LEXCARF_METRICAS_PORTA, ou None (servidor de métricas desligado)"""
+    valor = os.environ.get('LEXCARF_METRICAS_PORTA')
+    return int(valor) if valor else None
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo conjunto de provimento e votação
+Uma única floresta sobre o espaço de rótulos combinado ('Provido Total|Unânime',
+'Negado', ...) prevê as duas saídas em uma só travessia das árvores: a
+probabilidade de provimento é a soma sobre as votações e a de votação é
+condicionada aos rótulos que têm votação (casos de provimento). Como a floresta
+tem uma única saída, pode ser compilada (lexcarf.floresta) e gravada no pacote
+"""
+
+import pickle
+import time
+
+import numpy as np
+
+SEPARADOR = '|'
+
+# Hiperparâmetros das florestas de train_model_2023_2024.py
+PARAMETROS_FLORESTA = dict(
+    n_estimators=100,
+    max_depth=20,
+    min_samples_split=5,
+    min_samples_leaf=2,
+    random_state=42,
+    class_weight='balanced'
+)
+
+
+def combinar_rotulos(provimento, votacao):
+    """Rótulos combinados 'provimento|votação' (só 'provimento' quando não há votação)"""
+    return np.array([
+        f'{p}{SEPARADOR}{v}' if isinstance(v, str) else str(p)
+        for p, v in zip(provimento, votacao)
+    ], dtype=object)
+
+
+class ModeloConjunto:
+    """
+    Floresta única para provimento e votação
+
+    floresta: classificador (sklearn ou FlorestaCompilada) treinado nos rótulos de combinar_rotulos.
+    predict_proba(X) retorna (prob_provimento, prob_votacao), nas ordens de
+    classes_provimento e classes_votacao.
+    """
+
+    def __init__(self, floresta):
+        self.floresta = floresta
+        partes = [str(rotulo).split(SEPARADOR, 1) for rotulo in floresta.classes_]
+
+        self.classes_provimento = np.array(sorted({parte[0] for parte in partes}), dtype=object)
+        self.classes_votacao = np.array(sorted({parte[1] for parte in partes if len(parte) == 2}), dtype=object)
+
+        # Matrizes que somam as colunas combinadas em cada classe marginal
+        self._para_provimento = np.zeros((len(partes), len(self.classes_provimento)))
+        self._para_votacao = np.zeros((len(partes), len(self.classes_votacao)))
+        indice_provimento = {classe: i for i, classe in enumerate(self.classes_provimento)}
+        indice_votacao = {classe: i for i, classe in enumerate(self.classes_votacao)}
+        for coluna, parte in enumerate(partes):
+            self._para_provimento[coluna, indice_provimento[parte[0]]] = 1.0
+            if len(parte) == 2:
+                self._para_votacao[coluna, indice_votacao[parte[1]]] = 1.0
+
+    @classmethod
+    def treinar(cls, X, provimento, votacao, **parametros):
+        """Treina a floresta conjunta (mesmos hiperparâmetros das florestas separadas por padrão)"""
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.utils.class_weight import compute_sample_weight
+
+        parametros = dict(PARAMETROS_FLORESTA, **parametros)
+        sample_weight = None
+        if parametros.get('class_weight') == 'balanced':
+            # 'balanced' sobre os rótulos combinados infla as combinações raras (ex.: 'Provido Total|Empate')
+            # e desloca o provimento para Provido; balanceia-se só o provimento, como no modelo separado
+            parametros['class_weight'] = None
+            sample_weight = compute_sample_weight('balanced', np.asarray(provimento, dtype=object).astype(str))
+
+        floresta = RandomForestClassifier(**parametros)
+        floresta.fit(X, combinar_rotulos(provimento, votacao), sample_weight=sample_weight)
+        return cls(floresta)
+
+    def compilar(self):
+        """Mesmo modelo sobre a floresta compilada (lexcarf.floresta)"""
+        from lexcarf.floresta import FlorestaCompilada, compilar_floresta
+
+        if isinstance(self.floresta, FlorestaCompilada):
+            return self
+        return type(self)(compilar_floresta(self.floresta))
+
+    def predict_proba(self, X):
+        """(prob_provimento, prob_votacao) com uma única avaliação da floresta"""
+        conjunta = self.floresta.predict_proba(X)
+        prob_provimento = conjunta @ self._para_provimento
+
+        # Votação condicionada a haver provimento; sem massa em rótulos com votação, distribuição uniforme
+        massa_votacao = conjunta @ self._para_votacao
+        total = massa_votacao.sum(axis=1, keepdims=True)
+        prob_votacao = np.divide(massa_votacao, total, out=np.full_like(massa_votacao, 1.0 / max(len(self.classes_votacao), 1)),
+                                 where=total > 0)
+        return prob_provimento, prob_votacao
+
+    def predict(self, X):
+        """(provimento, votação) mais prováveis para cada linha"""
+        prob_provimento, prob_votacao = self.predict_proba(X)
+        return self.classes_provimento[np.argmax(prob_provimento, axis=1)], \
+            self.classes_votacao[np.argmax(prob_votacao, axis=1)]
+
+
+def _metricas(y_verdadeiro, y_previsto):
+    from sklearn.metrics import accuracy_score, f1_score
+
+    return {
+        'acuracia': float(accuracy_score(y_verdadeiro, y_previsto)),
+        'f1_macro': float(f1_score(y_verdadeiro, y_previsto, average='macro', zero_division=0)),
+    }
+
+
+def _latencias(prever, X, n_linhas=200, repeticoes=3):
+    """(ms por linha individual, ms do lote inteiro), melhor de algumas repetições"""
+    linhas = [X[i] for i in range(min(n_linhas, X.shape[0]))]
+    individual = lote = float('inf')
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for linha in linhas:
+            prever(linha)
+        individual = min(individual, (time.perf_counter() - inicio) / len(linhas))
+        inicio = time.perf_counter()
+        prever(X)
+        lote = min(lote, time.perf_counter() - inicio)
+    return individual * 1000, lote * 1000
+
+
+def comparar_com_modelos_separados(X_treino, provimento_treino, votacao_treino, X_teste, provimento_teste,
+                                   votacao_teste, model_provimento=None, model_votacao=None, tempo_treino_separados=None):
+    """
+    Relatório de acurácia, tempo de treino, tamanho e latência: duas florestas vs. modelo conjunto
+
+    votacao_*: alvo de votação por linha (None/NaN quando não se aplica). As florestas
+    separadas são treinadas aqui se não forem informadas (votação só nas linhas com alvo);
+    nesse caso, tempo_treino_separados (s) é o tempo de treino informado no relatório.
+    Retorna (relatorio, modelo_conjunto).
+    """
+    from sklearn.ensemble import RandomForestClassifier
+
+    votacao_treino = np.asarray(votacao_treino, dtype=object)
+    votacao_teste = np.asarray(votacao_teste, dtype=object)
+    com_votacao_treino = np.array([isinstance(v, str) for v in votacao_treino])
+    com_votacao_teste = np.array([isinstance(v, str) for v in votacao_teste])
+
+    tempos = {}
+    inicio = time.perf_counter()
+    if model_provimento is None:
+        model_provimento = RandomForestClassifier(**PARAMETROS_FLORESTA).fit(X_treino, provimento_treino)
+    if model_votacao is None:
+        model_votacao = RandomForestClassifier(**PARAMETROS_FLORESTA).fit(
+            X_treino[np.flatnonzero(com_votacao_treino)], votacao_treino[com_votacao_treino].astype(str)
+        )
+    tempos['separados'] = time.perf_counter() - inicio if tempo_treino_separados is None else tempo_treino_separados
+
+    inicio = time.perf_counter()
+    conjunto = ModeloConjunto.treinar(X_treino, provimento_treino, votacao_treino)
+    tempos['conjunto'] = time.perf_counter() - inicio
+
+    X_votacao = X_teste[np.flatnonzero(com_votacao_teste)]
+    y_votacao = votacao_teste[com_votacao_teste].astype(str)
+    previsto_provimento, _ = conjunto.predict(X_teste)
+    _, previsto_votacao = conjunto.predict(X_votacao) if len(y_votacao) else (None, [])
+
+    separados_compilados = (model_provimento, model_votacao)
+    try:
+        from lexcarf.floresta import compilar_floresta
+        separados_compilados = (compilar_floresta(model_provimento), compilar_floresta(model_votacao))
+    except ValueError:
+        pass
+    conjunto_compilado = conjunto.compilar()
+
+    def prever_separados(modelos):
+        return lambda X: (modelos[0].predict_proba(X), modelos[1].predict_proba(X))
+
+    relatorio = {}
+    for nome, modelos, prever, compilado in [
+        ('separados', (model_provimento, model_votacao), prever_separados((model_provimento, model_votacao)),
+         prever_separados(separados_compilados)),
+        ('conjunto', (conjunto.floresta,), conjunto.predict_proba, conjunto_compilado.predict_proba),
+    ]:
+        if nome == 'separados':
+            provimento_previsto = model_provimento.predict(X_teste)
+            votacao_prevista = model_votacao.predict(X_votacao) if len(y_votacao) else []
+        else:
+            provimento_previsto, votacao_prevista = previsto_provimento, previsto_votacao
+
+        latencia_linha, latencia_lote = _latencias(prever, X_teste)
+        latencia_linha_compilada, latencia_lote_compilada = _latencias(compilado, X_teste)
+        relatorio[nome] = {
+            'provimento': _metricas(provimento_teste, provimento_previsto),
+            'votacao': _metricas(y_votacao, votacao_prevista) if len(y_votacao) else None,
+            'treino_s': tempos[nome],
+            'arvores': sum(len(modelo.estimators_) for modelo in modelos),
+            'nos': sum(arvore.tree_.node_count for modelo in modelos for arvore in modelo.estimators_),
+            'tamanho_mb': sum(len(pickle.dumps(modelo, protocol=pickle.HIGHEST_PROTOCOL)) for modelo in modelos) / 1024 ** 2,
+            'latencia_linha_ms': latencia_linha,
+            'latencia_lote_ms': latencia_lote,
+            'latencia_linha_compilada_ms': latencia_linha_compilada,
+            'latencia_lote_compilada_ms': latencia_lote_compilada,
+        }
+
+    relatorio['n_treino'] = int(X_treino.shape[0])
+    relatorio['n_teste'] = int(X_teste.shape[0])
+    relatorio['n_teste_votacao'] = int(len(y_votacao))
+    return relatorio, conjunto
+
+
+def imprimir_comparacao(relatorio):
+    """Tabela do relatório de comparar_com_modelos_separados"""
+    separados, conjunto = relatorio['separados'], relatorio['conjunto']
+    linhas = [
+        ('Provimento - acurácia', 'provimento', 'acuracia', '{:.1%}'),
+        ('Provimento - F1 macro', 'provimento', 'f1_macro', '{:.3f}'),
+        ('Votação - acurácia', 'votacao', 'acuracia', '{:.1%}'),
+        ('Votação - F1 macro', 'votacao', 'f1_macro', '{:.3f}'),
+        ('Treino (s)', None, 'treino_s', '{:.1f}'),
+        ('Árvores', None, 'arvores', '{}'),
+        ('Nós', None, 'nos', '{:,}'),
+        ('Tamanho pickle (MB)', None, 'tamanho_mb', '{:.1f}'),
+        ('Linha sklearn (ms)', None, 'latencia_linha_ms', '{:.2f}'),
+        ('Lote sklearn (ms)', None, 'latencia_lote_ms', '{:.1f}'),
+        ('Linha compilada (ms)', None, 'latencia_linha_compilada_ms', '{:.3f}'),
+        ('Lote compilado (ms)', None, 'latencia_lote_compilada_ms', '{:.1f}'),
+    ]
+
+    print(f"Treino: {relatorio['n_treino']:,} | teste: {relatorio['n_teste']:,} "
+          f"(votação: {relatorio['n_teste_votacao']:,})")
+    print(f"{'':<24} | {'duas florestas':>14} | {'conjunto':>10}")
+    for rotulo, grupo, chave, formato in linhas:
+        valores = []
+        for modelo in (separados, conjunto):
+            origem = modelo[grupo] if grupo else modelo
+            valores.append(formato.format(origem[chave]) if origem is not None else '-')
+        print(f"{rotulo:<24} | {valores[0]:>14} | {valores[1]:>10}")
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Carregamento dos modelos 2023/2024 (provimento, votação e pré-processadores)
+Além dos pickles do sklearn, as florestas podem ser exportadas já compiladas
+em arquivos mapeáveis em memória, compartilhados entre processos, ou junto com
+os pré-processadores em um pacote único (lexcarf.pacote), preferido quando existe
+"""
+
+import os
+import pickle
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIR_MODELOS = os.path.join(BASE_DIR, 'modelos')
+
+ARQUIVOS_2023 = {
+    'provimento': 'modelo_carf_provimento_2023.pkl',
+    'votacao': 'modelo_carf_votacao_2023.pkl',
+    'preprocessors': 'preprocessors_2023.pkl',
+}
+
+# Pré-processadores sem pickle (featurizador.salvar_preprocessors_compactos), preferidos ao .pkl
+ARQUIVO_PREPROCESSORS_COMPACTOS_2023 = 'preprocessors_2023.npz'
+
+# Florestas compiladas (lexcarf.floresta), sem compressão, para joblib.load(mmap_mode='r')
+ARQUIVOS_FLORESTAS_2023 = {
+    'provimento': 'modelo_carf_provimento_2023_compilado.joblib',
+    'votacao': 'modelo_carf_votacao_2023_compilado.joblib',
+}
+
+# Pacotes únicos (lexcarf.pacote) com modelos e pré-processadores, por conjunto de modelos
+PACOTES = {
+    '2023': 'modelo_carf_2023.pacote',
+    'rf': 'modelo_carf_rf.pacote',
+    'expandido': 'modelo_carf_expandido.pacote',
+}
+
+
+def compilar_ambiente():
+    """
+    LEXCARF_FLORESTA_COMPILADA: '1' usa as florestas compiladas, '0' as do sklearn
+    (pickles, mesmo com o pacote); ausente, None (pacote se existir, senão pickles)
+    """
+    valor = os.environ.get('LEXCARF_FLORESTA_COMPILADA')
+    return None if not valor else valor != '0'
+
+
+def mmap_ambiente():
+    """
+    LEXCARF_MMAP: '1' força o mapeamento (sem pacote, das florestas exportadas),
+    '0' lê os arrays para a memória; ausente, None (pacote mapeado, pickles sem mmap)
+    """
+    valor = os.environ.get('LEXCARF_MMAP')
+    return None if not valor else valor != '0'
+
+
+def caminho_pacote(nome, dir_modelos=DIR_MODELOS):
+    """Caminho completo do pacote de um conjunto de modelos ('2023', 'rf', 'expandido')"""
+    return os.path.join(dir_modelos, PACOTES[nome])
+
+
+def caminhos_modelos_2023(dir_modelos=DIR_MODELOS):
+    """Caminhos completos dos três arquivos de modelo"""
+    return {nome: os.path.join(dir_modelos, arquivo) for nome, arquivo in ARQUIVOS_2023.items()}
+
+
+def caminhos_florestas_2023(dir_modelos=DIR_MODELOS):
+    """Caminhos completos das florestas compiladas"""
+    return {nome: os.path.join(dir_modelos, arquivo) for nome, arquivo in ARQUIVOS_FLORESTAS_2023.items()}
+
+
+def exportar_florestas_2023(dir_modelos=DIR_MODELOS, model_provimento=None, model_votacao=None):
+    """Compila as florestas (carregadas dos pickles, se não informadas) e grava os arquivos mapeáveis"""
+    import joblib
+
+    from lexcarf.floresta import compilar_floresta, salvar_floresta
+
+    caminhos = caminhos_modelos_2023(dir_modelos)
+    modelos = {
+        'provimento': model_provimento if model_provimento is not None else joblib.load(caminhos['provimento']),
+        'votacao': model_votacao if model_votacao is not None else joblib.load(caminhos['votacao']),
+    }
+
+    destinos = caminhos_florestas_2023(dir_modelos)
+    for nome, modelo in modelos.items():
+        salvar_floresta(compilar_floresta(modelo), destinos[nome])
+    return destinos
+
+
+def exportar_pacote_2023(dir_modelos=DIR_MODELOS, model_provimento=None, model_votacao=None, preprocessors=None,
+                         metadados=None, destino=None):
+    """Grava o pacote 2023 (carregando dos pickles o que não for informado); retorna o caminho"""
+    import joblib
+
+    from lexcarf.pacote import salvar_pacote
+
+    caminhos = caminhos_modelos_2023(dir_modelos)
+    if model_provimento is None:
+        model_provimento = joblib.load(caminhos['provimento'])
+    if model_votacao is None:
+        model_votacao = joblib.load(caminhos['votacao'])
+    if preprocessors is None:
+        preprocessors = carregar_preprocessors_2023(dir_modelos)
+
+    destino = destino or caminho_pacote('2023', dir_modelos)
+    salvar_pacote(
+        destino, {'provimento': model_provimento, 'votacao': model_votacao}, preprocessors,
+        metadados=dict(metadados or {}, conjunto='2023', treino='2023', teste='2024')
+    )
+    return destino
+
+
+def caminhos_monitorados_2023(dir_modelos=DIR_MODELOS):
+    """Todos os arquivos dos quais os modelos 2023 podem ser lidos (para detectar novas versões)"""
+    return [
+        caminho_pacote('2023', dir_modelos),
+        os.path.join(dir_modelos, ARQUIVO_PREPROCESSORS_COMPACTOS_2023),
+    ] + list(caminhos_modelos_2023(dir_modelos).values())
+
+
+def carregar_preprocessors_2023(dir_modelos=DIR_MODELOS):
+    """Pacote de pré-processadores 2023 (o .npz sem pickle, se existir, ou o .pkl)"""
+    compactos = os.path.join(dir_modelos, ARQUIVO_PREPROCESSORS_COMPACTOS_2023)
+    if os.path.exists(compactos):
+        from lexcarf.featurizador import carregar_preprocessors_compactos
+        return carregar_preprocessors_compactos(compactos)
+
+    with open(caminhos_modelos_2023(dir_modelos)['preprocessors'], 'rb') as f:
+        return pickle.load(f)
+
+
+def carregar_modelos_2023(dir_modelos=DIR_MODELOS, compilar=None, mmap=None, pacote=True):
+    """
+    Retorna (model_provimento, model_votacao, preprocessors)
+
+    Se o pacote 2023 existir (e pacote=True) ele é lido, com as florestas já
+    compiladas e os arrays mapeados em memória (somente leitura, compartilhados
+    entre os processos); mmap=False os lê para a memória de cada processo.
+    compilar=False ignora o pacote e usa as florestas do sklearn dos pickles.
+    Sem o pacote, com compilar=True as florestas dos pickles são convertidas para
+    FlorestaCompilada e com mmap=True são lidas as florestas compiladas exportadas
+    por exportar_florestas_2023, mapeadas em memória (somente leitura).
+    """
+    if compilar is False and mmap:
+        raise ValueError("mmap=True exige florestas compiladas; não combine com compilar=False")
+
+    caminho = caminho_pacote('2023', dir_modelos)
+    if pacote and compilar is not False and os.path.exists(caminho):
+        from lexcarf.pacote import carregar_pacote
+        modelos, preprocessors, _ = carregar_pacote(caminho, mmap=mmap is not False)
+        return modelos['provimento'], modelos['votacao'], preprocessors
+
+    preprocessors = carregar_preprocessors_2023(dir_modelos)
+
+    if mmap:
+        from lexcarf.floresta import carregar_floresta
+
+        caminhos = caminhos_florestas_2023(dir_modelos)
+        faltando = [caminho for caminho in caminhos.values() if not os.path.exists(caminho)]
+        if faltando:
+            raise FileNotFoundError(
+                f"Florestas compiladas não encontradas: {faltando}. "
+                "Execute: python scripts/exportar_florestas.py"
+            )
+        return carregar_floresta(caminhos['provimento']), carregar_floresta(caminhos['votacao']), preprocessors
+
+    import joblib
+
+    caminhos = caminhos_modelos_2023(dir_modelos)
+    model_provimento = joblib.load(caminhos['provimento'])
+    model_votacao = joblib.load(caminhos['votacao'])
+
+    if compilar:
+        from lexcarf.floresta import compilar_floresta
+        model_provimento = compilar_floresta(model_provimento)
+        model_votacao = compilar_floresta(model_votacao)
+
+    return model_provimento, model_votacao, preprocessors
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Pacote único e versionado de modelos
+Um arquivo com as florestas compiladas, o vocabulário e o idf do TF-IDF, os
+encoders e os nomes das features. Layout:
+
+    MAGICO (8 bytes) | tamanho do manifesto (uint64) | manifesto JSON | arrays
+
+Os arrays são gravados sem compressão, cada um alinhado em 64 bytes, e o
+manifesto guarda dtype, formato e posição de cada um; assim a leitura é só
+o JSON mais np.memmap sobre o próprio arquivo, sem pickle
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+MAGICO = b'LEXCARF\x01'
+VERSAO_FORMATO = 1
+ALINHAMENTO = 64
+EXTENSAO = '.pacote'
+
+_CABECALHO = struct.Struct('<8sQ')
+
+# Campos de FlorestaCompilada gravados como arrays
+ARRAYS_FLORESTA = ('esquerda', 'direita', 'feature', 'threshold', 'prob_nos', 'raizes')
+
+
+def _alinhar(posicao):
+    return (posicao + ALINHAMENTO - 1) // ALINHAMENTO * ALINHAMENTO
+
+
+def escrever_pacote(caminho, manifesto, arrays):
+    """
+    Grava o manifesto (dict JSON) e os arrays nomeados em um único arquivo
+
+    O manifesto recebe a seção 'arrays' (dtype, formato, posição) e a 'versao',
+    um hash do conteúdo. A gravação usa arquivo temporário + os.replace.
+    """
+    arrays = {nome: np.ascontiguousarray(array) for nome, array in arrays.items()}
+    for nome, array in arrays.items():
+        if array.dtype.hasobject:
+            raise ValueError(f"Array '{nome}' com dtype object não pode ser gravado no pacote")
+
+    hash_conteudo = hashlib.blake2b(digest_size=8)
+    for nome in sorted(arrays):
+        hash_conteudo.update(nome.encode('utf-8'))
+        hash_conteudo.update(arrays[nome].tobytes())
+    hash_conteudo.update(json.dumps(manifesto, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+
+    manifesto = dict(manifesto, formato=VERSAO_FORMATO, versao=hash_conteudo.hexdigest())
+
+    # As posições dependem do tamanho do manifesto, que depende das posições:
+    # reserva espaço até o tamanho se estabilizar
+    reserva = 0
+    while True:
+        posicao = _alinhar(_CABECALHO.size + reserva)
+        descricao = {}
+        for nome, array in arrays.items():
+            descricao[nome] = {'dtype': array.dtype.str, 'formato': list(array.shape), 'posicao': posicao}
+            posicao = _alinhar(posicao + array.nbytes)
+        conteudo = json.dumps(dict(manifesto, arrays=descricao), ensure_ascii=False).encode('utf-8')
+        if len(conteudo) <= reserva:
+            break
+        reserva = len(conteudo) + 256
+
+    temporario = f'{caminho}.{os.getpid()}.tmp'
+    with open(temporario, 'wb') as f:
+        f.write(_CABECALHO.pack(MAGICO, reserva))
+        f.write(conteudo.ljust(reserva, b' '))
+        for nome, array in arrays.items():
+            f.seek(descricao[nome]['posicao'])
+            f.write(array.tobytes())
+        f.truncate(_alinhar(f.tell()))
+    os.replace(temporario, caminho)
+    return manifesto['versao']
+
+
+def ler_manifesto(caminho):
+    """Só o manifesto JSON do pacote (metadados, versão e descrição dos arrays)"""
+    with open(caminho, 'rb') as f:
+        magico, tamanho = _CABECALHO.unpack(f.read(_CABECALHO.size))
+        if magico != MAGICO:
+            raise ValueError(f"{caminho} não é um pacote de modelos LexCARF")
+        manifesto = json.loads(f.read(tamanho).decode('utf-8'))
+
+    if manifesto.get('formato') != VERSAO_FORMATO:
+        raise ValueError(f"Formato de pacote {manifesto.get('formato')} não suportado (esperado {VERSAO_FORMATO})")
+    return manifesto
+
+
+def ler_pacote(caminho, mmap=True):
+    """
+    Retorna (manifesto, arrays)
+
+    Com mmap=True os arrays são visões somente leitura do arquivo mapeado em
+    memória (compartilhadas entre processos); com mmap=False são lidos para a memória.
+    """
+    manifesto = ler_manifesto(caminho)
+    arrays = {}
+
+    if mmap:
+        mapa = np.memmap(caminho, dtype=np.uint8, mode='r')
+        for nome, info in manifesto['arrays'].items():
+            dtype = np.dtype(info['dtype'])
+            n_bytes = int(np.prod(info['formato'], dtype=np.int64)) * dtype.itemsize
+            bruto = np.asarray(mapa[info['posicao']:info['posicao'] + n_bytes])
+            arrays[nome] = bruto.view(dtype).reshape(info['formato'])
+    else:
+        with open(caminho, 'rb') as f:
+            for nome, info in manifesto['arrays'].items():
+                dtype = np.dtype(info['dtype'])
+                f.seek(info['posicao'])
+                arrays[nome] = np.fromfile(f, dtype=dtype, count=int(np.prod(info['formato'], dtype=np.int64)))
+                arrays[nome] = arrays[nome].reshape(info['formato'])
+
+    return manifesto, arrays
+
+
+def salvar_pacote(caminho, modelos, preprocessors, metadados=None):
+    """
+    Grava modelos (dict nome -> floresta) e pré-processadores em um pacote
+
+    Florestas do sklearn são compiladas (lexcarf.floresta) antes da gravação.
+    Retorna a versão (hash do conteúdo) gravada no manifesto.
+    """
+    from lexcarf.featurizador import obter_featurizador
+    from lexcarf.floresta import FlorestaCompilada, compilar_floresta
+
+    arrays = {}
+    descricao_modelos = {}
+    for nome, modelo in modelos.items():
+        floresta = modelo if isinstance(modelo, FlorestaCompilada) else compilar_floresta(modelo)
+        for campo in ARRAYS_FLORESTA:
+            arrays[f'modelos/{nome}/{campo}'] = getattr(floresta, campo)
+        descricao_modelos[nome] = {
+            'classes': np.asarray(floresta.classes_).tolist(),
+            'profundidade': int(floresta.profundidade),
+            'n_features': int(floresta.n_features_in_),
+            'n_arvores': int(floresta.n_arvores),
+        }
+
+    config_featurizador, arrays_featurizador = obter_featurizador(preprocessors).exportar()
+    for nome, array in arrays_featurizador.items():
+        arrays[f'featurizador/{nome}'] = array
+
+    manifesto = {
+        'metadados': dict(metadados or {}, criado_em=time.strftime('%Y-%m-%dT%H:%M:%S')),
+        'modelos': descricao_modelos,
+        'featurizador': config_featurizador,
+    }
+    return escrever_pacote(caminho, manifesto, arrays)
+
+
+def construir_florestas(manifesto, arrays):
+    """Dict nome -> FlorestaCompilada sobre os arrays lidos por ler_pacote (na ordem gravada)"""
+    from lexcarf.floresta import FlorestaCompilada
+
+    modelos = {}
+    for nome, info in manifesto['modelos'].items():
+        modelos[nome] = FlorestaCompilada(
+            **{campo: arrays[f'modelos/{nome}/{campo}'] for campo in ARRAYS_FLORESTA},
+            profundidade=info['profundidade'],
+            classes=np.array(info['classes']),
+            n_features=info['n_features']
+        )
+    return modelos
+
+
+def arrays_featurizador(arrays):
+    """Arrays do featurizador (idf), sem o prefixo 'featurizador/'"""
+    return {nome.split('/', 1)[1]: array for nome, array in arrays.items() if nome.startswith('featurizador/')}
+
+
+def carregar_pacote(caminho, mmap=True):
+    """
+    Retorna (modelos, preprocessors, manifesto)
+
+    modelos é um dict nome -> FlorestaCompilada na ordem em que foram gravados;
+    preprocessors é o mesmo dict das aplicações, já com o featurizador de obter_featurizador.
+    """
+    from lexcarf.featurizador import Featurizador
+
+    manifesto, arrays = ler_pacote(caminho, mmap=mmap)
+    featurizador = Featurizador.de_exportacao(manifesto['featurizador'], arrays_featurizador(arrays))
+    return construir_florestas(manifesto, arrays), featurizador.para_memoria(), manifesto
+
+
+def carregar_modelos_pacote(caminho_pacote, caminhos_legados=(), mmap=True):
+    """
+    Tupla (modelos..., preprocessors) do pacote ou, se ele não existir, dos arquivos antigos
+
+    Os arquivos antigos (joblib/pickle) devem estar na mesma ordem: modelos e por último os pré-processadores.
+    """
+    if os.path.exists(caminho_pacote) or not caminhos_legados:
+        modelos, preprocessors, _ = carregar_pacote(caminho_pacote, mmap=mmap)
+        return tuple(modelos.values()) + (preprocessors,)
+
+    import joblib
+    return tuple(joblib.load(caminho) for caminho in caminhos_legados)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Perfil do tempo de partida dos pontos de entrada
+Executa cada ponto de entrada em um processo novo com `python -X importtime`
+e resume o tempo gasto em imports por pacote, para encontrar módulos pesados
+carregados sem necessidade (python run.py --profile-startup)
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código executado para cada ponto de entrada; scripts rodam só o nível de módulo (sem main)
+ENTRADAS = {
+    'app': "import runpy; runpy.run_path('aplicacoes/app_2023_2024.py', run_name='partida')",
+    'demo': "import runpy; runpy.run_path('aplicacoes/demo_2023_2024.py', run_name='partida')",
+    'servir': "import lexcarf.servico",
+    'pontuar': "import lexcarf.pontuacao",
+    'prever': "import lexcarf.inferencia",
+    'treino': "import runpy; runpy.run_path('notebooks/train_model_2023_2024.py', run_name='partida')",
+}
+
+# Módulos que não deveriam ser carregados antes de serem usados
+MODULOS_PESADOS = ('pandas', 'scipy', 'sklearn', 'joblib', 'streamlit', 'plotly', 'matplotlib', 'seaborn')
+
+_LINHA_IMPORTTIME = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+
+def _programa(codigo):
+    return (
+        "import sys, warnings; warnings.filterwarnings('ignore'); sys.path.insert(0, %r)\n%s\n"
+        "print(' '.join(sorted(sys.modules)))\n"
+    ) % (BASE_DIR, codigo)
+
+
+def _executar(argumentos, codigo):
+    ambiente = dict(os.environ, STREAMLIT_LOG_LEVEL='error')
+    return subprocess.run([sys.executable] + argumentos + ['-c', _programa(codigo)], cwd=BASE_DIR,
+                          capture_output=True, text=True, env=ambiente)
+
+
+def medir_partida(codigo):
+    """(tempo de parede do processo em s, nomes dos módulos carregados) de um processo novo"""
+    inicio = time.perf_counter()
+    resultado = _executar([], codigo)
+    tempo = time.perf_counter() - inicio
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1] if resultado.stderr.strip() else 'falha na partida')
+    return tempo, resultado.stdout.split('\n')[-2].split()
+
+
+def perfil_importacao(codigo):
+    """
+    Registros de `-X importtime` de um processo novo
+
+    Cada registro é (módulo, tempo próprio em µs, tempo acumulado em µs, nível de aninhamento);
+    retorna também o log bruto.
+    """
+    resultado = _executar(['-X', 'importtime'], codigo)
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1] if resultado.stderr.strip() else 'falha na partida')
+
+    registros = []
+    for linha in resultado.stderr.splitlines():
+        encontrado = _LINHA_IMPORTTIME.match(linha)
+        if encontrado:
+            proprio, acumulado, recuo, modulo = encontrado.groups()
+            registros.append((modulo, int(proprio), int(acumulado), (len(recuo) - 1) // 2))
+    return registros, resultado.stderr
+
+
+def tempo_por_pacote(registros):
+    """
+    Tempo acumulado (µs) atribuído a cada pacote raiz
+
+    Soma o tempo acumulado dos pontos em que o pacote é importado a partir de
+    outro pacote (ou do nível mais externo); um pacote importado por outro,
+    como o pandas pelo lexcarf, aparece nos dois.
+    """
+    totais = {}
+    raizes_por_nivel = []
+    # O -X importtime lista os filhos antes do pai: percorrendo ao contrário, o pai vem primeiro
+    for modulo, _, acumulado, nivel in reversed(registros):
+        pacote = modulo.split('.')[0]
+        del raizes_por_nivel[nivel:]
+        if not raizes_por_nivel or raizes_por_nivel[-1] != pacote:
+            totais[pacote] = totais.get(pacote, 0) + acumulado
+        raizes_por_nivel.append(pacote)
+    return sorted(totais.items(), key=lambda item: item[1], reverse=True)
+
+
+def main(argv=None, prog=None):
+    """Linha de comando: perfil de imports dos pontos de entrada"""
+    parser = argparse.ArgumentParser(prog=prog, description='Perfil do tempo de partida (python -X importtime)')
+    parser.add_argument('entradas', nargs='*', metavar='entrada',
+                        help=f"Pontos de entrada ({', '.join(ENTRADAS)}; padrão: todos)")
+    parser.add_argument('--top', type=int, default=8, help='Pacotes listados por ponto de entrada')
+    parser.add_argument('--log', help='Grava o log bruto de -X importtime neste arquivo')
+    args = parser.parse_args(argv)
+    desconhecidas = [nome for nome in args.entradas if nome not in ENTRADAS]
+    if desconhecidas:
+        parser.error(f"Pontos de entrada desconhecidos: {desconhecidas} (opções: {', '.join(ENTRADAS)})")
+
+    logs = []
+    for nome in args.entradas or list(ENTRADAS):
+        tempo, modulos = medir_partida(ENTRADAS[nome])
+        registros, log = perfil_importacao(ENTRADAS[nome])
+        logs.append(f'# {nome}\n{log}')
+        pesados = [modulo for modulo in MODULOS_PESADOS if modulo in modulos]
+
+        print(f"\n{nome}: {tempo * 1000:.0f} ms até o fim dos imports, {len(modulos)} módulos"
+              f" | pesados: {', '.join(pesados) or 'nenhum'}")
+        print(f"   {'pacote':<24} {'acumulado (ms)':>14}")
+        for pacote, acumulado in tempo_por_pacote(registros)[:args.top]:
+            print(f"   {pacote:<24} {acumulado / 1000:>14.1f}")
+
+    if args.log:
+        with open(args.log, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(logs))
+        print(f"\nLog de -X importtime gravado em {args.log}")
+
+
+if __name__ == "__main__":
+    main()
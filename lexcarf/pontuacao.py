@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Pontuação de arquivos CSV em blocos
+Lê o CSV de entrada com pd.read_csv(chunksize=...), prevê cada bloco em lote
+e acrescenta as probabilidades de provimento/votação ao arquivo de saída
+à medida que avança, de modo que a memória não cresce com o tamanho da entrada.
+Opcionalmente os blocos são distribuídos entre vários processos, cada um com
+sua cópia dos modelos, mantendo a ordem das linhas na saída
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import time
+from collections import deque
+
+import pandas as pd
+
+from lexcarf.featurizador import COLUNAS_ENTRADA
+from lexcarf.memoria import pico_rss_mb
+from lexcarf.predicao import limiar_votacao_ambiente, prever_probabilidades_lote
+
+TAMANHO_BLOCO_PADRAO = 5000
+
+
+def caminho_saida_padrao(caminho_entrada):
+    """'dados/x.csv' -> 'dados/x_predicoes.csv'"""
+    raiz, _ = os.path.splitext(caminho_entrada)
+    return f'{raiz}_predicoes.csv'
+
+
+def pontuar_blocos(blocos, model_provimento, model_votacao, preprocessors, colunas=None, limiar_votacao=None):
+    """Gera cada bloco com as colunas de probabilidade acrescentadas"""
+    for bloco in blocos:
+        probabilidades = prever_probabilidades_lote(
+            bloco, model_provimento, model_votacao, preprocessors, limiar_votacao=limiar_votacao
+        )
+        if colunas is not None:
+            bloco = bloco[colunas]
+        yield pd.concat([bloco, probabilidades], axis=1)
+
+
+# Modelos e limiar da cascata de votação, definidos uma vez por processo do pool (ver _inicializar_trabalhador)
+_MODELOS_TRABALHADOR = None
+_LIMIAR_VOTACAO_TRABALHADOR = None
+
+
+def _inicializar_trabalhador(dir_modelos, compilar, mmap, limiar_votacao=None):
+    """Initializer do pool: carrega os modelos uma única vez em cada processo"""
+    global _MODELOS_TRABALHADOR, _LIMIAR_VOTACAO_TRABALHADOR
+    from lexcarf.modelos import carregar_modelos_2023
+    _MODELOS_TRABALHADOR = carregar_modelos_2023(dir_modelos, compilar=compilar, mmap=mmap)
+    _LIMIAR_VOTACAO_TRABALHADOR = limiar_votacao
+
+
+def _prever_bloco_trabalhador(entradas):
+    """Probabilidades de um bloco no processo do pool"""
+    model_provimento, model_votacao, preprocessors = _MODELOS_TRABALHADOR
+    return prever_probabilidades_lote(
+        entradas, model_provimento, model_votacao, preprocessors, limiar_votacao=_LIMIAR_VOTACAO_TRABALHADOR
+    )
+
+
+def pontuar_blocos_paralelo(blocos, n_processos, dir_modelos=None, compilar=None, colunas=None, mmap=None,
+                            limiar_votacao=None):
+    """
+    Como pontuar_blocos, distribuindo os blocos entre n_processos processos
+
+    Os blocos saem na ordem de entrada. No máximo 2 * n_processos blocos ficam
+    em andamento ao mesmo tempo, para que a memória continue constante. Os
+    processos compartilham o pacote mapeado em memória (mmap como em
+    carregar_modelos_2023; sem pacote, mmap=True mapeia as florestas compiladas).
+    """
+    from lexcarf.modelos import DIR_MODELOS
+
+    contexto = multiprocessing.get_context()
+    with contexto.Pool(n_processos, initializer=_inicializar_trabalhador,
+                       initargs=(dir_modelos or DIR_MODELOS, compilar, mmap, limiar_votacao)) as pool:
+        pendentes = deque()
+        for bloco in blocos:
+            pendentes.append((bloco, pool.apply_async(_prever_bloco_trabalhador, (bloco[COLUNAS_ENTRADA],))))
+            if len(pendentes) >= 2 * n_processos:
+                yield _juntar_resultado(*pendentes.popleft(), colunas)
+
+        while pendentes:
+            yield _juntar_resultado(*pendentes.popleft(), colunas)
+
+
+def _juntar_resultado(bloco, resultado, colunas):
+    """Espera as probabilidades de um bloco e as acrescenta às colunas de saída"""
+    probabilidades = resultado.get()
+    if colunas is not None:
+        bloco = bloco[colunas]
+    return pd.concat([bloco, probabilidades], axis=1)
+
+
+def ler_blocos(caminho_entrada, tamanho_bloco=TAMANHO_BLOCO_PADRAO, colunas=None):
+    """
+    Leitor do CSV em blocos (lendo só as colunas necessárias quando colunas é informado)
+
+    Um arquivo vazio (sem nem o cabeçalho) vira um único bloco vazio com as
+    colunas de entrada, para que a saída ainda tenha o cabeçalho.
+    """
+    leitura = {'chunksize': tamanho_bloco}
+    if colunas is not None:
+        leitura['usecols'] = list(dict.fromkeys(list(colunas) + COLUNAS_ENTRADA))
+    try:
+        return pd.read_csv(caminho_entrada, **leitura)
+    except pd.errors.EmptyDataError:
+        return contextlib.nullcontext([pd.DataFrame(columns=leitura.get('usecols', COLUNAS_ENTRADA))])
+
+
+def gravar_blocos(blocos_pontuados, caminho_saida, progresso=True):
+    """
+    Grava os blocos no CSV de saída à medida que ficam prontos; retorna as estatísticas
+
+    O arquivo de saída sempre é criado: uma entrada sem linhas gera só o cabeçalho.
+    """
+    inicio = time.perf_counter()
+    linhas = 0
+    gravados = 0
+
+    for bloco in blocos_pontuados:
+        # Blocos vazios só contam para o cabeçalho, se nenhum outro bloco foi gravado
+        if bloco.empty and gravados:
+            continue
+        bloco.to_csv(caminho_saida, mode='w' if gravados == 0 else 'a', header=gravados == 0, index=False)
+        gravados += 1
+        linhas += len(bloco)
+
+        if progresso and len(bloco):
+            decorrido = time.perf_counter() - inicio
+            print(f"   {linhas:,} linhas ({linhas / decorrido:,.0f} linhas/s)")
+
+    if gravados == 0:
+        open(caminho_saida, 'w').close()
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'linhas': linhas,
+        'segundos': segundos,
+        'linhas_por_segundo': linhas / segundos if segundos else 0.0,
+        'pico_rss_mb': pico_rss_mb(),
+    }
+
+
+def pontuar_csv(caminho_entrada, caminho_saida, model_provimento, model_votacao, preprocessors,
+                tamanho_bloco=TAMANHO_BLOCO_PADRAO, colunas=None, progresso=True, limiar_votacao=None):
+    """
+    Pontua um CSV com as colunas texto_ementa, tributo e turma
+
+    colunas: colunas da entrada copiadas para a saída (padrão: todas).
+    limiar_votacao: se informado, a votação só é prevista para as linhas com
+    probabilidade de provimento >= limiar (as demais ficam com as colunas vazias).
+    Retorna um dict com linhas, segundos, linhas_por_segundo e pico_rss_mb.
+    """
+    with ler_blocos(caminho_entrada, tamanho_bloco, colunas) as blocos:
+        return gravar_blocos(
+            pontuar_blocos(blocos, model_provimento, model_votacao, preprocessors, colunas, limiar_votacao),
+            caminho_saida, progresso
+        )
+
+
+def pontuar_csv_paralelo(caminho_entrada, caminho_saida, n_processos, dir_modelos=None, compilar=None,
+                         tamanho_bloco=TAMANHO_BLOCO_PADRAO, colunas=None, progresso=True, mmap=None,
+                         limiar_votacao=None):
+    """
+    Como pontuar_csv, com os blocos previstos por um pool de n_processos processos
+
+    Cada processo carrega os modelos de dir_modelos (padrão: modelos/) uma única vez;
+    a saída é idêntica à de pontuar_csv, na mesma ordem.
+    """
+    with ler_blocos(caminho_entrada, tamanho_bloco, colunas) as blocos:
+        return gravar_blocos(
+            pontuar_blocos_paralelo(blocos, n_processos, dir_modelos, compilar, colunas, mmap, limiar_votacao),
+            caminho_saida, progresso
+        )
+
+
+def main(argv=None, prog=None):
+    """Linha de comando: pontua um CSV com os modelos 2023"""
+    from lexcarf.modelos import carregar_modelos_2023, compilar_ambiente, mmap_ambiente
+
+    parser = argparse.ArgumentParser(prog=prog, description='Pontua um CSV de processos com os modelos CARF 2023')
+    parser.add_argument('entrada', help='CSV com as colunas texto_ementa, tributo e turma')
+    parser.add_argument('-o', '--saida', help='CSV de saída (padrão: <entrada>_predicoes.csv)')
+    parser.add_argument('--tamanho-bloco', type=int, default=TAMANHO_BLOCO_PADRAO, help='Linhas lidas por vez')
+    parser.add_argument('--colunas', help='Colunas da entrada copiadas para a saída, separadas por vírgula '
+                                          '(padrão: todas)')
+    parser.add_argument('--processos', type=int, default=1, help='Processos que dividem os blocos (padrão: 1)')
+    parser.add_argument('--floresta-compilada', action='store_const', const=True, default=compilar_ambiente(),
+                        help='Usa o avaliador compilado das florestas')
+    parser.add_argument('--floresta-sklearn', dest='floresta_compilada', action='store_const', const=False,
+                        help='Usa as florestas do sklearn dos pickles, mesmo com o pacote '
+                             '(padrão: LEXCARF_FLORESTA_COMPILADA)')
+    parser.add_argument('--mmap', action='store_const', const=True, default=mmap_ambiente(),
+                        help='Sem pacote, mapeia as florestas compiladas (python scripts/exportar_florestas.py)')
+    parser.add_argument('--sem-mmap', dest='mmap', action='store_const', const=False,
+                        help='Lê o pacote para a memória do processo (padrão: LEXCARF_MMAP)')
+    parser.add_argument('--limiar-votacao', type=float, default=limiar_votacao_ambiente(),
+                        help='Só prevê a votação quando P(Provido Total) >= limiar (padrão: LEXCARF_LIMIAR_VOTACAO '
+                             'ou sempre)')
+    parser.add_argument('--silencioso', action='store_true', help='Não mostra o progresso por bloco')
+    args = parser.parse_args(argv)
+
+    saida = args.saida or caminho_saida_padrao(args.entrada)
+    colunas = [coluna.strip() for coluna in args.colunas.split(',')] if args.colunas else None
+
+    print(f"Pontuando {args.entrada} em blocos de {args.tamanho_bloco:,} linhas "
+          f"({args.processos} processo{'s' if args.processos > 1 else ''})...")
+    if args.processos > 1:
+        resultado = pontuar_csv_paralelo(
+            args.entrada, saida, args.processos, compilar=args.floresta_compilada,
+            tamanho_bloco=args.tamanho_bloco, colunas=colunas, progresso=not args.silencioso, mmap=args.mmap,
+            limiar_votacao=args.limiar_votacao
+        )
+    else:
+        model_provimento, model_votacao, preprocessors = carregar_modelos_2023(
+            compilar=args.floresta_compilada, mmap=args.mmap
+        )
+        resultado = pontuar_csv(
+            args.entrada, saida, model_provimento, model_votacao, preprocessors,
+            tamanho_bloco=args.tamanho_bloco, colunas=colunas, progresso=not args.silencioso,
+            limiar_votacao=args.limiar_votacao
+        )
+
+    print(f"✅ {resultado['linhas']:,} linhas em {resultado['segundos']:.1f}s "
+          f"({resultado['linhas_por_segundo']:,.0f} linhas/s) -> {saida}")
+    if resultado['pico_rss_mb'] is not None:
+        print(f"   Pico de memória (RSS): {resultado['pico_rss_mb']:.1f} MB")
+    return resultado
+
+
+if __name__ == "__main__":
+    main()
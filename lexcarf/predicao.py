@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Predição em lote para os modelos de provimento e votação
+Featuriza todas as linhas de uma vez e faz uma única chamada de
+predict_proba por modelo. Em cascata, o modelo de votação só é avaliado
+nas linhas com probabilidade de provimento acima de um limiar (a votação só
+se aplica a recursos providos). Com 'antecipada', as florestas param de avaliar
+árvores quando a classe líder se estabiliza (lexcarf.antecipada)
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.antecipada import avaliar_floresta, opcoes_antecipada
+from lexcarf.featurizador import (
+    COLUNAS_ENTRADA, normalizar_entradas, montar_linha_esparsa, montar_matriz_esparsa, obter_featurizador
+)
+from lexcarf.latencia import etapa
+from lexcarf.metricas import contador_predicoes, histograma_lote
+
+CLASSE_PROVIDO = 'Provido Total'
+
+_METRICA_PREDICOES = contador_predicoes('lote')
+_METRICA_LOTE = histograma_lote('lote')
+
+
+def limiar_votacao_ambiente():
+    """Limiar da cascata em LEXCARF_LIMIAR_VOTACAO, ou None (votação sempre avaliada)"""
+    valor = os.environ.get('LEXCARF_LIMIAR_VOTACAO')
+    return float(valor) if valor else None
+
+
+def selecionar_para_votacao(prob_provimento, classes_provimento, limiar=None):
+    """Máscara das linhas com probabilidade de 'Provido Total' >= limiar (limiar None: todas)"""
+    if limiar is None:
+        return np.ones(len(prob_provimento), dtype=bool)
+
+    classes = [str(classe) for classe in classes_provimento]
+    if CLASSE_PROVIDO not in classes:
+        raise ValueError(f"Modelo de provimento sem a classe '{CLASSE_PROVIDO}': {classes}")
+    return prob_provimento[:, classes.index(CLASSE_PROVIDO)] >= limiar
+
+
+def prever_votacao_condicional(X, prob_provimento, model_provimento, model_votacao, limiar=None):
+    """
+    Probabilidades de votação em cascata
+
+    O modelo de votação só é avaliado nas linhas selecionadas por selecionar_para_votacao;
+    as demais ficam com NaN. Retorna (prob_votacao, mascara).
+    """
+    prob_votacao, mascara, _ = prever_votacao_condicional_antecipada(
+        X, prob_provimento, model_provimento, model_votacao, limiar
+    )
+    return prob_votacao, mascara
+
+
+def prever_votacao_condicional_antecipada(X, prob_provimento, model_provimento, model_votacao, limiar=None,
+                                          opcoes=None):
+    """
+    prever_votacao_condicional com predição antecipada (opcoes de opcoes_antecipada)
+
+    Retorna (prob_votacao, mascara, árvores usadas por linha); linhas não avaliadas usam 0 árvores.
+    """
+    mascara = selecionar_para_votacao(prob_provimento, model_provimento.classes_, limiar)
+    if mascara.all():
+        with etapa('predict_proba_votacao'):
+            prob_votacao, arvores = avaliar_floresta(model_votacao, X, opcoes)
+        return prob_votacao, mascara, arvores
+
+    prob_votacao = np.full((len(mascara), len(model_votacao.classes_)), np.nan)
+    arvores = np.zeros(len(mascara), dtype=np.int64)
+    if mascara.any():
+        with etapa('predict_proba_votacao'):
+            prob_votacao[mascara], arvores[mascara] = avaliar_floresta(
+                model_votacao, X[np.flatnonzero(mascara)], opcoes
+            )
+    return prob_votacao, mascara, arvores
+
+
+def prever_probabilidades_linha(texto_ementa, tributo, turma, model_provimento, model_votacao, preprocessors,
+                                limiar_votacao=None, antecipada=None, arvores=None):
+    """
+    Prevê as probabilidades de provimento e votação para uma ementa (caminho das aplicações)
+
+    Retorna (provimento, votacao): dicts classe -> probabilidade; com limiar_votacao,
+    votacao fica vazio quando o provimento não atinge o limiar. antecipada como em
+    prever_probabilidades_lote; arvores: dict opcional preenchido com o número de
+    árvores avaliadas por modelo.
+    """
+    # O prazo do orçamento começa na entrada: a featurização também consome o orçamento
+    opcoes = opcoes_antecipada(antecipada)
+    # Com LEXCARF_LATENCIA=1, cada etapa alimenta as janelas de latência (lexcarf.latencia)
+    with etapa('total'):
+        X = obter_featurizador(preprocessors).transformar_linha(texto_ementa, tributo, turma)
+
+        with etapa('predict_proba_provimento'):
+            prob_provimento, arvores_provimento = avaliar_floresta(model_provimento, X, opcoes)
+        prob_votacao, votacao_avaliada, arvores_votacao = prever_votacao_condicional_antecipada(
+            X, prob_provimento, model_provimento, model_votacao, limiar_votacao, opcoes
+        )
+    if arvores is not None:
+        arvores.update(provimento=int(arvores_provimento[0]), votacao=int(arvores_votacao[0]))
+
+    resultado_provimento = dict(zip(model_provimento.classes_, prob_provimento[0]))
+    resultado_votacao = dict(zip(model_votacao.classes_, prob_votacao[0])) if votacao_avaliada[0] else {}
+    return resultado_provimento, resultado_votacao
+
+
+def preparar_features_lote(entradas, preprocessors, esparso=True):
+    """
+    Monta a matriz de features (tributo, turma, TF-IDF) para todas as linhas
+
+    Com esparso=True retorna CSR float32 (o dtype usado internamente pelas
+    árvores); com esparso=False retorna a matriz densa float64 original.
+    """
+    return obter_featurizador(preprocessors).transformar(entradas, esparso=esparso)
+
+
+def prever_probabilidades_lote(entradas, model_provimento, model_votacao, preprocessors, esparso=True,
+                               limiar_votacao=None, antecipada=None):
+    """
+    Prevê as probabilidades de provimento e votação para várias ementas
+
+    Retorna um DataFrame alinhado com a entrada, com uma coluna
+    'provimento_<classe>' e 'votacao_<classe>' para cada classe dos modelos.
+    Com limiar_votacao, a votação só é prevista nas linhas com probabilidade
+    de provimento >= limiar; nas demais as colunas de votação ficam vazias (NaN).
+    Com antecipada (True ou dict de opções, ver lexcarf.antecipada), as florestas
+    param por linha e as colunas 'arvores_provimento' e 'arvores_votacao' informam
+    quantas árvores foram avaliadas.
+    """
+    opcoes = opcoes_antecipada(antecipada)
+    df = normalizar_entradas(entradas)
+    colunas_provimento = [f'provimento_{classe}' for classe in model_provimento.classes_]
+    colunas_votacao = [f'votacao_{classe}' for classe in model_votacao.classes_]
+    if df.empty:
+        # Sem linhas (ex.: CSV só com cabeçalho): mesmas colunas, sem chamar os modelos
+        colunas = colunas_provimento + colunas_votacao
+        if opcoes is not None:
+            colunas += ['arvores_provimento', 'arvores_votacao']
+        return pd.DataFrame(index=df.index, columns=colunas, dtype=float)
+
+    _METRICA_PREDICOES.inc(len(df))
+    _METRICA_LOTE.observar(len(df))
+    X = preparar_features_lote(df, preprocessors, esparso=esparso)
+
+    with etapa('predict_proba_provimento'):
+        prob_provimento, arvores_provimento = avaliar_floresta(model_provimento, X, opcoes)
+    prob_votacao, _, arvores_votacao = prever_votacao_condicional_antecipada(
+        X, prob_provimento, model_provimento, model_votacao, limiar_votacao, opcoes
+    )
+
+    resultado = pd.concat([
+        pd.DataFrame(prob_provimento, index=df.index, columns=colunas_provimento),
+        pd.DataFrame(prob_votacao, index=df.index, columns=colunas_votacao)
+    ], axis=1)
+    if opcoes is not None:
+        resultado['arvores_provimento'] = arvores_provimento
+        resultado['arvores_votacao'] = arvores_votacao
+    return resultado
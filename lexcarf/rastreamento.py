@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Rastreamento por etapa dos scripts de treinamento
+Cada etapa (with rastreador.etapa('nome')) registra tempo de parede, tempo de
+CPU e memória: RSS no início e no fim e o pico de RSS durante a etapa, amostrado
+por uma thread auxiliar. O rastro vai para um arquivo JSON e para uma tabela
+resumo ordenada pelo tempo, para saber qual etapa otimizar quando o corpus cresce
+"""
+
+import json
+import os
+import platform
+import threading
+import time
+
+from lexcarf.memoria import pico_rss_mb, rss_atual_mb
+
+# Intervalo entre leituras de RSS durante uma etapa (s)
+INTERVALO_AMOSTRAGEM = 0.01
+
+
+class _AmostradorRSS:
+    """Thread que lê o RSS periodicamente e guarda o maior valor visto"""
+
+    def __init__(self, intervalo=INTERVALO_AMOSTRAGEM):
+        self.intervalo = intervalo
+        self.pico = rss_atual_mb()
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            self._observar()
+
+    def _observar(self):
+        rss = rss_atual_mb()
+        if rss is not None and (self.pico is None or rss > self.pico):
+            self.pico = rss
+
+    def iniciar(self):
+        if self.pico is not None:  # sem leitura de RSS na plataforma, nada a amostrar
+            self._thread = threading.Thread(target=self._amostrar, name='lexcarf-rastreamento', daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join()
+            self._observar()
+        return self.pico
+
+
+class _Etapa:
+    """Context manager de uma etapa do Rastreador"""
+
+    def __init__(self, rastreador, nome, atributos):
+        self.rastreador = rastreador
+        self.nome = nome
+        self.atributos = atributos
+
+    def __enter__(self):
+        self.nivel = len(self.rastreador._pilha)
+        self.rastreador._pilha.append(self.nome)
+        self.rss_inicio = rss_atual_mb()
+        self.amostrador = _AmostradorRSS(self.rastreador.intervalo).iniciar()
+        self.cpu_inicio = time.process_time()
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, *excecao):
+        duracao = time.perf_counter() - self.inicio
+        cpu = time.process_time() - self.cpu_inicio
+        pico = self.amostrador.parar()
+        rss_fim = rss_atual_mb()
+        self.rastreador._pilha.pop()
+
+        self.rastreador.etapas.append({
+            'etapa': self.nome,
+            'nivel': self.nivel,
+            'pai': self.rastreador._pilha[-1] if self.rastreador._pilha else None,
+            'inicio_s': self.inicio - self.rastreador.inicio,
+            'duracao_s': duracao,
+            'cpu_s': cpu,
+            'rss_inicio_mb': self.rss_inicio,
+            'rss_fim_mb': rss_fim,
+            'pico_rss_mb': pico,
+            'pico_rss_processo_mb': pico_rss_mb(),
+            'erro': tipo.__name__ if tipo is not None else None,
+            **self.atributos,
+        })
+        return False
+
+
+class Rastreador:
+    """
+    Rastro das etapas de um script
+
+    Etapas podem ser aninhadas (o rastro guarda nível e etapa pai) e receber
+    atributos livres, como o número de linhas: etapa('dropna', linhas=n), ou
+    dentro do bloco, quando só são conhecidos no fim (etapa.atributos['linhas'] = n).
+    """
+
+    def __init__(self, nome, intervalo=INTERVALO_AMOSTRAGEM, **metadados):
+        self.nome = nome
+        self.intervalo = intervalo
+        self.metadados = metadados
+        self.etapas = []
+        self._pilha = []
+        self.instante = time.time()
+        self.inicio = time.perf_counter()
+
+    def etapa(self, nome, **atributos):
+        """Context manager que mede o bloco como uma etapa"""
+        return _Etapa(self, nome, atributos)
+
+    def para_dict(self):
+        """Rastro completo (etapas em ordem de término, como registradas)"""
+        return {
+            'nome': self.nome,
+            'instante': self.instante,
+            'duracao_total_s': time.perf_counter() - self.inicio,
+            'pico_rss_processo_mb': pico_rss_mb(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'metadados': self.metadados,
+            'etapas': self.etapas,
+        }
+
+    def exportar(self, caminho):
+        """Grava o rastro em JSON"""
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(self.para_dict(), f, ensure_ascii=False, indent=2)
+        return caminho
+
+    def resumo(self):
+        """Etapas de nível 0 ordenadas pelo tempo de parede, com a fração do total rastreado"""
+        etapas = [etapa for etapa in self.etapas if etapa['nivel'] == 0]
+        total = sum(etapa['duracao_s'] for etapa in etapas) or 1.0
+        return [dict(etapa, fracao=etapa['duracao_s'] / total)
+                for etapa in sorted(etapas, key=lambda etapa: etapa['duracao_s'], reverse=True)]
+
+    def imprimir_resumo(self):
+        """Tabela do resumo"""
+        print(f"{'etapa':<32} | {'parede (s)':>10} | {'CPU (s)':>8} | {'%':>6} | {'pico (MB)':>9} | {'Δ RSS (MB)':>10}")
+        for etapa in self.resumo():
+            delta = None
+            if etapa['rss_fim_mb'] is not None and etapa['rss_inicio_mb'] is not None:
+                delta = etapa['rss_fim_mb'] - etapa['rss_inicio_mb']
+            print(f"{etapa['etapa']:<32} | {etapa['duracao_s']:>10.3f} | {etapa['cpu_s']:>8.3f} | "
+                  f"{etapa['fracao']:>6.1%} | {_formatar_mb(etapa['pico_rss_mb'], 9)} | {_formatar_mb(delta, 10, '+')}")
+
+
+def _formatar_mb(valor, largura, sinal=''):
+    return f'{valor:>{sinal}{largura}.1f}' if valor is not None else '-'.rjust(largura)
@@ -0,0 +1,435 @@
+# -*- coding: utf-8 -*-
+"""
+Serviço HTTP de predição com micro-lotes
+Servidor asyncio (somente biblioteca padrão) que carrega os modelos uma vez,
+agrupa requisições concorrentes em micro-lotes limitados por tamanho e tempo
+de espera e executa featurização + predict_proba em um pool de threads
+
+Rotas:
+    GET  /saude   -> estado do serviço e estatísticas de lotes
+    GET  /latencia -> p50/p95/p99 por etapa (com LEXCARF_LATENCIA=1, ver lexcarf.latencia)
+    (métricas Prometheus em outra porta com --porta-metricas, ver lexcarf.metricas)
+    POST /prever  -> {"texto_ementa": ..., "tributo": ..., "turma": ...}
+                     ou {"entradas": [{...}, {...}]}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from lexcarf.featurizador import COLUNAS_ENTRADA
+from lexcarf.latencia import REGISTRO, ativar_latencia, etapa, latencia_ativa
+from lexcarf.metricas import (METRICAS, contador_predicoes, histograma_carga_modelos, histograma_lote,
+                              porta_metricas_ambiente, servir_metricas)
+from lexcarf.predicao import limiar_votacao_ambiente, preparar_features_lote, prever_votacao_condicional
+
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8502
+MAX_LOTE_PADRAO = 32
+MAX_ESPERA_PADRAO = 0.005
+THREADS_PADRAO = min(4, os.cpu_count() or 1)
+# Maior corpo aceito em POST (bytes) e número máximo de cabeçalhos por requisição
+MAX_CORPO_PADRAO = 8 * 1024 * 1024
+MAX_CABECALHOS = 100
+
+MOTIVOS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+_METRICA_PREDICOES = contador_predicoes('servico')
+_METRICA_LOTE = histograma_lote('servico')
+_METRICA_ERROS = METRICAS.contador('lexcarf_erros_lote_total', 'Lotes do serviço que falharam', origem='servico')
+
+
+class ErroRequisicao(Exception):
+    """Requisição HTTP que não pode ser lida: respondida com status e a conexão é fechada"""
+
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def validar_entrada(entrada):
+    """
+    (texto_ementa, tributo, turma) de uma entrada JSON, como texto
+
+    texto_ementa precisa ser texto; tributo e turma podem ser números (convertidos
+    com str). Qualquer outro valor gera ValueError, respondido só a essa requisição.
+    """
+    if not isinstance(entrada, dict):
+        raise ValueError("Cada entrada deve ser um objeto JSON")
+    faltando = [coluna for coluna in COLUNAS_ENTRADA if coluna not in entrada]
+    if faltando:
+        raise ValueError(f"Campos ausentes: {faltando}")
+
+    valores = []
+    for coluna in COLUNAS_ENTRADA:
+        valor = entrada[coluna]
+        if coluna != 'texto_ementa' and isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            valor = str(valor)
+        if not isinstance(valor, str):
+            raise ValueError(f"Campo {coluna} deve ser texto (recebido: {type(valor).__name__})")
+        valores.append(valor)
+    return tuple(valores)
+
+
+class ServicoPredicao:
+    """
+    Agrupa as requisições em micro-lotes e responde com as probabilidades
+
+    Um novo lote só é formado quando há uma thread livre: enquanto todas estão
+    ocupadas, as requisições se acumulam na fila e o próximo lote sai maior
+    (até max_lote). Com uma thread livre, o lote espera no máximo max_espera
+    segundos por mais requisições.
+
+    limiar_votacao: se informado, a votação só é prevista quando a probabilidade de
+    provimento atinge o limiar; nas demais respostas 'votacao' é null.
+    max_corpo: maior corpo aceito (bytes); acima disso a resposta é 413.
+    """
+
+    def __init__(self, model_provimento, model_votacao, preprocessors,
+                 max_lote=MAX_LOTE_PADRAO, max_espera=MAX_ESPERA_PADRAO, n_threads=THREADS_PADRAO,
+                 limiar_votacao=None, max_corpo=MAX_CORPO_PADRAO):
+        if max_lote < 1:
+            raise ValueError("max_lote deve ser pelo menos 1")
+
+        self.model_provimento = model_provimento
+        self.model_votacao = model_votacao
+        self.preprocessors = preprocessors
+        self.max_lote = max_lote
+        self.max_espera = max_espera
+        self.n_threads = n_threads
+        self.limiar_votacao = limiar_votacao
+        self.max_corpo = max_corpo
+
+        self.classes_provimento = [str(classe) for classe in model_provimento.classes_]
+        self.classes_votacao = [str(classe) for classe in model_votacao.classes_]
+
+        self._executor = ThreadPoolExecutor(max_workers=n_threads, thread_name_prefix='lexcarf-predicao')
+        self._fila = None
+        self._semaforo = None
+        self._servidor = None
+        self._tarefas = set()
+
+        self.requisicoes = 0
+        self.lotes = 0
+        self.votacoes_evitadas = 0
+
+    def _prever_lote(self, entradas):
+        """Featurização e predict_proba de um lote (executado no pool de threads)"""
+        X = preparar_features_lote(entradas, self.preprocessors)
+        with etapa('predict_proba_provimento'):
+            prob_provimento = self.model_provimento.predict_proba(X)
+        prob_votacao, mascara = prever_votacao_condicional(
+            X, prob_provimento, self.model_provimento, self.model_votacao, self.limiar_votacao
+        )
+
+        return [
+            {
+                'provimento': dict(zip(self.classes_provimento, map(float, linha_provimento))),
+                'votacao': dict(zip(self.classes_votacao, map(float, linha_votacao))) if avaliada else None,
+            }
+            for linha_provimento, linha_votacao, avaliada in zip(prob_provimento, prob_votacao, mascara)
+        ]
+
+    def _prever_individualmente(self, entradas):
+        """Refaz um lote que falhou linha a linha: (resultado, None) ou (None, erro) por entrada"""
+        resultados = []
+        for entrada in entradas:
+            try:
+                resultados.append((self._prever_lote([entrada])[0], None))
+            except Exception as e:
+                resultados.append((None, e))
+        return resultados
+
+    async def prever(self, entrada):
+        """Predição de uma entrada (dict com texto_ementa, tributo e turma) via micro-lote"""
+        valores = validar_entrada(entrada)
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((valores, futuro))
+        return await futuro
+
+    async def _coletar_lotes(self):
+        """Forma os lotes a partir da fila e os despacha para o pool de threads"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._semaforo.acquire()
+            lote = [await self._fila.get()]
+            prazo = loop.time() + self.max_espera
+
+            while len(lote) < self.max_lote:
+                if not self._fila.empty():
+                    lote.append(self._fila.get_nowait())
+                    continue
+                restante = prazo - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            tarefa = asyncio.ensure_future(self._executar_lote(lote))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _executar_lote(self, lote):
+        """
+        Executa um lote e resolve os futuros de cada requisição
+
+        Se o lote falhar, as linhas são refeitas uma a uma, para que só as
+        requisições com problema recebam o erro.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            entradas = [entrada for entrada, _ in lote]
+            try:
+                resultados = [(resultado, None) for resultado in
+                              await loop.run_in_executor(self._executor, self._prever_lote, entradas)]
+            except Exception as e:
+                _METRICA_ERROS.inc()
+                if len(lote) == 1:
+                    resultados = [(None, e)]
+                else:
+                    resultados = await loop.run_in_executor(self._executor, self._prever_individualmente, entradas)
+
+            self.requisicoes += len(lote)
+            self.lotes += 1
+            _METRICA_PREDICOES.inc(sum(erro is None for _, erro in resultados))
+            _METRICA_LOTE.observar(len(lote))
+            self.votacoes_evitadas += sum(resultado is not None and resultado['votacao'] is None
+                                          for resultado, _ in resultados)
+            for (_, futuro), (resultado, erro) in zip(lote, resultados):
+                if futuro.done():
+                    continue
+                if erro is None:
+                    futuro.set_result(resultado)
+                else:
+                    futuro.set_exception(erro)
+        except Exception as e:
+            for _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+        finally:
+            self._semaforo.release()
+
+    def estatisticas(self):
+        """Contadores de requisições e lotes"""
+        return {
+            'requisicoes': self.requisicoes,
+            'lotes': self.lotes,
+            'tamanho_medio_lote': self.requisicoes / self.lotes if self.lotes else 0.0,
+            'fila': self._fila.qsize() if self._fila is not None else 0,
+            'max_lote': self.max_lote,
+            'max_espera': self.max_espera,
+            'threads': self.n_threads,
+            'limiar_votacao': self.limiar_votacao,
+            'votacoes_evitadas': self.votacoes_evitadas,
+        }
+
+    async def _responder(self, metodo, caminho, corpo):
+        """Retorna (status, objeto JSON) para uma requisição"""
+        caminho = caminho.split('?', 1)[0]
+
+        if caminho == '/saude':
+            if metodo != 'GET':
+                return 405, {'erro': 'Use GET'}
+            return 200, {'status': 'ok', **self.estatisticas()}
+
+        if caminho == '/latencia':
+            if metodo != 'GET':
+                return 405, {'erro': 'Use GET'}
+            return 200, {'ativa': latencia_ativa(), 'janela': REGISTRO.janela, 'etapas': REGISTRO.percentis()}
+
+        if caminho == '/prever':
+            if metodo != 'POST':
+                return 405, {'erro': 'Use POST'}
+            try:
+                dados = json.loads(corpo or b'{}')
+                if isinstance(dados, dict) and 'entradas' in dados:
+                    resultados = await asyncio.gather(*(self.prever(entrada) for entrada in dados['entradas']))
+                    return 200, {'resultados': resultados}
+                return 200, await self.prever(dados)
+            except (ValueError, TypeError) as e:
+                return 400, {'erro': str(e)}
+            except Exception as e:
+                return 500, {'erro': str(e)}
+
+        return 404, {'erro': f'Rota não encontrada: {caminho}'}
+
+    async def _atender(self, reader, writer):
+        """Conexão HTTP/1.1 com keep-alive"""
+        tarefa = asyncio.current_task()
+        self._tarefas.add(tarefa)
+        try:
+            while True:
+                try:
+                    requisicao = await ler_requisicao(reader, self.max_corpo)
+                except ErroRequisicao as e:
+                    # Corpo grande demais ou requisição malformada: o restante da conexão não é confiável
+                    writer.write(montar_resposta(e.status, {'erro': str(e)}, manter=False))
+                    await writer.drain()
+                    break
+                if requisicao is None:
+                    break
+                metodo, caminho, cabecalhos, corpo = requisicao
+
+                status, resposta = await self._responder(metodo, caminho, corpo)
+                manter = cabecalhos.get('connection', '').lower() != 'close'
+                writer.write(montar_resposta(status, resposta, manter))
+                await writer.drain()
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._tarefas.discard(tarefa)
+            writer.close()
+
+    async def iniciar(self, host=HOST_PADRAO, porta=PORTA_PADRAO):
+        """Inicia o servidor e o coletor de lotes no loop atual; retorna o asyncio.Server"""
+        self._fila = asyncio.Queue()
+        self._semaforo = asyncio.Semaphore(self.n_threads)
+        fila = self._fila
+        METRICAS.medidor('lexcarf_fila_requisicoes', 'Requisições aguardando um lote no serviço',
+                         funcao=fila.qsize)
+        coletor = asyncio.ensure_future(self._coletar_lotes())
+        self._tarefas.add(coletor)
+        self._servidor = await asyncio.start_server(self._atender, host, porta)
+        return self._servidor
+
+    async def encerrar(self):
+        """Para de aceitar conexões, cancela conexões e coletor e libera o pool de threads"""
+        if self._servidor is not None:
+            self._servidor.close()
+        tarefas = [tarefa for tarefa in self._tarefas if tarefa is not asyncio.current_task()]
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    async def executar(self, host=HOST_PADRAO, porta=PORTA_PADRAO):
+        """Serve até ser interrompido"""
+        servidor = await self.iniciar(host, porta)
+        endereco = servidor.sockets[0].getsockname()
+        print(f"Serviço de predição em http://{endereco[0]}:{endereco[1]} "
+              f"(lote até {self.max_lote}, espera até {self.max_espera * 1000:.1f} ms, {self.n_threads} threads)")
+        async with servidor:
+            await servidor.serve_forever()
+
+
+async def _ler_linha(reader):
+    """Linha da requisição; linhas acima do limite do StreamReader (64 KiB) geram ErroRequisicao 400"""
+    try:
+        return await reader.readline()
+    except ValueError:
+        raise ErroRequisicao(400, 'Linha da requisição longa demais')
+
+
+async def ler_requisicao(reader, max_corpo=MAX_CORPO_PADRAO):
+    """
+    Lê uma requisição HTTP; retorna (metodo, caminho, cabecalhos, corpo) ou None ao fim da conexão
+
+    Linha de requisição ou cabeçalhos malformados geram ErroRequisicao 400 e
+    Content-Length acima de max_corpo gera 413, antes de ler o corpo.
+    """
+    linha = await _ler_linha(reader)
+    if not linha.strip():
+        return None
+    partes = linha.decode('latin-1').split()
+    if len(partes) != 3 or not partes[2].startswith('HTTP/'):
+        raise ErroRequisicao(400, 'Linha de requisição inválida')
+    metodo, caminho, _ = partes
+
+    cabecalhos = {}
+    while True:
+        linha = await _ler_linha(reader)
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, separador, valor = linha.decode('latin-1').partition(':')
+        if not separador or not nome.strip():
+            raise ErroRequisicao(400, 'Cabeçalho inválido')
+        if len(cabecalhos) >= MAX_CABECALHOS:
+            raise ErroRequisicao(400, f'Mais de {MAX_CABECALHOS} cabeçalhos')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    try:
+        tamanho = int(cabecalhos.get('content-length', 0))
+    except ValueError:
+        raise ErroRequisicao(400, 'Content-Length inválido')
+    if tamanho < 0:
+        raise ErroRequisicao(400, 'Content-Length inválido')
+    if tamanho > max_corpo:
+        raise ErroRequisicao(413, f'Corpo de {tamanho} bytes acima do limite de {max_corpo} bytes')
+    corpo = await reader.readexactly(tamanho) if tamanho else b''
+    return metodo.upper(), caminho, cabecalhos, corpo
+
+
+def montar_resposta(status, objeto, manter=True):
+    """Resposta HTTP/1.1 com corpo JSON"""
+    corpo = json.dumps(objeto, ensure_ascii=False).encode('utf-8')
+    cabecalho = (
+        f'HTTP/1.1 {status} {MOTIVOS_HTTP.get(status, "")}\r\n'
+        'Content-Type: application/json; charset=utf-8\r\n'
+        f'Content-Length: {len(corpo)}\r\n'
+        f'Connection: {"keep-alive" if manter else "close"}\r\n\r\n'
+    )
+    return cabecalho.encode('latin-1') + corpo
+
+
+def main(argv=None, prog=None):
+    """Linha de comando: carrega os modelos 2023 e inicia o serviço"""
+    from lexcarf.modelos import carregar_modelos_2023, compilar_ambiente, mmap_ambiente
+
+    parser = argparse.ArgumentParser(prog=prog, description='Serviço HTTP de predição CARF com micro-lotes')
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--max-lote', type=int, default=MAX_LOTE_PADRAO)
+    parser.add_argument('--max-espera-ms', type=float, default=MAX_ESPERA_PADRAO * 1000)
+    parser.add_argument('--threads', type=int, default=THREADS_PADRAO)
+    parser.add_argument('--max-corpo-kb', type=int, default=MAX_CORPO_PADRAO // 1024,
+                        help='Maior corpo aceito em POST; acima disso responde 413 (padrão: 8192)')
+    parser.add_argument('--floresta-compilada', action='store_const', const=True, default=compilar_ambiente(),
+                        help='Usa o avaliador compilado das florestas')
+    parser.add_argument('--floresta-sklearn', dest='floresta_compilada', action='store_const', const=False,
+                        help='Usa as florestas do sklearn dos pickles, mesmo com o pacote '
+                             '(padrão: LEXCARF_FLORESTA_COMPILADA)')
+    parser.add_argument('--mmap', action='store_const', const=True, default=mmap_ambiente(),
+                        help='Sem pacote, mapeia as florestas compiladas (python scripts/exportar_florestas.py)')
+    parser.add_argument('--sem-mmap', dest='mmap', action='store_const', const=False,
+                        help='Lê o pacote para a memória do processo (padrão: LEXCARF_MMAP)')
+    parser.add_argument('--limiar-votacao', type=float, default=limiar_votacao_ambiente(),
+                        help='Só prevê a votação quando P(Provido Total) >= limiar (padrão: LEXCARF_LIMIAR_VOTACAO '
+                             'ou sempre)')
+    parser.add_argument('--latencia', action='store_true',
+                        help='Mede a latência por etapa (GET /latencia; padrão: LEXCARF_LATENCIA)')
+    parser.add_argument('--porta-metricas', type=int, default=porta_metricas_ambiente(),
+                        help='Expõe métricas Prometheus em GET /metrics nesta porta (padrão: LEXCARF_METRICAS_PORTA '
+                             'ou desligado)')
+    args = parser.parse_args(argv)
+    if args.latencia:
+        ativar_latencia()
+    if args.porta_metricas is not None:
+        servidor_metricas = servir_metricas(args.porta_metricas, args.host)
+        print(f"Métricas em http://{args.host}:{servidor_metricas.server_address[1]}/metrics")
+
+    inicio = time.perf_counter()
+    model_provimento, model_votacao, preprocessors = carregar_modelos_2023(
+        compilar=args.floresta_compilada, mmap=args.mmap
+    )
+    histograma_carga_modelos().observar(time.perf_counter() - inicio)
+    servico = ServicoPredicao(
+        model_provimento, model_votacao, preprocessors,
+        max_lote=args.max_lote, max_espera=args.max_espera_ms / 1000, n_threads=args.threads,
+        limiar_votacao=args.limiar_votacao, max_corpo=args.max_corpo_kb * 1024
+    )
+    try:
+        asyncio.run(servico.executar(args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\nServiço encerrado.")
+
+
+if __name__ == "__main__":
+    main()
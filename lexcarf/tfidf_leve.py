@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+TF-IDF leve, sem sklearn
+Reproduz TfidfVectorizer.transform (analisador de palavras) a partir só do
+vocabulário, do vetor idf e dos parâmetros, com as mesmas operações em ponto
+flutuante: contagem no dtype do vetorizador, multiplicação pelo idf, soma
+sequencial em double da norma da linha e divisão em double
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+
+TOKEN_PATTERN_PADRAO = r'(?u)\b\w\w+\b'
+
+# Linhas normalizadas por vez (limita a matriz preenchida da soma sequencial)
+LINHAS_POR_BLOCO = 1024
+
+
+def remover_acentos_unicode(texto):
+    """Mesma regra de strip_accents='unicode' do sklearn"""
+    try:
+        texto.encode('ASCII', errors='strict')
+        return texto
+    except UnicodeEncodeError:
+        normalizado = unicodedata.normalize('NFKD', texto)
+        return ''.join([c for c in normalizado if not unicodedata.combining(c)])
+
+
+def remover_acentos_ascii(texto):
+    """Mesma regra de strip_accents='ascii' do sklearn"""
+    return unicodedata.normalize('NFKD', texto).encode('ASCII', 'ignore').decode('ASCII')
+
+
+REMOCAO_ACENTOS = {
+    None: None,
+    'unicode': remover_acentos_unicode,
+    'ascii': remover_acentos_ascii,
+}
+
+
+class TfidfLeve:
+    """
+    Transformador TF-IDF com a interface de inferência do TfidfVectorizer
+
+    vocabulario: termos na ordem dos índices das colunas; idf: vetor idf
+    (mesmo dtype do vetorizador original) ou None se use_idf=False.
+    """
+
+    def __init__(self, vocabulario, idf=None, lowercase=True, strip_accents=None,
+                 token_pattern=TOKEN_PATTERN_PADRAO, ngram_range=(1, 1), stop_words=None, binary=False,
+                 norm='l2', sublinear_tf=False, dtype='float64'):
+        if strip_accents not in REMOCAO_ACENTOS:
+            raise ValueError(f"strip_accents não suportado: {strip_accents}")
+        if norm not in (None, 'l1', 'l2'):
+            raise ValueError(f"norm não suportada: {norm}")
+
+        self.vocabulario = list(vocabulario)
+        self.vocabulary_ = {termo: indice for indice, termo in enumerate(self.vocabulario)}
+        self.idf = np.asarray(idf) if idf is not None else None
+        self.lowercase = lowercase
+        self.strip_accents = strip_accents
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.stop_words = frozenset(stop_words) if stop_words else None
+        self.binary = binary
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.dtype = np.dtype(dtype)
+        self._token = re.compile(token_pattern)
+        self._remover_acentos = REMOCAO_ACENTOS[strip_accents]
+
+    @classmethod
+    def de_sklearn(cls, tfidf):
+        """Converte um TfidfVectorizer ajustado (analisador de palavras padrão)"""
+        parametros = tfidf.get_params()
+        if parametros['analyzer'] != 'word' or parametros['tokenizer'] is not None \
+                or parametros['preprocessor'] is not None or callable(parametros['strip_accents']):
+            raise ValueError("Só é possível converter TF-IDF de palavras com o tokenizador padrão")
+
+        vocabulario = [None] * len(tfidf.vocabulary_)
+        for termo, indice in tfidf.vocabulary_.items():
+            vocabulario[indice] = termo
+
+        stop_words = tfidf.get_stop_words()
+        return cls(
+            vocabulario,
+            idf=tfidf.idf_ if parametros['use_idf'] else None,
+            lowercase=parametros['lowercase'],
+            strip_accents=parametros['strip_accents'],
+            token_pattern=parametros['token_pattern'],
+            ngram_range=parametros['ngram_range'],
+            stop_words=sorted(stop_words) if stop_words else None,
+            binary=parametros['binary'],
+            norm=parametros['norm'],
+            sublinear_tf=parametros['sublinear_tf'],
+            dtype=parametros['dtype']
+        )
+
+    def exportar(self):
+        """(parâmetros JSON, idf) para gravar sem pickle"""
+        parametros = {
+            'lowercase': self.lowercase,
+            'strip_accents': self.strip_accents,
+            'token_pattern': self.token_pattern,
+            'ngram_range': list(self.ngram_range),
+            'stop_words': sorted(self.stop_words) if self.stop_words else None,
+            'binary': self.binary,
+            'norm': self.norm,
+            'sublinear_tf': self.sublinear_tf,
+            'dtype': self.dtype.name,
+        }
+        return parametros, self.idf
+
+    @classmethod
+    def de_exportacao(cls, parametros, vocabulario, idf=None):
+        """Inverso de exportar"""
+        parametros = {chave: valor for chave, valor in parametros.items() if chave not in ('use_idf', 'smooth_idf')}
+        return cls(vocabulario, idf=idf, **parametros)
+
+    def analisar(self, texto):
+        """Termos (palavras e n-gramas) do texto, na mesma ordem do analisador do sklearn"""
+        if self.lowercase:
+            texto = texto.lower()
+        if self._remover_acentos is not None:
+            texto = self._remover_acentos(texto)
+
+        tokens = self._token.findall(texto)
+        if self.stop_words is not None:
+            tokens = [token for token in tokens if token not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        termos = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n + 1, len(tokens) + 1)):
+            for i in range(len(tokens) - n + 1):
+                termos.append(' '.join(tokens[i:i + n]))
+        return termos
+
+    def contar(self, textos):
+        """(indptr, indices, contagens) das contagens de termos do vocabulário, índices ordenados por linha"""
+        vocabulario = self.vocabulary_
+        indptr = [0]
+        indices = []
+        contagens = []
+
+        for texto in textos:
+            contador = {}
+            for termo in self.analisar(texto):
+                indice = vocabulario.get(termo)
+                if indice is not None:
+                    contador[indice] = contador.get(indice, 0) + 1
+            for indice in sorted(contador):
+                indices.append(indice)
+                contagens.append(contador[indice])
+            indptr.append(len(indices))
+
+        return (
+            np.array(indptr, dtype=np.int32),
+            np.array(indices, dtype=np.int32),
+            np.array(contagens, dtype=self.dtype)
+        )
+
+    def ponderar(self, indptr, indices, valores):
+        """Aplica tf sublinear/binário, idf e normalização sobre os valores (em lugar)"""
+        if self.binary:
+            valores.fill(1)
+        if self.sublinear_tf:
+            np.log(valores, valores)
+            valores += 1.0
+        if self.idf is not None:
+            valores *= self.idf[indices]
+        if self.norm is not None and len(valores):
+            normalizar_linhas(indptr, valores, self.norm)
+        return valores
+
+    def transformar_csr(self, textos):
+        """(indptr, indices, valores) da matriz TF-IDF, sem scipy"""
+        indptr, indices, valores = self.contar(textos)
+        return indptr, indices, self.ponderar(indptr, indices, valores)
+
+    def transform(self, textos):
+        """Matriz CSR idêntica à de TfidfVectorizer.transform"""
+        import scipy.sparse as sp
+
+        indptr, indices, valores = self.transformar_csr(textos)
+        return sp.csr_matrix((valores, indices, indptr), shape=(len(indptr) - 1, len(self.vocabulario)))
+
+
+def normalizar_linhas(indptr, valores, norm):
+    """
+    Normaliza cada linha CSR como sklearn.preprocessing.normalize
+
+    O sklearn acumula a norma em double, elemento a elemento na ordem das colunas;
+    a soma cumulativa sobre as linhas preenchidas com zeros reproduz essa ordem
+    (a soma pairwise de np.sum poderia diferir no último bit).
+    """
+    if norm == 'l2':
+        termos = (valores * valores).astype(np.float64)
+    else:
+        termos = np.abs(valores).astype(np.float64)
+
+    n_por_linha = np.diff(indptr)
+    normas = np.empty(len(n_por_linha), dtype=np.float64)
+    for inicio in range(0, len(n_por_linha), LINHAS_POR_BLOCO):
+        fim = min(inicio + LINHAS_POR_BLOCO, len(n_por_linha))
+        normas[inicio:fim] = _somas_sequenciais(termos[indptr[inicio]:indptr[fim]], n_por_linha[inicio:fim])
+
+    if norm == 'l2':
+        normas = np.sqrt(normas)
+    normas[normas == 0.0] = 1.0
+    valores[:] = valores.astype(np.float64) / np.repeat(normas, n_por_linha)
+    return valores
+
+
+def _somas_sequenciais(termos, n_por_linha):
+    """Soma de cada linha na ordem dos elementos (linhas preenchidas com zeros + soma cumulativa)"""
+    largura = int(n_por_linha.max(initial=0))
+    if largura == 0:
+        return np.zeros(len(n_por_linha))
+
+    inicios = np.cumsum(n_por_linha) - n_por_linha
+    linhas = np.repeat(np.arange(len(n_por_linha)), n_por_linha)
+    preenchido = np.zeros((len(n_por_linha), largura), dtype=np.float64)
+    preenchido[linhas, np.arange(len(termos)) - inicios[linhas]] = termos
+    return np.cumsum(preenchido, axis=1)[:, -1]
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Detecção de vazamento de informação (termos de decisão) nas ementas
+A lista de termos é compilada uma vez em uma única expressão regular
+(alternância) e cada ementa, já em minúsculas, é varrida em uma passada pelo
+motor RE2 do pyarrow (em requirements.txt). Para listar os termos, a mesma
+passada marca cada ocorrência e os termos contidos nelas saem de uma tabela
+pré-calculada. Máscara e termos são os mesmos de `palavra in texto.lower()`
+para cada termo; sem o pyarrow, esse laço é usado diretamente (mais lento).
+Os blocos de linhas podem ser divididos entre processos
+"""
+
+import multiprocessing
+import re
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+# Palavras indicativas de decisão que podem indicar vazamento
+PALAVRAS_VAZAMENTO = [
+    'provido', 'negado', 'mantém-se', 'mantem-se', 'improcedente', 'procedente',
+    'dar provimento', 'nega-se', 'recurso conhecido', 'decide-se', 'não se conhece',
+    'voto de qualidade', 'unânime', 'maioria', 'qualidade', 'acordam os membros',
+    'por unanimidade', 'por maioria', 'votaram', 'conclusões', 'julgamento',
+    'decisão', 'acórdão', 'sentença', 'resultado', 'provimento', 'negação',
+    'acordam', 'votação', 'votou', 'deliberou', 'julgou', 'decidiu'
+]
+
+# verificar_dataset_limpo.py confere só os 27 primeiros termos (sem 'acordam' ... 'decidiu')
+PALAVRAS_VERIFICACAO = PALAVRAS_VAZAMENTO[:27]
+
+TAMANHO_BLOCO_PADRAO = 20000
+
+# Delimitador das ocorrências marcadas na passada que lista os termos
+_MARCA = '\x00'
+
+# 'İ' é o único caractere cuja minúscula no pyarrow ('i') difere da do Python ('i' + ponto
+# combinante) de um jeito que altera a busca pelos termos
+_MINUSCULA_DIVERGENTE = 'İ'
+
+
+def contem_vazamento_linha(texto, palavras=PALAVRAS_VAZAMENTO):
+    """Detecta possível vazamento de informação no texto (regra original, um termo por vez)"""
+    if pd.isna(texto):
+        return False
+
+    texto_lower = str(texto).lower()
+
+    # Verificar cada palavra
+    for palavra in palavras:
+        if palavra in texto_lower:
+            return True
+
+    return False
+
+
+def _escapar(palavra):
+    """Escapa os metacaracteres aceitos tanto pelo re quanto pelo RE2"""
+    return re.sub(r'([\\.^$|?*+()\[\]{}])', r'\\\1', palavra)
+
+
+def _minusculas_python(textos):
+    """str(texto).lower() de cada linha, None para ausentes (caminho sem pyarrow)"""
+    return [None if pd.isna(texto) else str(texto).lower() for texto in textos]
+
+
+def _para_numpy(booleanos):
+    """Array booleano do pyarrow como numpy, com nulos como False"""
+    return pc.fill_null(booleanos, False).to_numpy(zero_copy_only=False)
+
+
+class DetectorVazamento:
+    """
+    Termos de vazamento compilados uma vez
+
+    mascara(textos) marca as linhas com algum termo; termos(textos) lista, por
+    linha, os termos encontrados (tupla vazia se nenhum), na ordem de palavras.
+
+    A varredura não sobrepõe ocorrências, então um termo pode não aparecer como
+    ocorrência própria: ou está contido em outra ('qualidade' em 'voto de
+    qualidade'), e vem da tabela de contidos, ou começa dentro dela e continua
+    depois ('acordam' + 'maioria' em 'acordamaioria'), e só então é conferido
+    com `in` nas linhas em que o termo parceiro apareceu.
+    """
+
+    def __init__(self, palavras=PALAVRAS_VAZAMENTO):
+        self.palavras = tuple(palavras)
+        # Termos mais longos primeiro: a alternância prefere o termo completo ('acordam os membros' a 'acordam')
+        self.padrao = '|'.join(_escapar(palavra) for palavra in sorted(self.palavras, key=len, reverse=True))
+        self._palavras_array = np.array(self.palavras, dtype=object)
+
+        # contidos[i, j]: termo j contido no termo i (inclusive i == j);
+        # parceiros[i, j]: termo j pode começar dentro de uma ocorrência do termo i e terminar depois dela
+        self._contidos = np.array([[b in a for b in self.palavras] for a in self.palavras], dtype=np.uint8)
+        self._parceiros = np.array([
+            [b not in a and any(a[-k:] == b[:k] for k in range(1, min(len(a), len(b)))) for b in self.palavras]
+            for a in self.palavras
+        ], dtype=np.uint8)
+        self._palavras_arrow = pa.array(self.palavras, type=pa.large_string()) if pa is not None else None
+
+    def _minusculas(self, textos):
+        """Textos em minúsculas como array do pyarrow (nulos preservados)"""
+        serie = pd.Series(textos, dtype=object)
+        try:
+            array = pa.array(serie, type=pa.large_string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Valores que não são texto: str(valor), como na regra original
+            array = pa.array(serie.where(serie.isna(), serie.astype(str)), type=pa.large_string(), from_pandas=True)
+
+        minusculas = pc.utf8_lower(array)
+
+        # Só linhas cujo tamanho em bytes muda ao passar para minúsculas podem ter 'İ'
+        alteradas = np.flatnonzero(_para_numpy(pc.not_equal(pc.binary_length(array), pc.binary_length(minusculas))))
+        corrigir = [i for i in alteradas if _MINUSCULA_DIVERGENTE in array[int(i)].as_py()]
+        if corrigir:
+            valores = minusculas.to_pylist()
+            for i in corrigir:
+                valores[i] = array[int(i)].as_py().lower()
+            minusculas = pa.array(valores, type=pa.large_string())
+        return minusculas
+
+    def _mascara_minusculas(self, minusculas):
+        return _para_numpy(pc.match_substring_regex(minusculas, self.padrao))
+
+    def _mascara_termos_minusculas(self, minusculas):
+        """Máscara e termos por linha em uma passada: cada ocorrência é marcada entre _MARCA"""
+        marcado = pc.replace_substring_regex(minusculas, pattern=self.padrao, replacement=f'{_MARCA}\\0{_MARCA}')
+        mascara = _para_numpy(pc.not_equal(pc.binary_length(marcado), pc.binary_length(minusculas)))
+
+        # Pedaços iguais a um termo são as ocorrências (texto fora delas não pode ser um termo inteiro)
+        pedacos = pc.split_pattern(marcado.filter(pa.array(mascara)), _MARCA)
+        linhas = pc.list_parent_indices(pedacos).to_numpy()
+        indices = pc.index_in(pc.list_flatten(pedacos), value_set=self._palavras_arrow)
+        validos = _para_numpy(pc.is_valid(indices))
+        ocorrencias = np.zeros((int(mascara.sum()), len(self.palavras)), dtype=np.uint8)
+        ocorrencias[linhas[validos], indices.drop_null().to_numpy()] = 1
+
+        presentes = (ocorrencias @ self._contidos) > 0
+        candidatos = ((ocorrencias @ self._parceiros) > 0) & ~presentes
+        if candidatos.any():
+            com_vazamento = minusculas.filter(pa.array(mascara))
+            for i in np.flatnonzero(candidatos.any(axis=1)):
+                texto = com_vazamento[int(i)].as_py()
+                for j in np.flatnonzero(candidatos[i]):
+                    if self.palavras[j] in texto:
+                        presentes[i] |= self._contidos[j].astype(bool)
+
+        termos = [()] * len(mascara)
+        for i, linha in zip(np.flatnonzero(mascara), presentes):
+            termos[i] = tuple(self._palavras_array[linha])
+        return mascara, termos
+
+    def mascara(self, textos):
+        """Array booleano: linhas com algum termo de vazamento (ausentes: False)"""
+        return self.detectar(textos)[0]
+
+    def termos(self, textos):
+        """Tupla dos termos encontrados em cada linha (vazia sem vazamento)"""
+        return self.detectar(textos, termos=True)[1]
+
+    def detectar(self, textos, termos=False):
+        """(máscara, termos por linha ou None), passando os textos para minúsculas uma única vez"""
+        if pa is None:
+            minusculas = _minusculas_python(textos)
+            mascara = np.array([texto is not None and any(palavra in texto for palavra in self.palavras)
+                                for texto in minusculas], dtype=bool)
+            if not termos:
+                return mascara, None
+            return mascara, [tuple(palavra for palavra in self.palavras if palavra in texto) if encontrado else ()
+                             for texto, encontrado in zip(minusculas, mascara)]
+
+        minusculas = self._minusculas(textos)
+        if termos:
+            return self._mascara_termos_minusculas(minusculas)
+        return self._mascara_minusculas(minusculas), None
+
+
+# Detector de cada processo do pool, compilado uma vez (ver _inicializar_trabalhador)
+_DETECTOR_TRABALHADOR = None
+
+
+def _inicializar_trabalhador(palavras):
+    """Initializer do pool: compila os termos uma única vez em cada processo"""
+    global _DETECTOR_TRABALHADOR
+    _DETECTOR_TRABALHADOR = DetectorVazamento(palavras)
+
+
+def _detectar_bloco_trabalhador(argumentos):
+    textos, termos = argumentos
+    return _DETECTOR_TRABALHADOR.detectar(textos, termos)
+
+
+def detectar_vazamento(textos, palavras=PALAVRAS_VAZAMENTO, termos=False, n_processos=1,
+                       tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    """
+    Detecta vazamento em uma coluna de ementas, em blocos de tamanho_bloco linhas
+
+    Retorna um DataFrame com o índice de textos e a coluna possivel_vazamento
+    (mais termos_vazamento, com a tupla dos termos por linha, se termos=True).
+    Com n_processos > 1, os blocos são divididos entre um pool de processos.
+    """
+    serie = pd.Series(textos, dtype=object) if not isinstance(textos, pd.Series) else textos
+    blocos = [(serie.iloc[inicio:inicio + tamanho_bloco].tolist(), termos)
+              for inicio in range(0, len(serie), tamanho_bloco)]
+
+    if n_processos > 1 and len(blocos) > 1:
+        contexto = multiprocessing.get_context()
+        with contexto.Pool(min(n_processos, len(blocos)), initializer=_inicializar_trabalhador,
+                           initargs=(list(palavras),)) as pool:
+            resultados = pool.map(_detectar_bloco_trabalhador, blocos)
+    else:
+        detector = DetectorVazamento(palavras)
+        resultados = [detector.detectar(textos_bloco, termos_bloco) for textos_bloco, termos_bloco in blocos]
+
+    resultado = pd.DataFrame(
+        {'possivel_vazamento': np.concatenate([mascara for mascara, _ in resultados]) if resultados
+         else np.zeros(0, dtype=bool)},
+        index=serie.index
+    )
+    if termos:
+        resultado['termos_vazamento'] = [termos_linha for _, termos_bloco in resultados for termos_linha in termos_bloco]
+    return resultado
+
+
+def frequencia_termos(termos_vazamento):
+    """Linhas em que cada termo aparece, do mais ao menos frequente"""
+    return pd.Series([termo for termos_linha in termos_vazamento for termo in termos_linha],
+                     dtype=object).value_counts()
@@ -6,78 +6,62 @@ Script para treinar modelo CARF usando dados de 2023 (treinamento) e 2024 (teste
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
-from sklearn.feature_extraction.text import TfidfVectorizer
 import joblib
+import json
 import pickle
+import os
+import sys
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
-def categorizar_provimento(resultado):
-    """Categoriza o resultado do julgamento"""
-    if pd.isna(resultado):
-        return None
-    
-    resultado_str = str(resultado).lower()
-    
-    if 'provido' in resultado_str and 'parcial' not in resultado_str and 'negado' not in resultado_str:
-        return 'Provido Total'
-    elif 'provido' in resultado_str and 'parcial' in resultado_str:
-        return 'Provido Parcial'
-    elif 'negado' in resultado_str:
-        return 'Negado'
-    elif 'nao conhecido' in resultado_str or 'não conhecido' in resultado_str:
-        return 'Nao Conhecido'
-    else:
-        return 'Outros'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.alvos import categorizar_provimento, criar_target_votacao
+from lexcarf.featurizador import Featurizador, salvar_preprocessors_compactos
+from lexcarf.memoria import relatorio_memoria
+from lexcarf.modelos import (ARQUIVO_PREPROCESSORS_COMPACTOS_2023, DIR_MODELOS, caminhos_modelos_2023,
+                             exportar_florestas_2023, exportar_pacote_2023)
+from lexcarf.modelo_conjunto import comparar_com_modelos_separados, imprimir_comparacao
+from lexcarf.rastreamento import Rastreador
 
-def criar_target_votacao(votacao, resultado):
-    """Cria target para tipo de votação"""
-    if pd.isna(votacao) or pd.isna(resultado):
-        return None
-    
-    votacao_str = str(votacao).strip()
-    resultado_str = str(resultado).lower()
-    
-    # Só considerar casos onde houve provimento
-    if 'provido' in resultado_str and 'negado' not in resultado_str:
-        if votacao_str == 'Unânime':
-            return 'Unânime'
-        elif votacao_str == 'Maioria':
-            return 'Maioria'
-        elif votacao_str == 'Qualidade':
-            return 'Qualidade'
-        elif votacao_str == 'Empate - Lei 13.988/2020':
-            return 'Empate'
-    
-    return None
+# Rastro por etapa (tempo de parede, CPU e memória) gravado ao fim do treinamento
+ARQUIVO_RASTREIO = '../rastreio_treino_2023.json'
 
 def main():
+    # --conjunto: treina também o modelo conjunto (uma floresta para provimento e votação) e compara
+    treinar_conjunto = '--conjunto' in sys.argv[1:]
+    rastreador = Rastreador('train_model_2023_2024', conjunto=treinar_conjunto)
     print("Treinando modelo CARF com dados 2023 (treinamento) e 2024 (teste)...")
     
     # Carregar dados de treinamento (2023)
-    df_train = pd.read_csv('../dados/carf_2023_sem_vazamento.csv')
+    with rastreador.etapa('leitura_csv_treino') as etapa:
+        df_train = pd.read_csv('../dados/carf_2023_sem_vazamento.csv')
+        etapa.atributos['linhas'] = len(df_train)
     print(f'Dados de treinamento 2023: {df_train.shape}')
     
     # Carregar dados de teste (2024)
-    df_test = pd.read_csv('../dados/carf_sem_vazamento.csv')
+    with rastreador.etapa('leitura_csv_teste') as etapa:
+        df_test = pd.read_csv('../dados/carf_sem_vazamento.csv')
+        etapa.atributos['linhas'] = len(df_test)
     print(f'Dados de teste 2024: {df_test.shape}')
+    relatorio_memoria('leitura dos CSVs')
     
-    # Limpeza básica dos dados de treinamento
-    df_train_clean = df_train.dropna(subset=['resultado_julgamento', 'votacao', 'texto_ementa', 'tributo'])
+    with rastreador.etapa('dropna') as etapa:
+        # Limpeza básica dos dados de treinamento
+        df_train_clean = df_train.dropna(subset=['resultado_julgamento', 'votacao', 'texto_ementa', 'tributo'])
+        
+        # Limpeza básica dos dados de teste
+        df_test_clean = df_test.dropna(subset=['resultado_julgamento', 'votacao', 'texto_ementa', 'tributo'])
+        etapa.atributos['linhas'] = len(df_train_clean) + len(df_test_clean)
     print(f'Dados de treinamento após limpeza: {df_train_clean.shape}')
-    
-    # Limpeza básica dos dados de teste
-    df_test_clean = df_test.dropna(subset=['resultado_julgamento', 'votacao', 'texto_ementa', 'tributo'])
     print(f'Dados de teste após limpeza: {df_test_clean.shape}')
     
     # Criar categorias de provimento para treinamento
-    df_train_clean['categoria_provimento'] = df_train_clean['resultado_julgamento'].apply(categorizar_provimento)
+    with rastreador.etapa('categorizar_provimento_treino', linhas=len(df_train_clean)):
+        df_train_clean['categoria_provimento'] = categorizar_provimento(df_train_clean['resultado_julgamento'])
     
     # Remover casos não conhecidos e outros para o modelo de provimento
     df_train_provimento = df_train_clean[df_train_clean['categoria_provimento'].isin(['Provido Total', 'Provido Parcial', 'Negado'])]
@@ -86,53 +70,22 @@ def main():
     print(df_train_provimento['categoria_provimento'].value_counts())
     
     # Criar target para votação (apenas casos de provimento)
-    df_train_provimento['target_votacao'] = df_train_provimento.apply(
-        lambda row: criar_target_votacao(row['votacao'], row['resultado_julgamento']), 
-        axis=1
-    )
+    with rastreador.etapa('criar_target_votacao_treino', linhas=len(df_train_provimento)):
+        df_train_provimento['target_votacao'] = criar_target_votacao(
+            df_train_provimento['votacao'], df_train_provimento['resultado_julgamento']
+        )
     
     df_train_votacao = df_train_provimento.dropna(subset=['target_votacao'])
     print(f'Dados para modelo de votação (treinamento): {df_train_votacao.shape}')
     print(f'Distribuição de votação (treinamento):')
     print(df_train_votacao['target_votacao'].value_counts())
     
-    # Preparar features para ambos os modelos
-    le_tributo = LabelEncoder()
-    le_turma = LabelEncoder()
-    
-    # Codificar tributo
-    tributo_counts = df_train_provimento['tributo'].value_counts()
-    tributos_frequentes = tributo_counts[tributo_counts >= 30].index.tolist()  # Reduzido para 2023
-    
-    df_train_provimento['tributo_codificado'] = df_train_provimento['tributo'].apply(
-        lambda x: x if x in tributos_frequentes else 'OUTROS'
-    )
-    df_train_provimento['tributo_encoded'] = le_tributo.fit_transform(df_train_provimento['tributo_codificado'])
-    
-    # Codificar turma
-    df_train_provimento['turma_simplificada'] = df_train_provimento['turma'].str.extract(r'(\d+ª)')[0].fillna('OUTROS')
-    df_train_provimento['turma_encoded'] = le_turma.fit_transform(df_train_provimento['turma_simplificada'])
-    
-    # TF-IDF
-    df_train_provimento['texto_ementa_clean'] = df_train_provimento['texto_ementa'].fillna('').astype(str)
-    df_train_provimento['texto_ementa_clean'] = df_train_provimento['texto_ementa_clean'].str[:1000]
-    
-    tfidf = TfidfVectorizer(
-        max_features=1000,
-        stop_words=None,
-        ngram_range=(1, 2),
-        min_df=2,
-        max_df=0.95
-    )
-    
-    tfidf_matrix = tfidf.fit_transform(df_train_provimento['texto_ementa_clean'])
-    print(f'TF-IDF shape (treinamento): {tfidf_matrix.shape}')
-    
-    # Features categóricas
-    features_categoricas = ['tributo_encoded', 'turma_encoded']
-    X_categoricas = df_train_provimento[features_categoricas].values
-    X_texto = tfidf_matrix.toarray()
-    X_combined = np.hstack([X_categoricas, X_texto])
+    # Preparar features para ambos os modelos (mesmo featurizador usado na inferência)
+    featurizador = Featurizador(min_contagem_tributo=30)  # Reduzido para 2023
+    with rastreador.etapa('ajuste_tfidf_treino', linhas=len(df_train_provimento)):
+        X_combined = featurizador.ajustar_transformar(df_train_provimento)
+    print(f'Features (treinamento): {X_combined.shape}')
+    relatorio_memoria('features de treinamento', X_combined)
     
     # MODELO 1: Provimento (Total, Parcial, Negado)
     print('\n=== TREINANDO MODELO DE PROVIMENTO ===')
@@ -147,13 +100,16 @@ def main():
         class_weight='balanced'
     )
     
-    rf_model_provimento.fit(X_combined, y_provimento)
+    inicio_treino = time.perf_counter()
+    with rastreador.etapa('fit_provimento', linhas=X_combined.shape[0]):
+        rf_model_provimento.fit(X_combined, y_provimento)
     print('Modelo de Provimento treinado!')
+    relatorio_memoria('treino do modelo de provimento')
     
     # MODELO 2: Votação (Unânime, Maioria, Qualidade, Empate) - apenas casos de provimento
     print('\n=== TREINANDO MODELO DE VOTAÇÃO ===')
     
-    X_votacao = X_combined[df_train_provimento['target_votacao'].notna()]
+    X_votacao = X_combined[df_train_provimento['target_votacao'].notna().values]
     y_votacao = df_train_votacao['target_votacao'].values
     
     rf_model_votacao = RandomForestClassifier(
@@ -165,86 +121,117 @@ def main():
         class_weight='balanced'
     )
     
-    rf_model_votacao.fit(X_votacao, y_votacao)
+    with rastreador.etapa('fit_votacao', linhas=X_votacao.shape[0]):
+        rf_model_votacao.fit(X_votacao, y_votacao)
+    tempo_treino = time.perf_counter() - inicio_treino
     print('Modelo de Votação treinado!')
+    relatorio_memoria('treino do modelo de votação')
     
     # TESTE COM DADOS DE 2024
     print('\n=== TESTANDO COM DADOS DE 2024 ===')
     
     # Preparar dados de teste
-    df_test_clean['categoria_provimento'] = df_test_clean['resultado_julgamento'].apply(categorizar_provimento)
+    with rastreador.etapa('categorizar_provimento_teste', linhas=len(df_test_clean)):
+        df_test_clean['categoria_provimento'] = categorizar_provimento(df_test_clean['resultado_julgamento'])
     df_test_provimento = df_test_clean[df_test_clean['categoria_provimento'].isin(['Provido Total', 'Provido Parcial', 'Negado'])]
     
-    # Aplicar mesmas transformações
-    df_test_provimento['tributo_codificado'] = df_test_provimento['tributo'].apply(
-        lambda x: x if x in tributos_frequentes else 'OUTROS'
-    )
-    df_test_provimento['tributo_encoded'] = le_tributo.transform(df_test_provimento['tributo_codificado'])
-    
-    df_test_provimento['turma_simplificada'] = df_test_provimento['turma'].str.extract(r'(\d+ª)')[0].fillna('OUTROS')
-    df_test_provimento['turma_encoded'] = le_turma.transform(df_test_provimento['turma_simplificada'])
-    
-    df_test_provimento['texto_ementa_clean'] = df_test_provimento['texto_ementa'].fillna('').astype(str)
-    df_test_provimento['texto_ementa_clean'] = df_test_provimento['texto_ementa_clean'].str[:1000]
-    
-    # TF-IDF para teste
-    X_test_categoricas = df_test_provimento[features_categoricas].values
-    X_test_texto = tfidf.transform(df_test_provimento['texto_ementa_clean']).toarray()
-    X_test_combined = np.hstack([X_test_categoricas, X_test_texto])
+    # Aplicar as mesmas transformações
+    with rastreador.etapa('featurizacao_teste', linhas=len(df_test_provimento)):
+        X_test_combined = featurizador.transformar(df_test_provimento)
+    relatorio_memoria('features de teste', X_test_combined)
     
     # Predições de provimento
-    y_test_provimento = df_test_provimento['categoria_provimento'].values
-    y_pred_provimento = rf_model_provimento.predict(X_test_combined)
-    
-    print('Modelo de Provimento - Métricas no teste 2024:')
-    print(classification_report(y_test_provimento, y_pred_provimento))
+    with rastreador.etapa('avaliacao_provimento', linhas=len(df_test_provimento)):
+        y_test_provimento = df_test_provimento['categoria_provimento'].values
+        y_pred_provimento = rf_model_provimento.predict(X_test_combined)
+        
+        print('Modelo de Provimento - Métricas no teste 2024:')
+        print(classification_report(y_test_provimento, y_pred_provimento))
     
     # Predições de votação
-    df_test_provimento['target_votacao'] = df_test_provimento.apply(
-        lambda row: criar_target_votacao(row['votacao'], row['resultado_julgamento']), 
-        axis=1
-    )
+    with rastreador.etapa('criar_target_votacao_teste', linhas=len(df_test_provimento)):
+        df_test_provimento['target_votacao'] = criar_target_votacao(
+            df_test_provimento['votacao'], df_test_provimento['resultado_julgamento']
+        )
     df_test_votacao = df_test_provimento.dropna(subset=['target_votacao'])
     
     if len(df_test_votacao) > 0:
-        X_test_votacao = X_test_combined[df_test_provimento['target_votacao'].notna()]
-        y_test_votacao = df_test_votacao['target_votacao'].values
-        y_pred_votacao = rf_model_votacao.predict(X_test_votacao)
-        
-        print('Modelo de Votação - Métricas no teste 2024:')
-        print(classification_report(y_test_votacao, y_pred_votacao))
+        with rastreador.etapa('avaliacao_votacao', linhas=len(df_test_votacao)):
+            X_test_votacao = X_test_combined[df_test_provimento['target_votacao'].notna().values]
+            y_test_votacao = df_test_votacao['target_votacao'].values
+            y_pred_votacao = rf_model_votacao.predict(X_test_votacao)
+            
+            print('Modelo de Votação - Métricas no teste 2024:')
+            print(classification_report(y_test_votacao, y_pred_votacao))
+    
+    relatorio_memoria('avaliação')
     
-    # Salvar modelos e componentes
+    # Salvar modelos e componentes em modelos/, de onde as aplicações, o run.py e os carregadores com mmap leem
     print('\n=== SALVANDO MODELOS ===')
+    os.makedirs(DIR_MODELOS, exist_ok=True)
+    caminhos = caminhos_modelos_2023(DIR_MODELOS)
     
     # Salvar modelo de provimento
-    joblib.dump(rf_model_provimento, '../modelo_carf_provimento_2023.pkl')
-    
-    # Salvar modelo de votação
-    joblib.dump(rf_model_votacao, '../modelo_carf_votacao_2023.pkl')
-    
-    feature_names = features_categoricas + [f'tfidf_{i}' for i in range(tfidf_matrix.shape[1])]
+    with rastreador.etapa('salvar_modelos_pkl'):
+        joblib.dump(rf_model_provimento, caminhos['provimento'])
+        
+        # Salvar modelo de votação
+        joblib.dump(rf_model_votacao, caminhos['votacao'])
     
-    # Salvar componentes de pré-processamento
-    with open('../preprocessors_2023.pkl', 'wb') as f:
-        pickle.dump({
-            'le_tributo': le_tributo,
-            'le_turma': le_turma,
-            'tfidf': tfidf,
-            'tributos_frequentes': tributos_frequentes,
-            'feature_names': feature_names
-        }, f)
+    with rastreador.etapa('salvar_preprocessors'):
+        # Salvar componentes de pré-processamento (sklearn e dicts; o featurizador é reconstruído ao carregar)
+        with open(caminhos['preprocessors'], 'wb') as f:
+            pickle.dump(featurizador.para_preprocessors(), f)
+        
+        # Salvar pré-processadores sem pickle (vocabulário, idf e encoders), lidos sem o sklearn
+        salvar_preprocessors_compactos(featurizador.para_preprocessors(),
+                                       os.path.join(DIR_MODELOS, ARQUIVO_PREPROCESSORS_COMPACTOS_2023))
+    
+    # Salvar florestas compiladas (mapeáveis em memória e compartilhadas entre processos)
+    with rastreador.etapa('salvar_florestas_compiladas'):
+        exportar_florestas_2023(DIR_MODELOS, rf_model_provimento, rf_model_votacao)
+    
+    # Salvar pacote único (modelos + pré-processadores) lido pelas aplicações e pelo run.py
+    with rastreador.etapa('salvar_pacote'):
+        caminho_pacote = exportar_pacote_2023(
+            DIR_MODELOS, model_provimento=rf_model_provimento, model_votacao=rf_model_votacao,
+            preprocessors=featurizador.para_preprocessors(),
+            metadados={'n_treino': len(df_train_provimento), 'n_teste': len(df_test_provimento)}
+        )
     
     print('Modelos e componentes salvos com sucesso!')
-    print('Arquivos criados:')
+    print(f'Arquivos criados em {DIR_MODELOS}:')
     print('- modelo_carf_provimento_2023.pkl (modelo de provimento)')
     print('- modelo_carf_votacao_2023.pkl (modelo de votação)')
     print('- preprocessors_2023.pkl (componentes de pré-processamento)')
+    print('- preprocessors_2023.npz (pré-processamento sem pickle)')
+    print('- modelo_carf_*_2023_compilado.joblib (florestas compiladas para mmap)')
+    print(f'- {caminho_pacote} (pacote único lido pelas aplicações)')
+    
+    if treinar_conjunto:
+        print('\n=== MODELO CONJUNTO (PROVIMENTO + VOTAÇÃO) vs. DOIS MODELOS ===')
+        with rastreador.etapa('modelo_conjunto', linhas=X_combined.shape[0]):
+            relatorio, modelo_conjunto = comparar_com_modelos_separados(
+                X_combined, y_provimento, df_train_provimento['target_votacao'].values,
+                X_test_combined, y_test_provimento, df_test_provimento['target_votacao'].values,
+                model_provimento=rf_model_provimento, model_votacao=rf_model_votacao,
+                tempo_treino_separados=tempo_treino
+            )
+        imprimir_comparacao(relatorio)
+        joblib.dump(modelo_conjunto, os.path.join(DIR_MODELOS, 'modelo_carf_conjunto_2023.pkl'))
+        with open('../comparacao_modelo_conjunto_2023.json', 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f'- {DIR_MODELOS}/modelo_carf_conjunto_2023.pkl e ../comparacao_modelo_conjunto_2023.json salvos')
     
     print('\n=== RESUMO FINAL ===')
     print(f'Dados de treinamento (2023): {len(df_train_provimento)} registros')
     print(f'Dados de teste (2024): {len(df_test_provimento)} registros')
     print(f'Modelos treinados e testados com sucesso!')
+    
+    # Tempo e memória por etapa, da mais lenta para a mais rápida
+    print('\n=== TEMPO E MEMÓRIA POR ETAPA ===')
+    rastreador.imprimir_resumo()
+    print(f'Rastro completo: {rastreador.exportar(ARQUIVO_RASTREIO)}')
 
 if __name__ == "__main__":
     main()
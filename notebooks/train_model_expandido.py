@@ -7,54 +7,22 @@ Inclui probabilidade de provimento (total, parcial, negação) e tipo de votaç
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report, confusion_matrix
-from sklearn.feature_extraction.text import TfidfVectorizer
 import joblib
 import pickle
+import os
+import sys
 import warnings
 warnings.filterwarnings('ignore')
 
-def categorizar_provimento(resultado):
-    """Categoriza o resultado do julgamento"""
-    if pd.isna(resultado):
-        return None
-    
-    resultado_str = str(resultado).lower()
-    
-    if 'provido' in resultado_str and 'parcial' not in resultado_str and 'negado' not in resultado_str:
-        return 'Provido Total'
-    elif 'provido' in resultado_str and 'parcial' in resultado_str:
-        return 'Provido Parcial'
-    elif 'negado' in resultado_str:
-        return 'Negado'
-    elif 'nao conhecido' in resultado_str or 'não conhecido' in resultado_str:
-        return 'Nao Conhecido'
-    else:
-        return 'Outros'
-
-def criar_target_votacao(votacao, resultado):
-    """Cria target para tipo de votação"""
-    if pd.isna(votacao) or pd.isna(resultado):
-        return None
-    
-    votacao_str = str(votacao).strip()
-    resultado_str = str(resultado).lower()
-    
-    # Só considerar casos onde houve provimento
-    if 'provido' in resultado_str and 'negado' not in resultado_str:
-        if votacao_str == 'Unânime':
-            return 'Unânime'
-        elif votacao_str == 'Maioria':
-            return 'Maioria'
-        elif votacao_str == 'Qualidade':
-            return 'Qualidade'
-    
-    return None
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.alvos import VOTACOES_SEM_EMPATE, categorizar_provimento, criar_target_votacao
+from lexcarf.featurizador import Featurizador
+from lexcarf.memoria import relatorio_memoria
+from lexcarf.modelos import caminho_pacote
+from lexcarf.pacote import salvar_pacote
 
 def main():
     print("Treinando modelo CARF expandido...")
@@ -68,7 +36,7 @@ def main():
     print(f'Dados após limpeza: {df_clean.shape}')
 
     # Criar categorias de provimento
-    df_clean['categoria_provimento'] = df_clean['resultado_julgamento'].apply(categorizar_provimento)
+    df_clean['categoria_provimento'] = categorizar_provimento(df_clean['resultado_julgamento'])
     
     # Remover casos não conhecidos e outros para o modelo de provimento
     df_provimento = df_clean[df_clean['categoria_provimento'].isin(['Provido Total', 'Provido Parcial', 'Negado'])]
@@ -77,9 +45,8 @@ def main():
     print(df_provimento['categoria_provimento'].value_counts())
 
     # Criar target para votação (apenas casos de provimento)
-    df_provimento['target_votacao'] = df_provimento.apply(
-        lambda row: criar_target_votacao(row['votacao'], row['resultado_julgamento']), 
-        axis=1
+    df_provimento['target_votacao'] = criar_target_votacao(
+        df_provimento['votacao'], df_provimento['resultado_julgamento'], VOTACOES_SEM_EMPATE
     )
 
     df_votacao = df_provimento.dropna(subset=['target_votacao'])
@@ -87,43 +54,11 @@ def main():
     print(f'Distribuição de votação:')
     print(df_votacao['target_votacao'].value_counts())
 
-    # Preparar features para ambos os modelos
-    le_tributo = LabelEncoder()
-    le_turma = LabelEncoder()
-
-    # Codificar tributo
-    tributo_counts = df_provimento['tributo'].value_counts()
-    tributos_frequentes = tributo_counts[tributo_counts >= 50].index.tolist()
-
-    df_provimento['tributo_codificado'] = df_provimento['tributo'].apply(
-        lambda x: x if x in tributos_frequentes else 'OUTROS'
-    )
-    df_provimento['tributo_encoded'] = le_tributo.fit_transform(df_provimento['tributo_codificado'])
-
-    # Codificar turma
-    df_provimento['turma_simplificada'] = df_provimento['turma'].str.extract(r'(\d+ª)')[0].fillna('OUTROS')
-    df_provimento['turma_encoded'] = le_turma.fit_transform(df_provimento['turma_simplificada'])
-
-    # TF-IDF
-    df_provimento['texto_ementa_clean'] = df_provimento['texto_ementa'].fillna('').astype(str)
-    df_provimento['texto_ementa_clean'] = df_provimento['texto_ementa_clean'].str[:1000]
-
-    tfidf = TfidfVectorizer(
-        max_features=1000,
-        stop_words=None,
-        ngram_range=(1, 2),
-        min_df=2,
-        max_df=0.95
-    )
-
-    tfidf_matrix = tfidf.fit_transform(df_provimento['texto_ementa_clean'])
-    print(f'TF-IDF shape: {tfidf_matrix.shape}')
-
-    # Features categóricas
-    features_categoricas = ['tributo_encoded', 'turma_encoded']
-    X_categoricas = df_provimento[features_categoricas].values
-    X_texto = tfidf_matrix.toarray()
-    X_combined = np.hstack([X_categoricas, X_texto])
+    # Preparar features (mesmo featurizador usado na inferência)
+    featurizador = Featurizador(min_contagem_tributo=50)
+    X_combined = featurizador.ajustar_transformar(df_provimento)
+    print(f'Features: {X_combined.shape}')
+    relatorio_memoria('features', X_combined)
 
     # MODELO 1: Provimento (Total, Parcial, Negado)
     print('\n=== TREINANDO MODELO DE PROVIMENTO ===')
@@ -147,12 +82,13 @@ def main():
 
     print('Modelo de Provimento - Métricas:')
     print(classification_report(y_test_prov, y_pred_prov))
+    relatorio_memoria('treino e avaliação do modelo de provimento')
 
     # MODELO 2: Votação (Unânime, Maioria, Qualidade) - apenas casos de provimento
     print('\n=== TREINANDO MODELO DE VOTAÇÃO ===')
     
     # Usar os mesmos pré-processadores para consistência
-    X_votacao = X_combined[df_provimento['target_votacao'].notna()]
+    X_votacao = X_combined[df_provimento['target_votacao'].notna().values]
     y_votacao = df_votacao['target_votacao'].values
 
     X_train_vot, X_test_vot, y_train_vot, y_test_vot = train_test_split(
@@ -173,6 +109,7 @@ def main():
 
     print('Modelo de Votação - Métricas:')
     print(classification_report(y_test_vot, y_pred_vot))
+    relatorio_memoria('treino e avaliação do modelo de votação')
 
     # Salvar modelos e componentes
     print('\n=== SALVANDO MODELOS ===')
@@ -183,23 +120,24 @@ def main():
     # Salvar modelo de votação
     joblib.dump(rf_model_votacao, '../modelo_carf_votacao.pkl')
 
-    feature_names = features_categoricas + [f'tfidf_{i}' for i in range(tfidf_matrix.shape[1])]
-
-    # Salvar componentes de pré-processamento
+    # Salvar componentes de pré-processamento (sklearn e dicts; o featurizador é reconstruído ao carregar)
     with open('../preprocessors_expandido.pkl', 'wb') as f:
-        pickle.dump({
-            'le_tributo': le_tributo,
-            'le_turma': le_turma,
-            'tfidf': tfidf,
-            'tributos_frequentes': tributos_frequentes,
-            'feature_names': feature_names
-        }, f)
+        pickle.dump(featurizador.para_preprocessors(), f)
+
+    # Salvar pacote único (modelos + pré-processadores) lido pelas aplicações
+    salvar_pacote(
+        caminho_pacote('expandido'),
+        {'provimento': rf_model_provimento, 'votacao': rf_model_votacao},
+        featurizador.para_preprocessors(),
+        metadados={'conjunto': 'expandido', 'n_treino': X_train_prov.shape[0]}
+    )
 
     print('Modelos e componentes salvos com sucesso!')
     print('Arquivos criados:')
     print('- modelo_carf_provimento.pkl (modelo de provimento)')
     print('- modelo_carf_votacao.pkl (modelo de votação)')
     print('- preprocessors_expandido.pkl (componentes de pré-processamento)')
+    print('- modelos/modelo_carf_expandido.pacote (pacote único lido pelas aplicações)')
 
 if __name__ == "__main__":
     main()
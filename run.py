@@ -9,7 +9,41 @@ import os
 import sys
 import subprocess
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def servir(argv):
+    """Serviço HTTP de predição (sem interface): python run.py servir [--porta 8502]"""
+    from lexcarf.servico import main as main_servico
+    main_servico(argv, prog='run.py servir')
+
+def pontuar(argv):
+    """Pontuação de um CSV em blocos: python run.py pontuar dados/arquivo.csv [-o saida.csv]"""
+    from lexcarf.pontuacao import main as main_pontuacao
+    main_pontuacao(argv, prog='run.py pontuar')
+
+def prever(argv):
+    """Predição só com NumPy a partir do pacote (JSONL): python run.py prever entradas.jsonl [-o saida.jsonl]"""
+    from lexcarf.inferencia import main as main_inferencia
+    main_inferencia(argv, prog='run.py prever')
+
+def perfil_partida(argv):
+    """Perfil de imports dos pontos de entrada: python run.py --profile-startup [app servir ...]"""
+    from lexcarf.partida import main as main_partida
+    main_partida(argv, prog='run.py --profile-startup')
+
+SUBCOMANDOS = {
+    'servir': servir,
+    'pontuar': pontuar,
+    'prever': prever,
+    '--profile-startup': perfil_partida,
+    'score': pontuar,
+}
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMANDOS:
+        SUBCOMANDOS[sys.argv[1]](sys.argv[2:])
+        return
+    
     print("=" * 70)
     print("⚖️  CARF ML PREDICTOR 2023/2024")
     print("=" * 70)
@@ -17,13 +51,19 @@ def main():
     print("Modelos treinados com dados de 2023 e testados com dados de 2024")
     print("=" * 70)
     
-    # Verificar se os arquivos necessários existem
-    arquivos_necessarios = [
-        'aplicacoes/app_2023_2024.py',
-        'modelos/modelo_carf_provimento_2023.pkl',
-        'modelos/modelo_carf_votacao_2023.pkl',
-        'modelos/preprocessors_2023.pkl'
-    ]
+    # Verificar se os arquivos necessários existem (o pacote único substitui os três pickles)
+    if os.path.exists('modelos/modelo_carf_2023.pacote'):
+        arquivos_necessarios = [
+            'aplicacoes/app_2023_2024.py',
+            'modelos/modelo_carf_2023.pacote'
+        ]
+    else:
+        arquivos_necessarios = [
+            'aplicacoes/app_2023_2024.py',
+            'modelos/modelo_carf_provimento_2023.pkl',
+            'modelos/modelo_carf_votacao_2023.pkl',
+            'modelos/preprocessors_2023.pkl'
+        ]
     
     print("Verificando arquivos necessários...")
     todos_presentes = True
@@ -4,9 +4,15 @@
 Análise dos tipos de provimento nos dados CARF
 """
 
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.alvos import categorizar_provimento
+
 def main():
     # Carregar dados
     df = pd.read_csv('dados/carf_julgamentos_2024.csv')
@@ -20,24 +26,7 @@ def main():
     print(resultado_counts)
 
     # Criar categorias de provimento
-    def categorizar_provimento(resultado):
-        if pd.isna(resultado):
-            return None
-        
-        resultado_str = str(resultado).lower()
-        
-        if 'provido' in resultado_str and 'parcial' not in resultado_str and 'negado' not in resultado_str:
-            return 'Provido Total'
-        elif 'provido' in resultado_str and 'parcial' in resultado_str:
-            return 'Provido Parcial'
-        elif 'negado' in resultado_str:
-            return 'Negado'
-        elif 'nao conhecido' in resultado_str or 'não conhecido' in resultado_str:
-            return 'Nao Conhecido'
-        else:
-            return 'Outros'
-
-    df['categoria_provimento'] = df['resultado_julgamento'].apply(categorizar_provimento)
+    df['categoria_provimento'] = categorizar_provimento(df['resultado_julgamento'])
 
     print(f'\nDistribuicao de categoria_provimento:')
     categoria_counts = df['categoria_provimento'].value_counts()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: construção dos alvos vetorizada vs. apply por linha
+Compara categorizar_provimento e criar_target_votacao (lexcarf.alvos) com as
+regras originais aplicadas linha a linha, de 10 mil a 1 milhão de linhas, e
+confere que os rótulos são idênticos. O cenário de alta cardinalidade acrescenta
+um sufixo distinto a cada resultado (pior caso para a fatoração por valor)
+
+Uso: python scripts/benchmark_alvos.py [linhas ...]
+"""
+
+import os
+import sys
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.alvos import (categorizar_provimento, categorizar_provimento_linha, criar_target_votacao,
+                           criar_target_votacao_linha)
+from lexcarf.benchmark import CSV_EXEMPLO
+
+TAMANHOS_PADRAO = (10_000, 100_000, 1_000_000)
+
+# Resultados e votações fora do exemplo, para cobrir todas as regras (inclusive ausentes)
+RESULTADOS_EXTRAS = [
+    'Recurso Voluntário Provido Parcialmente', 'Recurso de Ofício Negado', 'Embargos Não Conhecidos',
+    'Recurso Especial do Contribuinte Nao Conhecido', 'RECURSO VOLUNTÁRIO PROVIDO', 'Provido e Negado',
+    'Anulada a decisão de primeira instância', 'Convertido em diligência', None,
+]
+VOTACOES_EXTRAS = ['Unânime', 'Maioria', 'Qualidade', 'Empate - Lei 13.988/2020', ' Maioria ', 'Voto de qualidade', None]
+
+
+def gerar_dados(n_linhas, alta_cardinalidade=False, seed=42):
+    """DataFrame com resultado_julgamento e votacao sorteados dos valores do exemplo e extras"""
+    rng = np.random.default_rng(seed)
+    exemplo = pd.read_csv(CSV_EXEMPLO)
+    resultados = np.array(list(exemplo['resultado_julgamento'].unique()) + RESULTADOS_EXTRAS, dtype=object)
+    votacoes = np.array(list(exemplo['votacao'].unique()) + VOTACOES_EXTRAS, dtype=object)
+
+    df = pd.DataFrame({
+        'resultado_julgamento': rng.choice(resultados, n_linhas),
+        'votacao': rng.choice(votacoes, n_linhas),
+    })
+    if alta_cardinalidade:
+        sufixo = pd.Series(np.arange(n_linhas)).astype(str)
+        df['resultado_julgamento'] = df['resultado_julgamento'].where(
+            df['resultado_julgamento'].isna(), df['resultado_julgamento'] + ' - processo ' + sufixo
+        )
+    return df
+
+
+def original(df):
+    """Alvos com as regras aplicadas linha a linha, como nos scripts antes da vetorização"""
+    categoria = df['resultado_julgamento'].apply(categorizar_provimento_linha)
+    votacao = df.apply(lambda row: criar_target_votacao_linha(row['votacao'], row['resultado_julgamento']), axis=1)
+    return categoria, votacao
+
+
+def vetorizado(df):
+    """Alvos com lexcarf.alvos"""
+    return categorizar_provimento(df['resultado_julgamento']), criar_target_votacao(df['votacao'],
+                                                                                     df['resultado_julgamento'])
+
+
+def iguais(a, b):
+    """Mesmos rótulos, com ausentes (None/NaN) considerados iguais entre si"""
+    ausentes_a, ausentes_b = a.isna().values, b.isna().values
+    return (ausentes_a == ausentes_b).all() and (a.values[~ausentes_a] == b.values[~ausentes_b]).all()
+
+
+def cronometrar(funcao, df):
+    inicio = time.perf_counter()
+    resultado = funcao(df)
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    tamanhos = [int(valor) for valor in sys.argv[1:]] or TAMANHOS_PADRAO
+
+    print("=" * 70)
+    print("BENCHMARK - CONSTRUÇÃO DOS ALVOS (VETORIZADA vs. APPLY POR LINHA)")
+    print("=" * 70)
+    print(f"{'cenário':<20} | {'linhas':>9} | {'apply (s)':>9} | {'vetorizado (s)':>14} | {'ganho':>7} | paridade")
+
+    todos_ok = True
+    for alta_cardinalidade in (False, True):
+        cenario = 'alta cardinalidade' if alta_cardinalidade else 'valores repetidos'
+        for n_linhas in tamanhos:
+            df = gerar_dados(n_linhas, alta_cardinalidade)
+            tempo_original, (categoria_original, votacao_original) = cronometrar(original, df)
+            tempo_vetorizado, (categoria, votacao) = cronometrar(vetorizado, df)
+
+            ok = iguais(categoria, categoria_original) and iguais(votacao, votacao_original)
+            todos_ok &= ok
+            print(f"{cenario:<20} | {n_linhas:>9} | {tempo_original:>9.3f} | {tempo_vetorizado:>14.3f} | "
+                  f"{tempo_original / tempo_vetorizado:>6.1f}x | {'OK' if ok else 'ERRO'}")
+
+    print("\n" + ("STATUS: RÓTULOS IDÊNTICOS EM TODOS OS CENÁRIOS" if todos_ok else "STATUS: RÓTULOS DIFERENTES"))
+    sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: predição antecipada (anytime) vs. avaliação completa das 100 árvores
+Para alguns níveis de confiança e orçamentos de latência, mede a latência por
+linha (uso interativo) e do lote, o número médio de árvores avaliadas, a
+concordância da classe prevista com a avaliação completa e o maior desvio
+de probabilidade, para as florestas compiladas e as do sklearn.
+
+Uso: python scripts/benchmark_antecipada.py [linhas] [linhas_unitarias]
+"""
+
+import os
+import sys
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.antecipada import avaliar_floresta, n_arvores, opcoes_antecipada
+from lexcarf.benchmark import carregar_entradas_exemplo, carregar_modelos_benchmark, cronometrar, gerar_corpus_sintetico
+from lexcarf.floresta import compilar_floresta
+from lexcarf.predicao import preparar_features_lote
+
+# (rótulo, parâmetro 'antecipada' das funções de predição)
+CONFIGURACOES = [
+    ('completa', None),
+    ('z=1', {'z': 1.0}),
+    ('z=2', {'z': 2.0}),
+    ('z=3', {'z': 3.0}),
+    ('z=2, passo 5', {'z': 2.0, 'passo': 5, 'min_arvores': 10}),
+    ('orçamento 1ms', {'z': 2.0, 'orcamento_ms': 1.0}),
+    ('orçamento 0.3ms', {'z': 2.0, 'orcamento_ms': 0.3}),
+]
+
+
+def latencia_linhas(floresta, X, antecipada):
+    """ms por linha, uma chamada por linha (o orçamento vale por chamada, como no uso interativo)"""
+    linhas = [X[i] for i in range(X.shape[0])]
+    inicio = time.perf_counter()
+    for linha in linhas:
+        avaliar_floresta(floresta, linha, opcoes_antecipada(antecipada))
+    return (time.perf_counter() - inicio) / len(linhas) * 1000
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_unitarias = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print("=" * 70)
+    print("BENCHMARK - PREDIÇÃO ANTECIPADA vs. 100 ÁRVORES")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    entradas = pd.concat([
+        gerar_corpus_sintetico(preprocessors, n_linhas - 10, seed=11)[['texto_ementa', 'tributo', 'turma']],
+        carregar_entradas_exemplo(10)
+    ], ignore_index=True)
+    X = preparar_features_lote(entradas, preprocessors)
+    print(f"Modelos: {origem} | {X.shape[0]:,} linhas no lote, {n_unitarias} linha a linha\n")
+
+    for nome_modelo, modelo in [('provimento', model_provimento), ('votacao', model_votacao)]:
+        for motor, floresta in [('compilada', compilar_floresta(modelo)), ('sklearn', modelo)]:
+            # predict_proba do sklearn custa ~15 ms por chamada: menos linhas na medida linha a linha
+            unitarias = n_unitarias if motor == 'compilada' else min(n_unitarias, 30)
+            referencia = floresta.predict_proba(X)
+            total = n_arvores(floresta)
+            print(f"{nome_modelo} - floresta {motor} ({total} árvores)")
+            print(f"   {'modo':<16} | {'linha (ms)':>10} | {'lote (ms)':>9} | {'árvores':>7} | "
+                  f"{'concordância':>12} | {'desvio máx.':>11}")
+
+            for rotulo, antecipada in CONFIGURACOES:
+                linha_ms = latencia_linhas(floresta, X[:unitarias], antecipada)
+                tempo_lote, (prob, arvores) = cronometrar(
+                    lambda: avaliar_floresta(floresta, X, opcoes_antecipada(antecipada)), repeticoes=3
+                )
+                concordancia = np.mean(prob.argmax(axis=1) == referencia.argmax(axis=1))
+                desvio = np.abs(prob - referencia).max()
+                print(f"   {rotulo:<16} | {linha_ms:>10.3f} | {tempo_lote * 1000:>9.1f} | {arvores.mean():>7.1f} | "
+                      f"{concordancia:>12.1%} | {desvio:>11.3f}")
+            print()
+
+    print("'árvores' é a média por linha; 'concordância' compara a classe prevista com a avaliação completa.")
+    print("No lote, o orçamento vale para a chamada inteira; linha a linha, para cada chamada.")
+
+
+if __name__ == "__main__":
+    main()
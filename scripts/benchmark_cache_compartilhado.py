@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: latência de acerto do cache SQLite compartilhado sob concorrência
+Vários processos consultam (e parte deles grava) o mesmo arquivo em paralelo;
+o resultado é comparado com a latência de uma predição dos modelos
+"""
+
+import os
+import sys
+import tempfile
+import time
+import warnings
+warnings.filterwarnings('ignore')
+from multiprocessing import Pool
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import carregar_modelos_benchmark, carregar_entradas_exemplo, cronometrar, gerar_corpus_sintetico
+from lexcarf.cache_compartilhado import CacheCompartilhado
+from lexcarf.predicao import prever_probabilidades_lote
+
+N_CONSULTAS = 2000
+PROPORCAO_ESCRITAS = 0.1
+
+
+def trabalhador(argumentos):
+    """Executa consultas aleatórias no cache e retorna as latências (em segundos) dos acertos"""
+    caminho, entradas, resultado, semente = argumentos
+    cache = CacheCompartilhado(caminho=caminho)
+    rng = np.random.default_rng(semente)
+    latencias = []
+
+    for _ in range(N_CONSULTAS):
+        texto, tributo, turma = entradas[rng.integers(len(entradas))]
+        if rng.random() < PROPORCAO_ESCRITAS:
+            cache.guardar(texto, tributo, turma, resultado)
+            continue
+
+        inicio = time.perf_counter()
+        encontrado = cache.obter(texto, tributo, turma)
+        if encontrado is not None:
+            latencias.append(time.perf_counter() - inicio)
+
+    return latencias
+
+
+def main():
+    print("=" * 70)
+    print("BENCHMARK - CACHE COMPARTILHADO (SQLITE WAL)")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem}")
+
+    # Latência de referência: uma predição (provimento + votação) sem cache
+    linha = carregar_entradas_exemplo(1)
+    tempo_modelo, _ = cronometrar(
+        lambda: prever_probabilidades_lote(linha, model_provimento, model_votacao, preprocessors), repeticoes=20
+    )
+
+    # Popular o cache com ementas "populares"
+    df = gerar_corpus_sintetico(preprocessors, 500)
+    entradas = list(df[['texto_ementa', 'tributo', 'turma']].itertuples(index=False, name=None))
+    resultado = ({'Negado': 0.6, 'Provido Total': 0.4}, {'Unânime': 0.7, 'Maioria': 0.2, 'Qualidade': 0.1}, None)
+
+    caminho = os.path.join(tempfile.mkdtemp(), 'cache.sqlite')
+    cache = CacheCompartilhado(caminho=caminho)
+    for texto, tributo, turma in entradas:
+        cache.guardar(texto, tributo, turma, resultado)
+
+    print(f"Predição sem cache (melhor de 20): {tempo_modelo * 1000:.2f} ms")
+    print(f"\n{'Processos':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'consultas/s':>14}")
+
+    for n_processos in [1, 2, 4, 8]:
+        argumentos = [(caminho, entradas, resultado, semente) for semente in range(n_processos)]
+        inicio = time.perf_counter()
+        with Pool(n_processos) as pool:
+            latencias = np.concatenate([np.array(l) for l in pool.map(trabalhador, argumentos)])
+        duracao = time.perf_counter() - inicio
+
+        p50, p99 = np.percentile(latencias, [50, 99]) * 1000
+        print(f"{n_processos:>10} {p50:>10.3f} {p99:>10.3f} {n_processos * N_CONSULTAS / duracao:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
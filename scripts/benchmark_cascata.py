@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: votação em cascata vs. os dois modelos em todas as linhas
+As entradas são amostradas para reproduzir a proporção Negado/Provido dos
+julgamentos (57% negados: 8.147 negados x 6.086 providos, ver
+documentacao/ANALISE_VAZAMENTO.md), segundo a predição do modelo de provimento.
+Mede o lote e a predição linha a linha para alguns limiares e confere que as
+linhas avaliadas têm exatamente as mesmas probabilidades de votação.
+
+Uso: python scripts/benchmark_cascata.py [linhas] [proporcao_negado]
+"""
+
+import os
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.benchmark import carregar_entradas_exemplo, carregar_modelos_benchmark, cronometrar, gerar_corpus_sintetico
+from lexcarf.featurizador import obter_featurizador
+from lexcarf.predicao import CLASSE_PROVIDO, prever_probabilidades_lote, prever_votacao_condicional
+
+LIMIARES = [None, 0.3, 0.4, 0.5, 0.6]
+PROPORCAO_NEGADO = 8147 / (8147 + 6086)
+
+
+def amostrar_mistura(entradas, model_provimento, preprocessors, n_linhas, proporcao_negado, seed=0):
+    """Amostra n_linhas entradas com a proporção de Negado (predito) pedida"""
+    X = obter_featurizador(preprocessors).transformar(entradas)
+    classes = [str(classe) for classe in model_provimento.classes_]
+    providos = model_provimento.predict_proba(X)[:, classes.index(CLASSE_PROVIDO)] >= 0.5
+
+    rng = np.random.default_rng(seed)
+    n_negados = int(round(n_linhas * proporcao_negado))
+    indices = np.concatenate([
+        rng.choice(np.flatnonzero(~providos), size=n_negados),
+        rng.choice(np.flatnonzero(providos), size=n_linhas - n_negados),
+    ])
+    return entradas.iloc[rng.permutation(indices)].reset_index(drop=True)
+
+
+def prever_linhas(entradas, model_provimento, model_votacao, preprocessors, limiar):
+    """Predição linha a linha (caminho das aplicações); retorna quantas votações foram avaliadas"""
+    featurizador = obter_featurizador(preprocessors)
+    avaliadas = 0
+    for texto_ementa, tributo, turma in entradas.itertuples(index=False, name=None):
+        X = featurizador.transformar_linha(texto_ementa, tributo, turma)
+        prob_provimento = model_provimento.predict_proba(X)
+        _, mascara = prever_votacao_condicional(X, prob_provimento, model_provimento, model_votacao, limiar)
+        avaliadas += int(mascara[0])
+    return avaliadas
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    proporcao_negado = float(sys.argv[2]) if len(sys.argv) > 2 else PROPORCAO_NEGADO
+
+    print("=" * 70)
+    print("BENCHMARK - VOTAÇÃO EM CASCATA")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    candidatas = pd.concat([
+        gerar_corpus_sintetico(preprocessors, 4000, seed=7)[['texto_ementa', 'tributo', 'turma']],
+        carregar_entradas_exemplo(10)
+    ], ignore_index=True)
+    entradas = amostrar_mistura(candidatas, model_provimento, preprocessors, n_linhas, proporcao_negado)
+    print(f"Modelos: {origem} | {n_linhas:,} linhas, {proporcao_negado:.0%} Negado (predito)\n")
+
+    colunas_votacao = [f'votacao_{classe}' for classe in model_votacao.classes_]
+    completo = prever_probabilidades_lote(entradas, model_provimento, model_votacao, preprocessors)
+    X = obter_featurizador(preprocessors).transformar(entradas)
+    prob_provimento = model_provimento.predict_proba(X)
+    tempo_votacao_base = tempo_lote_base = tempo_linhas_base = None
+    n_linhas_unitarias = min(n_linhas, 300)
+
+    print(f"{'limiar':>7} | {'avaliada':>8} | {'votação (ms)':>12} | {'economia':>8} | {'lote (ms)':>9} | "
+          f"{'economia':>8} | {'linha (µs)':>10} | {'economia':>8} | idênticas")
+    for limiar in LIMIARES:
+        tempo_votacao, _ = cronometrar(
+            lambda: prever_votacao_condicional(X, prob_provimento, model_provimento, model_votacao, limiar),
+            repeticoes=5
+        )
+        tempo_lote, resultado = cronometrar(
+            lambda: prever_probabilidades_lote(entradas, model_provimento, model_votacao, preprocessors,
+                                               limiar_votacao=limiar), repeticoes=5
+        )
+        tempo_linhas, _ = cronometrar(
+            lambda: prever_linhas(entradas.iloc[:n_linhas_unitarias], model_provimento, model_votacao,
+                                  preprocessors, limiar), repeticoes=2
+        )
+        if limiar is None:
+            tempo_votacao_base, tempo_lote_base, tempo_linhas_base = tempo_votacao, tempo_lote, tempo_linhas
+
+        avaliadas = resultado[colunas_votacao[0]].notna().to_numpy()
+        identicas = np.array_equal(resultado.loc[avaliadas, colunas_votacao].to_numpy(),
+                                   completo.loc[avaliadas, colunas_votacao].to_numpy())
+        rotulo = 'sempre' if limiar is None else f'{limiar:.0%}'
+        print(f"{rotulo:>7} | {avaliadas.mean():>8.1%} | {tempo_votacao * 1000:>12.1f} | "
+              f"{1 - tempo_votacao / tempo_votacao_base:>8.1%} | {tempo_lote * 1000:>9.1f} | "
+              f"{1 - tempo_lote / tempo_lote_base:>8.1%} | {tempo_linhas / n_linhas_unitarias * 1e6:>10.0f} | "
+              f"{1 - tempo_linhas / tempo_linhas_base:>8.1%} | {'sim' if identicas else 'NÃO'}")
+
+    print("\n'votação' é só o modelo de votação sobre o lote já featurizado; 'lote' e 'linha' incluem a")
+    print("featurização e o modelo de provimento, que continuam sendo executados em todas as linhas.")
+
+
+if __name__ == "__main__":
+    main()
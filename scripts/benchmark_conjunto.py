@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: modelo conjunto (uma floresta para provimento e votação) vs. dois modelos
+Treina as duas configurações com os hiperparâmetros de train_model_2023_2024.py
+sobre o corpus sintético (votação só nos casos providos, como no treino real) e
+compara acurácia, F1, tempo de treino, tamanho e latência.
+Com os dados reais, use: python train_model_2023_2024.py --conjunto (em notebooks/)
+
+Uso: python scripts/benchmark_conjunto.py [linhas_treino] [linhas_teste]
+"""
+
+import os
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import carregar_preprocessors, gerar_corpus_sintetico
+from lexcarf.modelo_conjunto import comparar_com_modelos_separados, imprimir_comparacao
+from lexcarf.predicao import CLASSE_PROVIDO, preparar_features_lote
+
+
+def preparar(preprocessors, n_linhas, seed):
+    """Features e alvos do corpus sintético; votação nula nos casos negados"""
+    df = gerar_corpus_sintetico(preprocessors, n_linhas, seed=seed)
+    votacao = np.where(df['categoria_provimento'] == CLASSE_PROVIDO, df['target_votacao'], None)
+    return preparar_features_lote(df, preprocessors), df['categoria_provimento'].values, votacao
+
+
+def main():
+    n_treino = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    n_teste = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    print("=" * 70)
+    print("BENCHMARK - MODELO CONJUNTO vs. DOIS MODELOS")
+    print("=" * 70)
+
+    preprocessors = carregar_preprocessors()
+    X_treino, provimento_treino, votacao_treino = preparar(preprocessors, n_treino, seed=42)
+    X_teste, provimento_teste, votacao_teste = preparar(preprocessors, n_teste, seed=7)
+
+    relatorio, conjunto = comparar_com_modelos_separados(
+        X_treino, provimento_treino, votacao_treino, X_teste, provimento_teste, votacao_teste
+    )
+    imprimir_comparacao(relatorio)
+
+    # As probabilidades marginais do modelo conjunto são distribuições válidas
+    prob_provimento, prob_votacao = conjunto.compilar().predict_proba(X_teste)
+    validas = np.allclose(prob_provimento.sum(axis=1), 1) and np.allclose(prob_votacao.sum(axis=1), 1)
+    print(f"\nClasses: {list(conjunto.classes_provimento)} | {list(conjunto.classes_votacao)}")
+    print(f"Probabilidades do conjunto somam 1: {'sim' if validas else 'NÃO'}")
+    print("'linha' é uma decisão (provimento e votação) por chamada; 'lote' é o conjunto de teste inteiro.")
+
+
+if __name__ == "__main__":
+    main()
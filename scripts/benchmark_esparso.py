@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: inferência esparsa (CSR) vs. caminho denso com toarray()/hstack
+Mede latência da predição individual e pico de memória da predição em lote
+"""
+
+import os
+import sys
+import tracemalloc
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import carregar_modelos_benchmark, carregar_entradas_exemplo, cronometrar
+from lexcarf.predicao import montar_linha_esparsa, prever_probabilidades_lote
+
+
+def linha_densa(tributo_encoded, turma_encoded, texto_tfidf):
+    """Caminho original: densifica o TF-IDF e concatena com as categóricas"""
+    X_input = np.hstack([[tributo_encoded, turma_encoded], texto_tfidf.toarray()[0]])
+    return X_input.reshape(1, -1)
+
+
+def medir_pico_memoria(funcao):
+    """Retorna (pico de memória em MB alocado durante a chamada, resultado)"""
+    tracemalloc.start()
+    resultado = funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico / 1024 ** 2, resultado
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    n_individuais = 200
+
+    print("=" * 70)
+    print("BENCHMARK - INFERENCIA ESPARSA VS DENSA")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem}")
+
+    entradas = carregar_entradas_exemplo(n_linhas)
+    tfidf = preprocessors['tfidf']
+    le_tributo = preprocessors['le_tributo']
+    le_turma = preprocessors['le_turma']
+
+    # Predição individual: mesma linha montada pelos dois caminhos
+    texto, tributo, turma = entradas.iloc[0]
+    tributo_encoded = le_tributo.transform([tributo if tributo in preprocessors['tributos_frequentes'] else 'OUTROS'])[0]
+    turma_encoded = le_turma.transform([turma.split('ª')[0] + 'ª'])[0]
+
+    def individual(montar):
+        def executar():
+            for _ in range(n_individuais):
+                X_input = montar(tributo_encoded, turma_encoded, tfidf.transform([texto[:1000]]))
+                prob_provimento = model_provimento.predict_proba(X_input)[0]
+                prob_votacao = model_votacao.predict_proba(X_input)[0]
+            return np.concatenate([prob_provimento, prob_votacao])
+        return executar
+
+    tempo_denso, prob_densa = cronometrar(individual(linha_densa), repeticoes=3)
+    tempo_esparso, prob_esparsa = cronometrar(individual(montar_linha_esparsa), repeticoes=3)
+
+    print(f"\n--- Predição individual ({n_individuais} chamadas) ---")
+    print(f"Densa:   {tempo_denso / n_individuais * 1000:.2f} ms/predição")
+    print(f"Esparsa: {tempo_esparso / n_individuais * 1000:.2f} ms/predição")
+    print(f"Diferença máxima entre probabilidades: {np.abs(prob_densa - prob_esparsa).max():.2e}")
+
+    # Predição em lote: pico de memória e tempo
+    def lote(esparso):
+        return lambda: prever_probabilidades_lote(
+            entradas, model_provimento, model_votacao, preprocessors, esparso=esparso
+        )
+
+    pico_denso, resultado_denso = medir_pico_memoria(lote(False))
+    pico_esparso, resultado_esparso = medir_pico_memoria(lote(True))
+    tempo_lote_denso, _ = cronometrar(lote(False), repeticoes=3)
+    tempo_lote_esparso, _ = cronometrar(lote(True), repeticoes=3)
+
+    print(f"\n--- Predição em lote ({len(entradas)} linhas) ---")
+    print(f"Densa:   {tempo_lote_denso:.3f}s, pico de memória {pico_denso:.1f} MB")
+    print(f"Esparsa: {tempo_lote_esparso:.3f}s, pico de memória {pico_esparso:.1f} MB")
+    print(f"Diferença máxima entre probabilidades: {np.abs(resultado_denso.values - resultado_esparso.values).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: latência da predição individual com a floresta compilada vs. sklearn
+"""
+
+import os
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import carregar_modelos_benchmark, carregar_entradas_exemplo, cronometrar
+from lexcarf.floresta import compilar_floresta
+from lexcarf.predicao import preparar_features_lote
+
+
+def main():
+    n_chamadas = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    print("=" * 70)
+    print("BENCHMARK - FLORESTA COMPILADA")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem}")
+
+    tempo_compilacao, (compilado_provimento, compilado_votacao) = cronometrar(
+        lambda: (compilar_floresta(model_provimento), compilar_floresta(model_votacao))
+    )
+    print(f"Compilação das duas florestas: {tempo_compilacao * 1000:.1f} ms")
+
+    X = preparar_features_lote(carregar_entradas_exemplo(10), preprocessors)
+    linhas = [X[i] for i in range(X.shape[0])]
+
+    def individual(provimento, votacao):
+        def executar():
+            for i in range(n_chamadas):
+                linha = linhas[i % len(linhas)]
+                provimento.predict_proba(linha)
+                votacao.predict_proba(linha)
+        return executar
+
+    tempo_sklearn, _ = cronometrar(individual(model_provimento, model_votacao), repeticoes=3)
+    tempo_compilado, _ = cronometrar(individual(compilado_provimento, compilado_votacao), repeticoes=3)
+
+    print(f"\n--- Predição individual (provimento + votação, {n_chamadas} chamadas) ---")
+    print(f"sklearn:   {tempo_sklearn / n_chamadas * 1000:.3f} ms/predição")
+    print(f"compilada: {tempo_compilado / n_chamadas * 1000:.3f} ms/predição")
+    print(f"Ganho:     {tempo_sklearn / tempo_compilado:.1f}x")
+
+    diferenca = max(
+        np.abs(compilado_provimento.predict_proba(X) - model_provimento.predict_proba(X)).max(),
+        np.abs(compilado_votacao.predict_proba(X) - model_votacao.predict_proba(X)).max()
+    )
+    print(f"Diferença máxima entre probabilidades: {diferenca:.2e}")
+
+
+if __name__ == "__main__":
+    main()
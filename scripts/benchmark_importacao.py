@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: tempo de partida (imports) de cada ponto de entrada
+Mede, em processos novos, o tempo até o fim dos imports de nível de módulo,
+o número de módulos carregados e quais módulos pesados já estão em memória.
+
+Uso: python scripts/benchmark_importacao.py [repeticoes] [entrada ...]
+"""
+
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.partida import ENTRADAS, MODULOS_PESADOS, medir_partida
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    entradas = sys.argv[2:] or list(ENTRADAS)
+
+    print("=" * 70)
+    print("BENCHMARK - TEMPO DE PARTIDA DOS PONTOS DE ENTRADA")
+    print("=" * 70)
+
+    # Processo vazio: custo fixo do interpretador
+    base = np.median([medir_partida('pass')[0] for _ in range(repeticoes)])
+    print(f"Interpretador sem imports: {base * 1000:.0f} ms (mediana de {repeticoes})\n")
+
+    print(f"{'entrada':<10} | {'mediana (ms)':>12} | {'mínimo (ms)':>11} | {'módulos':>7} | pesados")
+    for nome in entradas:
+        medidas = [medir_partida(ENTRADAS[nome]) for _ in range(repeticoes)]
+        tempos = [tempo for tempo, _ in medidas]
+        modulos = medidas[-1][1]
+        pesados = [modulo for modulo in MODULOS_PESADOS if modulo in modulos]
+        print(f"{nome:<10} | {np.median(tempos) * 1000:>12.0f} | {min(tempos) * 1000:>11.0f} | {len(modulos):>7} | "
+              f"{', '.join(pesados) or '-'}")
+
+    print("\nDetalhe por pacote: python run.py --profile-startup [entrada ...]")
+
+
+if __name__ == "__main__":
+    main()
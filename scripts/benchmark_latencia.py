@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: custo dos ganchos de latência por etapa
+Executa prever_probabilidades_2023_2024 (caminho das aplicações) linha a linha
+com os ganchos desligados e ligados, em rodadas alternadas, e imprime os
+percentis por etapa coletados (lexcarf.latencia).
+
+Uso: python scripts/benchmark_latencia.py [linhas] [rodadas] [arquivo_json]
+"""
+
+import os
+import sys
+import time
+import timeit
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'aplicacoes'))
+
+import numpy as np
+import pandas as pd
+
+from demo_2023_2024 import prever_probabilidades_2023_2024
+from lexcarf.benchmark import carregar_entradas_exemplo, carregar_modelos_benchmark, gerar_corpus_sintetico
+from lexcarf.floresta import compilar_floresta
+from lexcarf.latencia import ETAPAS, REGISTRO, ativar_latencia, etapa, imprimir_percentis
+
+
+def tempo_por_linha(entradas, modelos):
+    """Média em µs por chamada de prever_probabilidades_2023_2024"""
+    inicio = time.perf_counter()
+    for texto_ementa, tributo, turma in entradas:
+        prever_probabilidades_2023_2024(texto_ementa, tributo, turma, *modelos)
+    return (time.perf_counter() - inicio) / len(entradas) * 1e6
+
+
+def custo_gancho(ativa):
+    """µs por gancho 'with etapa(...)' medido isoladamente (as medições 'x' são descartadas depois)"""
+    ativar_latencia(ativa)
+    melhor = min(timeit.repeat("with etapa('x'): pass", globals={'etapa': etapa}, number=100000, repeat=5))
+    ativar_latencia(False)
+    return melhor / 100000 * 1e6
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rodadas = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    arquivo = sys.argv[3] if len(sys.argv) > 3 else None
+
+    print("=" * 70)
+    print("BENCHMARK - GANCHOS DE LATÊNCIA POR ETAPA")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    entradas = list(pd.concat([
+        gerar_corpus_sintetico(preprocessors, n_linhas - 10, seed=5)[['texto_ementa', 'tributo', 'turma']],
+        carregar_entradas_exemplo(10)
+    ], ignore_index=True).itertuples(index=False, name=None))
+    print(f"Modelos: {origem} | {len(entradas)} linhas x {rodadas} rodadas por modo")
+
+    # Custo direto: a diferença de ponta a ponta abaixo fica dentro do ruído da máquina
+    desligado, ligado = custo_gancho(False), custo_gancho(True)
+    REGISTRO.limpar()
+    print(f"Gancho isolado: {desligado:.2f} µs desligado | {ligado:.2f} µs ligado | "
+          f"{len(ETAPAS)} ganchos por predição = {len(ETAPAS) * ligado:.1f} µs ligados\n")
+
+    for motor, modelos in [
+        ('compilada', (compilar_floresta(model_provimento), compilar_floresta(model_votacao), preprocessors)),
+        ('sklearn', (model_provimento, model_votacao, preprocessors)),
+    ]:
+        linhas = entradas if motor == 'compilada' else entradas[:50]
+        tempo_por_linha(linhas[:20], modelos)  # aquecimento
+
+        # Rodadas alternadas, para que variações da máquina afetem os dois modos igualmente
+        tempos = {False: [], True: []}
+        REGISTRO.limpar()
+        for _ in range(rodadas):
+            for ativa in (False, True):
+                ativar_latencia(ativa)
+                tempos[ativa].append(tempo_por_linha(linhas, modelos))
+        ativar_latencia(False)
+
+        desligados, ligados = np.median(tempos[False]), np.median(tempos[True])
+        print(f"Floresta {motor}: {desligados:.1f} µs/linha desligados | {ligados:.1f} µs/linha ligados "
+              f"(ponta a ponta, mediana de {rodadas})")
+        imprimir_percentis(REGISTRO.percentis())
+        print()
+
+    if arquivo:
+        REGISTRO.exportar(arquivo)
+        print(f"Percentis exportados em {arquivo}")
+
+
+if __name__ == "__main__":
+    main()
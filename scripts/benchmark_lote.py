@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: predição em lote vs. laço de predições individuais
+"""
+
+import os
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'aplicacoes'))
+
+import numpy as np
+
+from demo_2023_2024 import prever_probabilidades_2023_2024
+from lexcarf.benchmark import carregar_modelos_benchmark, carregar_entradas_exemplo, cronometrar
+from lexcarf.predicao import prever_probabilidades_lote
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    print("=" * 70)
+    print("BENCHMARK - PREDICAO EM LOTE")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem}")
+
+    entradas = carregar_entradas_exemplo(n_linhas)
+    print(f"Linhas: {len(entradas)}")
+
+    def laco_individual():
+        resultados = []
+        for texto, tributo, turma in entradas.itertuples(index=False):
+            prob_provimento, prob_votacao, erro = prever_probabilidades_2023_2024(
+                texto, tributo, turma, model_provimento, model_votacao, preprocessors
+            )
+            if erro:
+                raise RuntimeError(erro)
+            resultados.append(list(prob_provimento.values()) + list(prob_votacao.values()))
+        return np.array(resultados)
+
+    def lote():
+        return prever_probabilidades_lote(entradas, model_provimento, model_votacao, preprocessors)
+
+    tempo_individual, resultado_individual = cronometrar(laco_individual)
+    tempo_lote, resultado_lote = cronometrar(lote, repeticoes=3)
+
+    diferenca = np.abs(resultado_lote.values - resultado_individual).max()
+
+    print(f"\nLaço individual: {tempo_individual:.3f}s ({len(entradas) / tempo_individual:,.0f} linhas/s)")
+    print(f"Lote:            {tempo_lote:.3f}s ({len(entradas) / tempo_lote:,.0f} linhas/s)")
+    print(f"Ganho:           {tempo_individual / tempo_lote:.1f}x")
+    print(f"Diferença máxima entre probabilidades: {diferenca:.2e}")
+
+
+if __name__ == "__main__":
+    main()
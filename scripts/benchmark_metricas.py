@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: custo das métricas Prometheus (lexcarf.metricas)
+Mede isoladamente o incremento de um contador, a observação de um histograma
+e um gancho de etapa, confere incrementos concorrentes e compara a latência de
+uma predição linha a linha com a coleta por etapa (ativar_metricas) desligada
+e ligada, em rodadas alternadas.
+
+Uso: python scripts/benchmark_metricas.py [linhas] [rodadas]
+"""
+
+import os
+import sys
+import threading
+import time
+import timeit
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, 'aplicacoes'))
+
+import numpy as np
+import pandas as pd
+
+from demo_2023_2024 import prever_probabilidades_2023_2024
+from lexcarf.benchmark import carregar_entradas_exemplo, carregar_modelos_benchmark, gerar_corpus_sintetico
+from lexcarf.floresta import compilar_floresta
+from lexcarf.latencia import ETAPAS, etapa
+from lexcarf.metricas import LIMITES_LOTE, RegistroMetricas, ativar_metricas
+
+N_OPERACOES = 100000
+
+
+def tempo_por_linha(entradas, modelos):
+    """Média em µs por chamada de prever_probabilidades_2023_2024"""
+    inicio = time.perf_counter()
+    for texto_ementa, tributo, turma in entradas:
+        prever_probabilidades_2023_2024(texto_ementa, tributo, turma, *modelos)
+    return (time.perf_counter() - inicio) / len(entradas) * 1e6
+
+
+def custo_operacao(operacao):
+    """µs por chamada de operacao (melhor de 5 repetições)"""
+    return min(timeit.repeat(operacao, number=N_OPERACOES, repeat=5)) / N_OPERACOES * 1e6
+
+
+def custo_gancho(ativas):
+    """µs por gancho 'with etapa(...)' com a coleta por etapa desligada ou ligada"""
+    ativar_metricas(ativas)
+    melhor = min(timeit.repeat("with etapa('x'): pass", globals={'etapa': etapa}, number=N_OPERACOES, repeat=5))
+    ativar_metricas(False)
+    return melhor / N_OPERACOES * 1e6
+
+
+def conferir_concorrencia(n_threads=4):
+    """Incrementos simultâneos de várias threads não se perdem (células por thread)"""
+    contador = RegistroMetricas().contador('teste_total', 'teste')
+
+    def incrementar():
+        for _ in range(N_OPERACOES):
+            contador.inc()
+
+    threads = [threading.Thread(target=incrementar) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return contador.valor() == n_threads * N_OPERACOES
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    rodadas = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    print("=" * 70)
+    print("BENCHMARK - MÉTRICAS PROMETHEUS")
+    print("=" * 70)
+
+    registro = RegistroMetricas()
+    contador = registro.contador('teste_total', 'teste')
+    histograma = registro.histograma('teste_lote', 'teste', limites=LIMITES_LOTE)
+    print(f"Contador.inc: {custo_operacao(contador.inc):.3f} µs | "
+          f"Histograma.observar: {custo_operacao(lambda: histograma.observar(17)):.3f} µs")
+    desligado, ligado = custo_gancho(False), custo_gancho(True)
+    print(f"Gancho de etapa: {desligado:.2f} µs desligado | {ligado:.2f} µs ligado | "
+          f"{len(ETAPAS)} ganchos por predição = {len(ETAPAS) * ligado:.1f} µs ligados")
+    print(f"Incrementos concorrentes (4 threads): {'OK' if conferir_concorrencia() else 'ERRO'}\n")
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    entradas = list(pd.concat([
+        gerar_corpus_sintetico(preprocessors, n_linhas - 10, seed=5)[['texto_ementa', 'tributo', 'turma']],
+        carregar_entradas_exemplo(10)
+    ], ignore_index=True).itertuples(index=False, name=None))
+    modelos = (compilar_floresta(model_provimento), compilar_floresta(model_votacao), preprocessors)
+    print(f"Modelos: {origem} (floresta compilada) | {len(entradas)} linhas x {rodadas} rodadas por modo")
+
+    tempo_por_linha(entradas[:20], modelos)  # aquecimento
+
+    # Rodadas alternadas, para que variações da máquina afetem os dois modos igualmente
+    tempos = {False: [], True: []}
+    for _ in range(rodadas):
+        for ativas in (False, True):
+            ativar_metricas(ativas)
+            tempos[ativas].append(tempo_por_linha(entradas, modelos))
+    ativar_metricas(False)
+
+    desligadas, ligadas = np.median(tempos[False]), np.median(tempos[True])
+    print(f"Ponta a ponta: {desligadas:.1f} µs/linha desligadas | {ligadas:.1f} µs/linha ligadas "
+          f"({ligadas - desligadas:+.1f} µs, mediana de {rodadas})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: memória por processo e tempo de carga a frio dos modelos
+Sobe K processos novos (spawn) que carregam os modelos ao mesmo tempo e
+compara os pickles do sklearn com as florestas compiladas mapeadas em
+memória (mmap), que são compartilhadas pelo cache de páginas do sistema.
+
+RSS conta as páginas compartilhadas em todos os processos; USS é a memória
+exclusiva do processo e PSS divide as páginas compartilhadas entre eles
+(psutil, se instalado, ou /proc/self/smaps_rollup no Linux).
+
+Uso: python scripts/benchmark_mmap.py [n_processos]
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import preparar_dir_modelos
+from lexcarf.memoria import memoria_compartilhada_bytes
+from lexcarf.modelos import ARQUIVOS_2023, exportar_florestas_2023
+
+MODOS = ['sem modelos', 'pickle sklearn', 'compilada mmap']
+
+
+def trabalhador(modo, pasta, barreira, fila):
+    """Carrega os modelos no modo pedido, faz uma predição e mede a memória com todos os processos vivos"""
+    warnings.filterwarnings('ignore')
+    from lexcarf.benchmark import carregar_entradas_exemplo
+    from lexcarf.memoria import memoria_compartilhada_bytes
+    from lexcarf.modelos import carregar_modelos_2023, carregar_preprocessors_2023
+    from lexcarf.predicao import prever_probabilidades_lote
+
+    inicio = time.perf_counter()
+    if modo == 'sem modelos':
+        carregar_preprocessors_2023(pasta)
+    else:
+        modelos = carregar_modelos_2023(pasta, mmap=modo == 'compilada mmap')
+    tempo_carga = time.perf_counter() - inicio
+
+    if modo != 'sem modelos':
+        prever_probabilidades_lote(carregar_entradas_exemplo(200), *modelos)
+
+    barreira.wait()
+    fila.put((tempo_carga,) + memoria_compartilhada_bytes())
+    barreira.wait()
+
+
+def medir_modo(modo, pasta, n_processos):
+    """Médias de (tempo de carga, RSS, USS, PSS) entre os processos"""
+    contexto = multiprocessing.get_context('spawn')
+    barreira = contexto.Barrier(n_processos)
+    fila = contexto.Queue()
+
+    processos = [contexto.Process(target=trabalhador, args=(modo, pasta, barreira, fila)) for _ in range(n_processos)]
+    for processo in processos:
+        processo.start()
+    medidas = np.array([fila.get() for _ in range(n_processos)])
+    for processo in processos:
+        processo.join()
+
+    return medidas.mean(axis=0)
+
+
+def main():
+    n_processos = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    print("=" * 70)
+    print("BENCHMARK - MODELOS MAPEADOS EM MEMÓRIA (MMAP)")
+    print("=" * 70)
+    if memoria_compartilhada_bytes() is None:
+        print("USS/PSS indisponíveis: instale o psutil (pip install psutil) ou execute no Linux")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        dir_modelos, origem = preparar_dir_modelos(pasta)
+        if dir_modelos != pasta:
+            for arquivo in ARQUIVOS_2023.values():
+                shutil.copy(os.path.join(dir_modelos, arquivo), pasta)
+        exportar_florestas_2023(pasta)
+        print(f"Modelos: {origem} | processos simultâneos: {n_processos}")
+
+        resultados = {modo: medir_modo(modo, pasta, n_processos) for modo in MODOS}
+
+    base_uss = resultados['sem modelos'][2]
+    mb = 1024 ** 2
+    print(f"\n{'modo':<16} | {'carga (s)':>9} | {'RSS MB':>7} | {'USS MB':>7} | {'PSS MB':>7} | {'USS modelos':>11}")
+    for modo, (tempo, rss, uss, pss) in resultados.items():
+        print(f"{modo:<16} | {tempo:>9.3f} | {rss / mb:>7.1f} | {uss / mb:>7.1f} | {pss / mb:>7.1f} | "
+              f"{(uss - base_uss) / mb:>11.1f}")
+
+    print("\n'USS modelos' = memória exclusiva por processo acima do processo sem modelos.")
+    print(f"Total exclusivo dos modelos em {n_processos} processos: "
+          f"pickle {n_processos * (resultados['pickle sklearn'][2] - base_uss) / mb:.1f} MB vs. "
+          f"mmap {n_processos * (resultados['compilada mmap'][2] - base_uss) / mb:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
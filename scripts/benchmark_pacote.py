@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: tempo de carga do pacote único vs. o trio de pickles 2023
+Cada medida a frio é feita em um processo novo (spawn), com os módulos já
+importados, para separar o custo de leitura dos arquivos do custo de import.
+
+Uso: python scripts/benchmark_pacote.py [repeticoes]
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import carregar_entradas_exemplo, cronometrar, preparar_dir_modelos
+from lexcarf.modelos import ARQUIVOS_2023, caminho_pacote, caminhos_modelos_2023, carregar_modelos_2023, \
+    exportar_pacote_2023
+from lexcarf.predicao import prever_probabilidades_lote
+
+MODOS = {
+    'trio de pickles': {'pacote': False, 'mmap': False},
+    'pacote (leitura)': {'pacote': True, 'mmap': False},
+    'pacote (mmap)': {'pacote': True, 'mmap': True},
+}
+
+
+def carregar(pasta, modo):
+    return carregar_modelos_2023(pasta, **MODOS[modo])
+
+
+def trabalhador(modo, pasta, fila):
+    """Carga a frio em processo novo: tempo de carga e tempo até a primeira predição"""
+    warnings.filterwarnings('ignore')
+    entradas = carregar_entradas_exemplo(1)
+
+    inicio = time.perf_counter()
+    modelos = carregar(pasta, modo)
+    tempo_carga = time.perf_counter() - inicio
+    prever_probabilidades_lote(entradas, *modelos)
+    fila.put((tempo_carga, time.perf_counter() - inicio))
+
+
+def medir_frio(modo, pasta, repeticoes):
+    """Medianas de (carga, carga + primeira predição) em processos novos"""
+    contexto = multiprocessing.get_context('spawn')
+    medidas = []
+    for _ in range(repeticoes):
+        fila = contexto.Queue()
+        processo = contexto.Process(target=trabalhador, args=(modo, pasta, fila))
+        processo.start()
+        medidas.append(fila.get())
+        processo.join()
+    return np.median(np.array(medidas), axis=0)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 70)
+    print("BENCHMARK - PACOTE ÚNICO DE MODELOS")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        dir_modelos, origem = preparar_dir_modelos(pasta)
+        if dir_modelos != pasta:
+            for arquivo in ARQUIVOS_2023.values():
+                shutil.copy(os.path.join(dir_modelos, arquivo), pasta)
+        exportar_pacote_2023(pasta)
+        print(f"Modelos: {origem}")
+
+        tamanho_trio = sum(os.path.getsize(caminho) for caminho in caminhos_modelos_2023(pasta).values())
+        tamanho_pacote = os.path.getsize(caminho_pacote('2023', pasta))
+        print(f"Tamanho: trio {tamanho_trio / 1024 ** 2:.1f} MB | pacote {tamanho_pacote / 1024 ** 2:.1f} MB")
+
+        entradas = carregar_entradas_exemplo(500)
+        referencia = prever_probabilidades_lote(entradas, *carregar(pasta, 'trio de pickles'))
+
+        print(f"\n{'modo':<18} | {'frio (ms)':>9} | {'+1ª pred (ms)':>13} | {'quente (ms)':>11} | {'dif. máx.':>9}")
+        for modo in MODOS:
+            frio, primeira = medir_frio(modo, pasta, repeticoes)
+            quente, modelos = cronometrar(lambda: carregar(pasta, modo), repeticoes=repeticoes)
+            diferenca = np.abs(prever_probabilidades_lote(entradas, *modelos).values - referencia.values).max()
+            print(f"{modo:<18} | {frio * 1000:>9.1f} | {primeira * 1000:>13.1f} | {quente * 1000:>11.1f} | "
+                  f"{diferenca:>9.1e}")
+
+    print("\nfrio = processo novo (arquivos no cache de páginas); quente = recarga no mesmo processo.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: escalabilidade da pontuação de CSV com vários processos
+Pontua o mesmo CSV com 1, 2, 4, 8 e 16 processos, mede linhas/s e confere
+que a saída é idêntica (mesmas linhas, mesma ordem) à da execução serial
+
+Uso: python scripts/benchmark_paralelo.py [n_linhas] [tamanho_bloco] [processos separados por vírgula]
+"""
+
+import filecmp
+import os
+import sys
+import tempfile
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import pandas as pd
+
+from lexcarf.benchmark import preparar_dir_modelos, CSV_EXEMPLO
+from lexcarf.modelos import carregar_modelos_2023
+from lexcarf.pontuacao import pontuar_csv, pontuar_csv_paralelo
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 16000
+    tamanho_bloco = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    processos = [int(p) for p in sys.argv[3].split(',')] if len(sys.argv) > 3 else [1, 2, 4, 8, 16]
+
+    print("=" * 70)
+    print("BENCHMARK - PONTUAÇÃO PARALELA")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        dir_modelos, origem = preparar_dir_modelos(pasta)
+        print(f"Modelos: {origem} | CPUs: {os.cpu_count()} | linhas: {n_linhas:,} | bloco: {tamanho_bloco:,}")
+
+        entrada = os.path.join(pasta, 'entrada.csv')
+        exemplo = pd.read_csv(CSV_EXEMPLO)
+        repeticoes = -(-n_linhas // len(exemplo))
+        pd.concat([exemplo] * repeticoes, ignore_index=True).iloc[:n_linhas].to_csv(entrada, index=False)
+
+        # Referência serial (mesmo processo)
+        referencia = os.path.join(pasta, 'referencia.csv')
+        modelos = carregar_modelos_2023(dir_modelos)
+        serial = pontuar_csv(entrada, referencia, *modelos, tamanho_bloco=tamanho_bloco, progresso=False)
+        print(f"\n{'processos':>9} | {'linhas/s':>9} | {'ganho':>6} | saída idêntica")
+        print(f"{'serial':>9} | {serial['linhas_por_segundo']:>9,.0f} | {1.0:>5.1f}x | -")
+
+        todos_ok = True
+        for n_processos in processos:
+            saida = os.path.join(pasta, f'saida_{n_processos}.csv')
+            resultado = pontuar_csv_paralelo(
+                entrada, saida, n_processos, dir_modelos=dir_modelos, tamanho_bloco=tamanho_bloco, progresso=False
+            )
+            identica = filecmp.cmp(referencia, saida, shallow=False)
+            todos_ok &= identica
+            print(f"{n_processos:>9} | {resultado['linhas_por_segundo']:>9,.0f} | "
+                  f"{resultado['linhas_por_segundo'] / serial['linhas_por_segundo']:>5.1f}x | "
+                  f"{'sim' if identica else 'NÃO'}")
+
+        print("\nO tempo dos processos inclui o carregamento dos modelos em cada um (initializer).")
+        sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: partida a frio até a primeira predição
+Cada medida é um processo Python novo que importa, carrega os modelos e prevê
+uma ementa: caminho sklearn (pickles), pacote único com as aplicações
+(pandas/scipy) e runtime só com NumPy (lexcarf.inferencia).
+
+Uso: python scripts/benchmark_partida.py [repeticoes]
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import preparar_dir_modelos
+from lexcarf.modelos import caminho_pacote, exportar_pacote_2023
+
+ENTRADA = "('Recurso voluntário. Omissão de receitas. Imposto de renda.', 'IRPJ', '1ª TURMA')"
+
+CAMINHOS = {
+    'sklearn (pickles)': (
+        "from lexcarf.modelos import carregar_modelos_2023\n"
+        "from lexcarf.predicao import prever_probabilidades_lote\n"
+        "mp, mv, pre = carregar_modelos_2023({pasta!r}, pacote=False)\n"
+        "prever_probabilidades_lote([" + ENTRADA + "], mp, mv, pre)\n"
+    ),
+    'pacote (aplicações)': (
+        "from lexcarf.modelos import carregar_modelos_2023\n"
+        "from lexcarf.predicao import prever_probabilidades_lote\n"
+        "mp, mv, pre = carregar_modelos_2023({pasta!r})\n"
+        "prever_probabilidades_lote([" + ENTRADA + "], mp, mv, pre)\n"
+    ),
+    'runtime NumPy': (
+        "from lexcarf.inferencia import RuntimeInferencia\n"
+        "RuntimeInferencia({pacote!r}).prever_linha(*" + ENTRADA + ")\n"
+    ),
+}
+
+
+def medir(codigo, repeticoes):
+    """Medianas de (tempo total do processo, tempo até a primeira predição) e número de módulos carregados"""
+    programa = (
+        "import sys, time, warnings; warnings.filterwarnings('ignore'); sys.path.insert(0, %r)\n"
+        "inicio = time.perf_counter()\n%s"
+        "print(time.perf_counter() - inicio, len(sys.modules))\n"
+    ) % (BASE_DIR, codigo)
+
+    totais, internos, modulos = [], [], 0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        saida = subprocess.run([sys.executable, '-c', programa], capture_output=True, text=True, check=True)
+        totais.append(time.perf_counter() - inicio)
+        interno, modulos = saida.stdout.split()
+        internos.append(float(interno))
+    return float(np.median(totais)), float(np.median(internos)), int(modulos)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("=" * 70)
+    print("BENCHMARK - PARTIDA A FRIO ATÉ A PRIMEIRA PREDIÇÃO")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as temporaria:
+        pasta, origem = preparar_dir_modelos(temporaria)
+        pacote = caminho_pacote('2023', temporaria)
+        exportar_pacote_2023(pasta, destino=pacote)
+        print(f"Modelos: {origem}\n")
+
+        print(f"{'caminho':<22} | {'processo (ms)':>13} | {'import+carga+predição (ms)':>26} | {'módulos':>7}")
+        for nome, codigo in CAMINHOS.items():
+            total, interno, modulos = medir(codigo.format(pasta=pasta, pacote=pacote), repeticoes)
+            print(f"{nome:<22} | {total * 1000:>13.0f} | {interno * 1000:>26.0f} | {modulos:>7}")
+
+    print("\n'processo' inclui a partida do interpretador; o runtime NumPy não importa pandas, scipy, sklearn nem joblib.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: pontuação de CSV em blocos vs. leitura do arquivo inteiro
+Gera CSVs de tamanhos crescentes a partir do CSV de exemplo e mede vazão
+(linhas/s) e pico de memória alocada em cada abordagem
+
+Uso: python scripts/benchmark_pontuacao.py [tamanhos separados por vírgula] [tamanho_bloco]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import pandas as pd
+
+from lexcarf.benchmark import carregar_modelos_benchmark, CSV_EXEMPLO
+from lexcarf.pontuacao import pontuar_csv
+from lexcarf.predicao import prever_probabilidades_lote
+
+
+def gerar_csv(caminho, n_linhas):
+    """Replica o CSV de exemplo (todas as colunas) até n_linhas"""
+    exemplo = pd.read_csv(CSV_EXEMPLO)
+    repeticoes = -(-n_linhas // len(exemplo))
+    pd.concat([exemplo] * repeticoes, ignore_index=True).iloc[:n_linhas].to_csv(caminho, index=False)
+
+
+def pontuar_arquivo_inteiro(caminho_entrada, caminho_saida, model_provimento, model_votacao, preprocessors):
+    """Abordagem ingênua: lê tudo, prevê tudo e grava tudo"""
+    df = pd.read_csv(caminho_entrada)
+    probabilidades = prever_probabilidades_lote(df, model_provimento, model_votacao, preprocessors)
+    pd.concat([df, probabilidades], axis=1).to_csv(caminho_saida, index=False)
+
+
+def medir(funcao):
+    """Retorna (segundos, pico de memória alocada em MB)"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcao()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 1024 ** 2
+
+
+def main():
+    tamanhos = [int(t) for t in sys.argv[1].split(',')] if len(sys.argv) > 1 else [2000, 8000, 32000]
+    tamanho_bloco = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    print("=" * 70)
+    print("BENCHMARK - PONTUAÇÃO DE CSV EM BLOCOS")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem} | bloco: {tamanho_bloco:,} linhas")
+    print(f"\n{'linhas':>8} | {'blocos: linhas/s':>16} {'pico MB':>8} | {'inteiro: linhas/s':>17} {'pico MB':>8}")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        entrada = os.path.join(pasta, 'entrada.csv')
+        saida = os.path.join(pasta, 'saida.csv')
+
+        for n_linhas in tamanhos:
+            gerar_csv(entrada, n_linhas)
+
+            tempo_blocos, pico_blocos = medir(lambda: pontuar_csv(
+                entrada, saida, model_provimento, model_votacao, preprocessors,
+                tamanho_bloco=tamanho_bloco, progresso=False
+            ))
+            tempo_inteiro, pico_inteiro = medir(lambda: pontuar_arquivo_inteiro(
+                entrada, saida, model_provimento, model_votacao, preprocessors
+            ))
+
+            print(f"{n_linhas:>8,} | {n_linhas / tempo_blocos:>16,.0f} {pico_blocos:>8.1f} | "
+                  f"{n_linhas / tempo_inteiro:>17,.0f} {pico_inteiro:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: pré-processadores em pickle vs. .npz sem pickle (TF-IDF leve)
+Compara tamanho do arquivo, tempo de carga em processo novo (incluindo os
+imports que cada formato exige) e latência do transform de uma linha e de um lote.
+
+Uso: python scripts/benchmark_preprocessors.py [linhas_corpus_grande]
+"""
+
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import carregar_entradas_exemplo, carregar_preprocessors, cronometrar, gerar_corpus_sintetico
+from lexcarf.featurizador import (Featurizador, carregar_preprocessors_compactos, preprocessors_serializaveis,
+                                  salvar_preprocessors_compactos)
+
+CARGA_PICKLE = (
+    "import pickle\n"
+    "with open({caminho!r}, 'rb') as f:\n"
+    "    pickle.load(f)\n"
+)
+CARGA_NPZ = (
+    "from lexcarf.featurizador import carregar_preprocessors_compactos\n"
+    "carregar_preprocessors_compactos({caminho!r})\n"
+)
+
+
+def tempo_processo_novo(codigo, repeticoes):
+    """Mediana do tempo de carga (imports + leitura) medido dentro de um processo novo"""
+    programa = (
+        "import sys, time, warnings; warnings.filterwarnings('ignore'); sys.path.insert(0, %r)\n"
+        "inicio = time.perf_counter()\n%s"
+        "print(time.perf_counter() - inicio)\n"
+    ) % (BASE_DIR, codigo)
+    tempos = [
+        float(subprocess.run([sys.executable, '-c', programa], capture_output=True, text=True).stdout.strip())
+        for _ in range(repeticoes)
+    ]
+    return float(np.median(tempos))
+
+
+def main():
+    n_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print("=" * 70)
+    print("BENCHMARK - PRÉ-PROCESSADORES SEM PICKLE")
+    print("=" * 70)
+
+    preprocessors = carregar_preprocessors()
+    corpus = gerar_corpus_sintetico(preprocessors, n_linhas, seed=3)
+    pacotes = {
+        'preprocessors_2023': preprocessors,
+        f'ajustado em {n_linhas:,} linhas': Featurizador(min_contagem_tributo=30).ajustar(corpus).para_preprocessors(),
+    }
+
+    entradas = carregar_entradas_exemplo(2000)
+    textos = list(entradas['texto_ementa'].fillna('').astype(str).str[:1000])
+
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, pacote in pacotes.items():
+            caminho_pkl = os.path.join(pasta, 'preprocessors.pkl')
+            caminho_npz = os.path.join(pasta, 'preprocessors.npz')
+            with open(caminho_pkl, 'wb') as f:
+                pickle.dump(preprocessors_serializaveis(pacote), f)
+            salvar_preprocessors_compactos(pacote, caminho_npz)
+
+            print(f"\n{nome}")
+            print(f"{'formato':<8} | {'tamanho KB':>10} | {'carga a frio (ms)':>17} | {'1 linha (µs)':>12} | "
+                  f"{'lote 2000 (ms)':>14}")
+            formatos = [
+                ('pickle', caminho_pkl, CARGA_PICKLE, pacote['tfidf']),
+                ('npz', caminho_npz, CARGA_NPZ, carregar_preprocessors_compactos(caminho_npz)['tfidf']),
+            ]
+            for formato, caminho, codigo, tfidf in formatos:
+                carga = tempo_processo_novo(codigo.format(caminho=caminho), 5)
+                linha, _ = cronometrar(lambda: [tfidf.transform([texto]) for texto in textos[:200]], repeticoes=3)
+                lote, _ = cronometrar(lambda: tfidf.transform(textos), repeticoes=3)
+                print(f"{formato:<8} | {os.path.getsize(caminho) / 1024:>10.1f} | {carga * 1000:>17.1f} | "
+                      f"{linha / 200 * 1e6:>12.0f} | {lote * 1000:>14.1f}")
+
+    print("\nA carga do pickle inclui importar o sklearn; a do .npz usa só NumPy, pandas e scipy.")
+
+
+if __name__ == "__main__":
+    main()
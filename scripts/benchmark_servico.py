@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: serviço HTTP com micro-lotes vs. uma requisição por vez
+Sobe o serviço localmente, dispara requisições concorrentes por conexões
+keep-alive e mede vazão e latências p50/p99 em cada configuração
+
+Uso: python scripts/benchmark_servico.py [n_requisicoes] [concorrencia]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+
+from lexcarf.benchmark import carregar_modelos_benchmark, carregar_entradas_exemplo
+from lexcarf.servico import ServicoPredicao
+
+CONFIGURACOES = [
+    ('uma por vez', {'max_lote': 1, 'max_espera': 0.0}),
+    ('micro-lotes', {'max_lote': 32, 'max_espera': 0.005}),
+]
+
+
+def iniciar_em_thread(servico):
+    """Executa o serviço em um loop próprio numa thread; retorna (loop, porta)"""
+    loop = asyncio.new_event_loop()
+    pronto = threading.Event()
+    estado = {}
+
+    def executar():
+        asyncio.set_event_loop(loop)
+        servidor = loop.run_until_complete(servico.iniciar('127.0.0.1', 0))
+        estado['porta'] = servidor.sockets[0].getsockname()[1]
+        pronto.set()
+        loop.run_forever()
+
+    threading.Thread(target=executar, daemon=True).start()
+    pronto.wait()
+    return loop, estado['porta']
+
+
+async def cliente(porta, corpos, latencias):
+    """Envia as requisições em sequência por uma única conexão keep-alive"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', porta)
+    for corpo in corpos:
+        inicio = time.perf_counter()
+        writer.write(
+            b'POST /prever HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n'
+            + f'Content-Length: {len(corpo)}\r\n\r\n'.encode('latin-1') + corpo
+        )
+        await writer.drain()
+
+        tamanho = 0
+        while True:
+            linha = await reader.readline()
+            if linha in (b'\r\n', b''):
+                break
+            if linha.lower().startswith(b'content-length:'):
+                tamanho = int(linha.split(b':')[1])
+        await reader.readexactly(tamanho)
+        latencias.append(time.perf_counter() - inicio)
+    writer.close()
+
+
+async def carga(porta, corpos, concorrencia):
+    """Divide as requisições entre as conexões concorrentes; retorna (duração, latências)"""
+    latencias = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(porta, corpos[i::concorrencia], latencias) for i in range(concorrencia)))
+    return time.perf_counter() - inicio, np.array(latencias)
+
+
+def main():
+    n_requisicoes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concorrencia = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+
+    print("=" * 70)
+    print("BENCHMARK - SERVIÇO HTTP COM MICRO-LOTES")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem}")
+    print(f"Requisições: {n_requisicoes:,} | conexões concorrentes: {concorrencia}")
+
+    entradas = carregar_entradas_exemplo(n_requisicoes)
+    corpos = [json.dumps(linha, ensure_ascii=False).encode('utf-8') for linha in entradas.to_dict('records')]
+
+    resultados = {}
+    for nome, parametros in CONFIGURACOES:
+        servico = ServicoPredicao(model_provimento, model_votacao, preprocessors, **parametros)
+        loop, porta = iniciar_em_thread(servico)
+
+        asyncio.run(carga(porta, corpos[:concorrencia], concorrencia))  # aquecimento
+        duracao, latencias = asyncio.run(carga(porta, corpos, concorrencia))
+        estatisticas = servico.estatisticas()
+        asyncio.run_coroutine_threadsafe(servico.encerrar(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+        resultados[nome] = n_requisicoes / duracao
+        print(f"\n{nome} (lote até {parametros['max_lote']}, espera {parametros['max_espera'] * 1000:.0f} ms):")
+        print(f"   Vazão:        {n_requisicoes / duracao:,.0f} req/s")
+        print(f"   Latência p50: {np.percentile(latencias, 50) * 1000:.1f} ms")
+        print(f"   Latência p99: {np.percentile(latencias, 99) * 1000:.1f} ms")
+        print(f"   Lote médio:   {estatisticas['tamanho_medio_lote']:.1f}")
+
+    print(f"\nGanho de vazão com micro-lotes: {resultados['micro-lotes'] / resultados['uma por vez']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
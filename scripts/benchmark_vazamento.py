@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: detecção de vazamento em uma passada vs. um termo por vez
+Grava CSVs de ementas (exemplos reais, ementas sintéticas e casos de borda:
+maiúsculas, acentos, 'İ', ausentes, números e termos que começam dentro de
+outro, como 'acordamaioria'), lê cada um e compara a regra original (apply
+com `palavra in texto.lower()` para cada termo) com lexcarf.vazamento em
+série e com vários processos. Confere que a máscara é idêntica (lista
+completa e lista de verificação) e que os termos por linha são os mesmos da
+busca termo a termo
+
+Uso: python scripts/benchmark_vazamento.py [linhas separadas por vírgula] [processos separados por vírgula]
+"""
+
+import os
+import sys
+import tempfile
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.benchmark import CSV_EXEMPLO, carregar_preprocessors, gerar_corpus_sintetico
+from lexcarf.vazamento import (PALAVRAS_VAZAMENTO, PALAVRAS_VERIFICACAO, contem_vazamento_linha, detectar_vazamento,
+                               pa)
+
+CASOS_BORDA = [
+    'RECURSO VOLUNTÁRIO PROVIDO', 'ACÓRDÃO da turma', 'DECİDIU pela procedência', 'Acordam os Membros',
+    'voto de QUALIDADE', 'mantem-se a exigência', 'Não Se Conhece do recurso', None, 12345, '',
+    'acordamaioria', 'por unanimidadecidiu', 'mantém-sentença',
+]
+
+
+def gravar_csv(caminho, n_linhas, seed=42):
+    """CSV com texto_ementa: 30% exemplos reais, 70% sintéticas e 1% casos de borda"""
+    rng = np.random.default_rng(seed)
+    exemplos = pd.read_csv(CSV_EXEMPLO)['texto_ementa'].values
+    sinteticas = gerar_corpus_sintetico(carregar_preprocessors(), 2000, seed=seed)['texto_ementa'].values
+    borda = np.array(CASOS_BORDA, dtype=object)
+
+    sorteio = rng.random(n_linhas)
+    textos = np.where(sorteio < 0.3, rng.choice(exemplos, n_linhas), rng.choice(sinteticas, n_linhas)).astype(object)
+    textos[sorteio > 0.99] = rng.choice(borda, int((sorteio > 0.99).sum()))
+    pd.DataFrame({'texto_ementa': textos}).to_csv(caminho, index=False)
+
+
+def termos_referencia(texto, palavras=PALAVRAS_VAZAMENTO):
+    """Termos encontrados com a busca termo a termo"""
+    if pd.isna(texto):
+        return ()
+    texto_lower = str(texto).lower()
+    return tuple(palavra for palavra in palavras if palavra in texto_lower)
+
+
+def cronometrar(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return time.perf_counter() - inicio, resultado
+
+
+def main():
+    tamanhos = [int(valor) for valor in sys.argv[1].split(',')] if len(sys.argv) > 1 else [20000, 200000]
+    processos = [int(valor) for valor in sys.argv[2].split(',')] if len(sys.argv) > 2 else [2, 4]
+
+    print("=" * 70)
+    print("BENCHMARK - DETECÇÃO DE VAZAMENTO")
+    print("=" * 70)
+    print(f"Motor: {'RE2 (pyarrow)' if pa is not None else 'laço Python (pyarrow ausente)'} | "
+          f"{len(PALAVRAS_VAZAMENTO)} termos | {os.cpu_count()} CPUs")
+
+    todos_ok = True
+    with tempfile.TemporaryDirectory() as diretorio:
+        for n_linhas in tamanhos:
+            caminho = os.path.join(diretorio, f'ementas_{n_linhas}.csv')
+            gravar_csv(caminho, n_linhas)
+            textos = pd.read_csv(caminho)['texto_ementa']
+            print(f"\n{n_linhas:,} linhas ({os.path.getsize(caminho) / 1024 ** 2:.0f} MB)")
+
+            tempo_original, original = cronometrar(lambda: textos.apply(contem_vazamento_linha).values)
+            print(f"   {'original (um termo por vez)':<34} {tempo_original:>8.3f} s")
+
+            modos = [('uma passada', 1, False), ('uma passada + termos', 1, True)]
+            modos += [(f'uma passada, {n} processos', n, False) for n in processos]
+            for nome, n_processos, termos in modos:
+                tempo, resultado = cronometrar(lambda: detectar_vazamento(textos, termos=termos,
+                                                                          n_processos=n_processos))
+                ok = bool((resultado['possivel_vazamento'].values == original).all())
+                if termos:
+                    ok &= resultado['termos_vazamento'].tolist() == [termos_referencia(texto) for texto in textos]
+                todos_ok &= ok
+                print(f"   {nome:<34} {tempo:>8.3f} s | {tempo_original / tempo:>5.1f}x | "
+                      f"{'OK' if ok else 'ERRO'}")
+
+            verificacao = detectar_vazamento(textos, PALAVRAS_VERIFICACAO)['possivel_vazamento'].values
+            ok = bool((verificacao == textos.apply(contem_vazamento_linha, palavras=PALAVRAS_VERIFICACAO).values).all())
+            todos_ok &= ok
+            print(f"   {'lista de verificação (27 termos)':<34} máscara {'OK' if ok else 'ERRO'}")
+            print(f"   {original.sum():,} linhas com vazamento ({original.mean():.1%})")
+
+    print("\n" + ("STATUS: MÁSCARAS E TERMOS IDÊNTICOS" if todos_ok else "STATUS: DIVERGÊNCIA NA DETECÇÃO"))
+    sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
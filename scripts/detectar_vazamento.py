@@ -5,8 +5,13 @@ Script para detectar e remover vazamento de informação (data leakage)
 nos textos das ementas do CARF
 """
 
+import os
+import sys
+
 import pandas as pd
-import re
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.vazamento import detectar_vazamento, frequencia_termos
 
 def main():
     print("=== DETECÇÃO DE VAZAMENTO DE INFORMAÇÃO (DATA LEAKAGE) ===")
@@ -15,33 +20,10 @@ def main():
     df = pd.read_csv('dados/carf_julgamentos_2024.csv')
     print(f'Total de registros originais: {len(df)}')
     
-    # Palavras indicativas de decisão que podem indicar vazamento
-    palavras_vazamento = [
-        'provido', 'negado', 'mantém-se', 'mantem-se', 'improcedente', 'procedente',
-        'dar provimento', 'nega-se', 'recurso conhecido', 'decide-se', 'não se conhece',
-        'voto de qualidade', 'unânime', 'maioria', 'qualidade', 'acordam os membros',
-        'por unanimidade', 'por maioria', 'votaram', 'conclusões', 'julgamento',
-        'decisão', 'acórdão', 'sentença', 'resultado', 'provimento', 'negação',
-        'acordam', 'votação', 'votou', 'deliberou', 'julgou', 'decidiu'
-    ]
-    
-    def detectar_vazamento(texto):
-        """Detecta possível vazamento de informação no texto"""
-        if pd.isna(texto):
-            return False
-        
-        texto_lower = str(texto).lower()
-        
-        # Verificar cada palavra
-        for palavra in palavras_vazamento:
-            if palavra in texto_lower:
-                return True
-        
-        return False
-    
-    # Aplicar detecção de vazamento
+    # Detecção em uma passada por ementa (termos compilados uma vez), em blocos divididos entre processos
     print("Detectando possível vazamento de informação...")
-    df['possivel_vazamento'] = df['texto_ementa'].apply(detectar_vazamento)
+    deteccao = detectar_vazamento(df['texto_ementa'], termos=True, n_processos=os.cpu_count() or 1)
+    df['possivel_vazamento'] = deteccao['possivel_vazamento']
     
     # Contar registros com possível vazamento
     vazamento_count = df['possivel_vazamento'].sum()
@@ -49,6 +31,10 @@ def main():
     print(f'Registros sem vazamento: {len(df) - vazamento_count}')
     print(f'Percentual removido: {(vazamento_count/len(df))*100:.1f}%')
     
+    # Termos que mais causam remoções
+    print('\nTermos mais frequentes (registros):')
+    print(frequencia_termos(deteccao['termos_vazamento']).head(10))
+    
     # Mostrar exemplos de registros com possível vazamento
     exemplos_vazamento = df[df['possivel_vazamento'] == True].head(3)
     
@@ -57,6 +43,7 @@ def main():
         print(f'\nRegistro {i+1}:')
         print(f'Resultado: {row["resultado_julgamento"]}')
         print(f'Votação: {row["votacao"]}')
+        print(f'Termos encontrados: {", ".join(deteccao.at[i, "termos_vazamento"])}')
         print(f'Texto da ementa (primeiros 200 chars):')
         print(f'{str(row["texto_ementa"])[:200]}...')
         print('-' * 80)
@@ -4,9 +4,15 @@
 Detecção de vazamento de informação nos dados CARF 2023
 """
 
+import os
+import sys
+
 import pandas as pd
 import numpy as np
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.vazamento import detectar_vazamento, frequencia_termos
+
 def main():
     print("=== DETECCAO DE VAZAMENTO - DADOS CARF 2023 ===")
     
@@ -14,33 +20,10 @@ def main():
     df_2023 = pd.read_csv('dados/carf_julgamentos_2023.csv')
     print(f'Total de registros 2023: {len(df_2023)}')
     
-    # Palavras indicativas de decisão que podem indicar vazamento
-    palavras_vazamento = [
-        'provido', 'negado', 'mantém-se', 'mantem-se', 'improcedente', 'procedente',
-        'dar provimento', 'nega-se', 'recurso conhecido', 'decide-se', 'não se conhece',
-        'voto de qualidade', 'unânime', 'maioria', 'qualidade', 'acordam os membros',
-        'por unanimidade', 'por maioria', 'votaram', 'conclusões', 'julgamento',
-        'decisão', 'acórdão', 'sentença', 'resultado', 'provimento', 'negação',
-        'acordam', 'votação', 'votou', 'deliberou', 'julgou', 'decidiu'
-    ]
-    
-    def detectar_vazamento(texto):
-        """Detecta possível vazamento de informação no texto"""
-        if pd.isna(texto):
-            return False
-        
-        texto_lower = str(texto).lower()
-        
-        # Verificar cada palavra
-        for palavra in palavras_vazamento:
-            if palavra in texto_lower:
-                return True
-        
-        return False
-    
-    # Aplicar detecção de vazamento
+    # Detecção em uma passada por ementa (termos compilados uma vez), em blocos divididos entre processos
     print("Detectando possível vazamento de informação...")
-    df_2023['possivel_vazamento'] = df_2023['texto_ementa'].apply(detectar_vazamento)
+    deteccao = detectar_vazamento(df_2023['texto_ementa'], termos=True, n_processos=os.cpu_count() or 1)
+    df_2023['possivel_vazamento'] = deteccao['possivel_vazamento']
     
     # Contar registros com possível vazamento
     vazamento_count = df_2023['possivel_vazamento'].sum()
@@ -48,6 +31,10 @@ def main():
     print(f'Registros sem vazamento: {len(df_2023) - vazamento_count}')
     print(f'Percentual removido: {(vazamento_count/len(df_2023))*100:.1f}%')
     
+    # Termos que mais causam remoções
+    print('\nTermos mais frequentes (registros):')
+    print(frequencia_termos(deteccao['termos_vazamento']).head(10))
+    
     # Mostrar exemplos de registros com possível vazamento
     exemplos_vazamento = df_2023[df_2023['possivel_vazamento'] == True].head(3)
     
@@ -56,6 +43,7 @@ def main():
         print(f'\nRegistro {i+1}:')
         print(f'Resultado: {row["resultado_julgamento"]}')
         print(f'Votação: {row["votacao"]}')
+        print(f'Termos encontrados: {", ".join(deteccao.at[i, "termos_vazamento"])}')
         print(f'Texto da ementa (primeiros 200 chars):')
         texto_limpo = str(row["texto_ementa"]).encode('ascii', 'ignore').decode('ascii')
         print(f'{texto_limpo[:200]}...')
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exporta as florestas 2023 já compiladas em arquivos mapeáveis em memória
+Uso: python scripts/exportar_florestas.py [diretorio_modelos]
+"""
+
+import os
+import sys
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from lexcarf.modelos import DIR_MODELOS, exportar_florestas_2023
+
+
+def main():
+    dir_modelos = sys.argv[1] if len(sys.argv) > 1 else DIR_MODELOS
+
+    print(f"Exportando florestas compiladas de {dir_modelos}...")
+    inicio = time.perf_counter()
+    destinos = exportar_florestas_2023(dir_modelos)
+    for caminho in destinos.values():
+        print(f"✅ {caminho} ({os.path.getsize(caminho) / 1024 ** 2:.1f} MB)")
+    print(f"Concluído em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
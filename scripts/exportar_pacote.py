@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gera o pacote único 2023 (modelos + pré-processadores) a partir dos pickles atuais
+Uso: python scripts/exportar_pacote.py [diretorio_modelos]
+"""
+
+import os
+import sys
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from lexcarf.modelos import DIR_MODELOS, exportar_pacote_2023
+from lexcarf.pacote import ler_manifesto
+
+
+def main():
+    dir_modelos = sys.argv[1] if len(sys.argv) > 1 else DIR_MODELOS
+
+    print(f"Exportando pacote 2023 de {dir_modelos}...")
+    inicio = time.perf_counter()
+    caminho = exportar_pacote_2023(dir_modelos)
+    manifesto = ler_manifesto(caminho)
+    print(f"✅ {caminho} ({os.path.getsize(caminho) / 1024 ** 2:.1f} MB, versão {manifesto['versao']})")
+    for nome, info in manifesto['modelos'].items():
+        print(f"   {nome}: {info['n_arvores']} árvores, classes {info['classes']}")
+    print(f"Concluído em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Converte um pacote de pré-processadores .pkl para o .npz sem pickle
+Uso: python scripts/exportar_preprocessors.py [entrada.pkl] [saida.npz]
+(padrão: modelos/preprocessors_2023.pkl -> modelos/preprocessors_2023.npz)
+"""
+
+import os
+import pickle
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from lexcarf.featurizador import salvar_preprocessors_compactos
+from lexcarf.modelos import ARQUIVO_PREPROCESSORS_COMPACTOS_2023, DIR_MODELOS, caminhos_modelos_2023
+
+
+def main():
+    entrada = sys.argv[1] if len(sys.argv) > 1 else caminhos_modelos_2023()['preprocessors']
+    saida = sys.argv[2] if len(sys.argv) > 2 else (
+        os.path.splitext(entrada)[0] + '.npz' if len(sys.argv) > 1
+        else os.path.join(DIR_MODELOS, ARQUIVO_PREPROCESSORS_COMPACTOS_2023)
+    )
+
+    with open(entrada, 'rb') as f:
+        preprocessors = pickle.load(f)
+    salvar_preprocessors_compactos(preprocessors, saida)
+    print(f"✅ {entrada} ({os.path.getsize(entrada) / 1024:.0f} KB) -> {saida} ({os.path.getsize(saida) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
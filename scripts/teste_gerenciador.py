@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste - Gerenciador de modelos com recarga a quente
+Várias threads fazem predições enquanto o arquivo do modelo de provimento é
+substituído; nenhuma predição pode falhar e a versão nova deve entrar em uso.
+Também confere a espera entre tentativas de um arquivo inválido e que o cache
+de predições, com a versão entregue junto com os modelos, nunca serve um
+resultado da versão anterior depois da troca
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import joblib
+
+from lexcarf.benchmark import carregar_entradas_exemplo, preparar_dir_modelos
+from lexcarf.cache import CachePredicoes
+from lexcarf.gerenciador import GerenciadorModelos, gerenciador_modelos_2023
+from lexcarf.modelos import ARQUIVOS_2023, caminhos_modelos_2023
+from lexcarf.predicao import prever_probabilidades_lote
+
+N_THREADS = 4
+INTERVALO = 0.05
+
+
+def verificar(descricao, condicao):
+    print(f"   {'OK' if condicao else 'ERRO'}: {descricao}")
+    return condicao
+
+
+def substituir_arquivo(destino, objeto):
+    """Grava em arquivo temporário e troca de uma vez (os.replace)"""
+    temporario = destino + '.tmp'
+    joblib.dump(objeto, temporario)
+    os.replace(temporario, destino)
+
+
+def main():
+    print("=" * 70)
+    print("TESTE - GERENCIADOR DE MODELOS (RECARGA A QUENTE)")
+    print("=" * 70)
+
+    todos_ok = True
+    entradas = carregar_entradas_exemplo(20)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        dir_modelos, origem = preparar_dir_modelos(pasta)
+        if dir_modelos != pasta:
+            for arquivo in ARQUIVOS_2023.values():
+                shutil.copy(os.path.join(dir_modelos, arquivo), pasta)
+        print(f"Modelos: {origem}")
+
+        gerenciador = gerenciador_modelos_2023(pasta)
+        gerenciador.intervalo_verificacao = INTERVALO
+
+        # 1. Instância única compartilhada entre threads
+        instancias = []
+        threads = [threading.Thread(target=lambda: instancias.append(gerenciador.obter())) for _ in range(N_THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        todos_ok &= verificar("mesma instância em todas as threads",
+                              all(instancia is instancias[0] for instancia in instancias))
+        todos_ok &= verificar("mesmo gerenciador para o mesmo diretório", gerenciador_modelos_2023(pasta) is gerenciador)
+        todos_ok &= verificar("uma única carga", gerenciador.carregamentos == 1)
+
+        # 2. Troca do modelo com predições em andamento (cópia reduzida à metade das árvores)
+        caminho_provimento = caminhos_modelos_2023(pasta)['provimento']
+        reduzido = joblib.load(caminho_provimento)
+        n_original = len(reduzido.estimators_)
+        reduzido.estimators_ = reduzido.estimators_[:n_original // 2]
+        reduzido.n_estimators = n_original // 2
+
+        erros = []
+        arvores_vistas = set()
+        parar = threading.Event()
+
+        def trabalhar():
+            while not parar.is_set():
+                try:
+                    modelos = gerenciador.obter()
+                    prever_probabilidades_lote(entradas, *modelos)
+                    arvores_vistas.add(len(modelos[0].estimators_))
+                except Exception as e:
+                    erros.append(e)
+
+        threads = [threading.Thread(target=trabalhar) for _ in range(N_THREADS)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.3)
+        substituir_arquivo(caminho_provimento, reduzido)
+
+        limite = time.time() + 30
+        while gerenciador.obter()[0].n_estimators != n_original // 2 and time.time() < limite:
+            time.sleep(INTERVALO)
+        time.sleep(0.3)
+        parar.set()
+        for thread in threads:
+            thread.join()
+
+        todos_ok &= verificar(f"nenhuma predição falhou durante a troca ({len(erros)} erros)", not erros)
+        todos_ok &= verificar(f"versão nova em uso ({n_original} -> {n_original // 2} árvores)",
+                              gerenciador.obter()[0].n_estimators == n_original // 2)
+        todos_ok &= verificar("threads viram as duas versões", arvores_vistas == {n_original, n_original // 2})
+
+        # 3. Arquivo inválido: mantém a versão anterior e registra o erro
+        em_uso = gerenciador.obter()
+        with open(caminhos_modelos_2023(pasta)['votacao'], 'wb') as f:
+            f.write(b'arquivo corrompido')
+        falhas_antes = gerenciador.falhas
+        limite = time.time() + 1.5
+        while time.time() < limite:
+            modelos = gerenciador.obter()
+            time.sleep(INTERVALO / 5)
+        gerenciador.aguardar_recarga()
+        estatisticas = gerenciador.estatisticas()
+        falhas = estatisticas['falhas'] - falhas_antes
+        todos_ok &= verificar("arquivo inválido mantém os modelos anteriores", modelos is em_uso)
+        todos_ok &= verificar("falha registrada nas estatísticas",
+                              falhas >= 1 and estatisticas['ultimo_erro'] is not None)
+        # Sem espera seriam ~30 tentativas em 1,5 s; com a espera dobrando a partir de 0,1 s, no máximo 5
+        todos_ok &= verificar(f"arquivo inválido não é recarregado a cada verificação ({falhas} tentativas)",
+                              falhas <= 5)
+
+    # 4. Carregador próprio e estatísticas
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'modelo.pkl')
+        joblib.dump({'versao': 1}, caminho)
+        gerenciador = GerenciadorModelos([caminho], intervalo_verificacao=0)
+        primeiro = gerenciador.obter()
+        joblib.dump({'versao': 2, 'extra': list(range(10))}, caminho)
+        pendente = gerenciador.obter()  # primeira verificação: versão nova ainda pendente
+        durante = gerenciador.obter()   # segunda: recarga iniciada em segundo plano
+        gerenciador.aguardar_recarga()
+        todos_ok &= verificar("versão nova só carregada quando estável, fora da requisição",
+                              pendente is primeiro and durante is primeiro and gerenciador.obter()[0]['versao'] == 2)
+        estatisticas = gerenciador.estatisticas()
+        print(f"   Estatísticas: {estatisticas}")
+        todos_ok &= verificar("estatísticas com tempo de carga e versão",
+                              estatisticas['carregamentos'] == 2 and estatisticas['tempo_ultima_carga'] is not None
+                              and estatisticas['versao'] is not None)
+
+    # 5. Cache de predições com a versão dos modelos em mãos: nada da versão anterior depois da troca
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'modelo.pkl')
+        joblib.dump({'modelo': 'v1'}, caminho)
+        gerenciador = GerenciadorModelos([caminho], intervalo_verificacao=0)
+        cache = CachePredicoes()
+
+        def prever(texto, tributo, turma, modelos):
+            return {'modelo': modelos[0]['modelo']}, {}, None
+
+        def prever_com_cache(texto):
+            modelos, versao = gerenciador.obter_com_versao()
+            return modelos[0]['modelo'], cache.com_cache(prever, versao)(texto, 'IRPF', 'turma', modelos)[0]['modelo']
+
+        respostas = [prever_com_cache('ementa a')]
+        joblib.dump({'modelo': 'v2-nova'}, caminho)
+        # Arquivos já mudaram, mas o gerenciador ainda entrega a v1: o cache deve ficar na v1
+        for texto in ('ementa b', 'ementa a', 'ementa b'):
+            respostas.append(prever_com_cache(texto))
+        gerenciador.aguardar_recarga()
+        for texto in ('ementa a', 'ementa b', 'ementa c'):
+            respostas.append(prever_com_cache(texto))
+
+        todos_ok &= verificar("cache sempre responde com a versão dos modelos em mãos",
+                              all(modelo == resposta for modelo, resposta in respostas))
+        todos_ok &= verificar("troca de versão esvazia o cache", respostas[-1] == ('v2-nova', 'v2-nova')
+                              and cache.estatisticas()['invalidacoes'] == 1)
+
+    print("\n" + ("STATUS: TODOS OS TESTES PASSARAM!" if todos_ok else "STATUS: FALHA NO GERENCIADOR"))
+    sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
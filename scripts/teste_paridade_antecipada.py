@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de Paridade - Predição antecipada vs. avaliação completa
+Sem parada (z infinito) a predição antecipada deve reproduzir predict_proba;
+com parada, as árvores usadas ficam entre o mínimo e o total
+"""
+
+import os
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.antecipada import MIN_ARVORES_PADRAO, avaliar_floresta, n_arvores, opcoes_antecipada
+from lexcarf.benchmark import carregar_modelos_benchmark, carregar_entradas_exemplo, gerar_corpus_sintetico
+from lexcarf.floresta import compilar_floresta
+from lexcarf.predicao import preparar_features_lote
+
+TOLERANCIA = 1e-9
+
+
+def main():
+    print("=" * 70)
+    print("TESTE DE PARIDADE - PREDIÇÃO ANTECIPADA")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem}")
+
+    entradas = carregar_entradas_exemplo(10)
+    sinteticas = gerar_corpus_sintetico(preprocessors, 300, seed=7)[['texto_ementa', 'tributo', 'turma']]
+    X = preparar_features_lote(pd.concat([entradas, sinteticas], ignore_index=True), preprocessors)
+
+    todos_ok = True
+    for nome, modelo in [('provimento', model_provimento), ('votação', model_votacao)]:
+        esperado = modelo.predict_proba(X)
+        for motor, floresta in [('compilada', compilar_floresta(modelo)), ('sklearn', modelo)]:
+            total = n_arvores(floresta)
+
+            sem_parada, arvores = avaliar_floresta(floresta, X, opcoes_antecipada({'z': np.inf}))
+            linha, _ = avaliar_floresta(floresta, X[0], opcoes_antecipada({'z': np.inf}))
+            diferenca = max(np.abs(sem_parada - esperado).max(), np.abs(linha - esperado[:1]).max())
+            ok = diferenca <= TOLERANCIA and (arvores == total).all()
+            print(f"   {'OK' if ok else 'ERRO'}: {nome} ({motor}, sem parada) - diferença máxima {diferenca:.2e}")
+            todos_ok &= ok
+
+            prob, arvores = avaliar_floresta(floresta, X, opcoes_antecipada(True))
+            ok = (np.allclose(prob.sum(axis=1), 1) and arvores.min() >= MIN_ARVORES_PADRAO
+                  and arvores.max() <= total)
+            print(f"   {'OK' if ok else 'ERRO'}: {nome} ({motor}, antecipada) - "
+                  f"{arvores.mean():.1f} árvores em média, probabilidades somam 1")
+            todos_ok &= ok
+
+    print("\n" + ("STATUS: TODOS OS TESTES PASSARAM!" if todos_ok else "STATUS: FALHA NA PARIDADE"))
+    sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
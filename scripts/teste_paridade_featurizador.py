@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de Paridade - Featurizador compartilhado (treinamento vs. inferência)
+"""
+
+import os
+import pickle
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import LabelEncoder
+
+from lexcarf.benchmark import carregar_preprocessors, carregar_entradas_exemplo, gerar_corpus_sintetico
+from lexcarf.featurizador import Featurizador, obter_featurizador
+
+
+def features_treinamento_original(df, min_contagem_tributo):
+    """Pipeline de features como estava escrito em train_model_2023_2024.py"""
+    tributo_counts = df['tributo'].value_counts()
+    tributos_frequentes = tributo_counts[tributo_counts >= min_contagem_tributo].index.tolist()
+    tributo_codificado = df['tributo'].apply(lambda x: x if x in tributos_frequentes else 'OUTROS')
+    tributo_encoded = LabelEncoder().fit_transform(tributo_codificado)
+
+    turma_simplificada = df['turma'].str.extract(r'(\d+ª)')[0].fillna('OUTROS')
+    turma_encoded = LabelEncoder().fit_transform(turma_simplificada)
+
+    textos = df['texto_ementa'].fillna('').astype(str).str[:1000]
+    tfidf = TfidfVectorizer(max_features=1000, stop_words=None, ngram_range=(1, 2), min_df=2, max_df=0.95,
+                            dtype=np.float32)
+    tfidf_matrix = tfidf.fit_transform(textos)
+
+    X_categoricas = np.column_stack([tributo_encoded, turma_encoded])
+    return np.hstack([X_categoricas, tfidf_matrix.toarray()]).astype(np.float32)
+
+
+def verificar(descricao, condicao):
+    print(f"   {'OK' if condicao else 'ERRO'}: {descricao}")
+    return condicao
+
+
+def main():
+    print("=" * 70)
+    print("TESTE DE PARIDADE - FEATURIZADOR")
+    print("=" * 70)
+
+    preprocessors = carregar_preprocessors()
+    df = gerar_corpus_sintetico(preprocessors, 2000, seed=11)[['texto_ementa', 'tributo', 'turma']]
+    # Turmas como aparecem no CSV (com espaço inicial) e sem número ordinal
+    df.loc[::7, 'turma'] = ' ' + df.loc[::7, 'turma']
+    df.loc[::13, 'turma'] = 'CSRF'
+    df = pd.concat([df, carregar_entradas_exemplo(10)], ignore_index=True)
+
+    featurizador = Featurizador(min_contagem_tributo=30)
+    X_lote = featurizador.ajustar_transformar(df)
+    todos_ok = True
+
+    # 1. Mesmas features que o pipeline de treinamento original
+    X_original = features_treinamento_original(df, 30)
+    todos_ok &= verificar("lote idêntico ao pipeline original de treinamento",
+                          np.array_equal(X_lote.toarray(), X_original))
+
+    # 2. Linha a linha (caminho das aplicações) idêntico ao lote (caminho do treinamento)
+    X_linhas = sp.vstack([
+        featurizador.transformar_linha(linha.texto_ementa, linha.tributo, linha.turma)
+        for linha in df.itertuples()
+    ]).tocsr()
+    todos_ok &= verificar("linha a linha idêntico ao lote", (X_linhas != X_lote).nnz == 0)
+
+    # 3. Turma com espaço inicial recebe o mesmo código que sem espaço
+    todos_ok &= verificar("turma ' 02ª ...' codificada como '02ª'",
+                          featurizador.transformar_linha('x', 'IRPJ', ' 02ª TO-04ªCÂMARA')[0, 1]
+                          == featurizador.transformar_linha('x', 'IRPJ', '02ª')[0, 1])
+
+    # 4. Pacote serializado só com sklearn e dicts (sem classes de lexcarf) produz as mesmas features
+    serializado = pickle.dumps(featurizador.para_preprocessors())
+    todos_ok &= verificar("pacote serializado sem classes de lexcarf", b'lexcarf' not in serializado)
+    restaurado = obter_featurizador(pickle.loads(serializado))
+    todos_ok &= verificar("featurizador reconstruído do pacote serializado idêntico",
+                          (restaurado.transformar(df) != X_lote).nnz == 0)
+
+    # 5. Pacotes antigos (só as chaves originais) continuam funcionando
+    antigo = {chave: featurizador.para_preprocessors()[chave]
+              for chave in ['le_tributo', 'le_turma', 'tfidf', 'tributos_frequentes', 'feature_names']}
+    reconstruido = obter_featurizador(antigo)
+    todos_ok &= verificar("featurizador reconstruído de pacote antigo idêntico",
+                          (reconstruido.transformar(df) != X_lote).nnz == 0)
+
+    print("\n" + ("STATUS: TODOS OS TESTES PASSARAM!" if todos_ok else "STATUS: FALHA NA PARIDADE"))
+    sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de Paridade - Floresta compilada vs. predict_proba do sklearn
+"""
+
+import os
+import sys
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.benchmark import carregar_modelos_benchmark, carregar_entradas_exemplo, gerar_corpus_sintetico
+from lexcarf.floresta import compilar_floresta
+from lexcarf.predicao import preparar_features_lote
+
+TOLERANCIA = 1e-9
+
+
+def main():
+    print("=" * 70)
+    print("TESTE DE PARIDADE - FLORESTA COMPILADA")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem}")
+
+    # Entradas reais (CSV de exemplo) + sintéticas, para cobrir muitos caminhos nas árvores
+    entradas = carregar_entradas_exemplo(10)
+    sinteticas = gerar_corpus_sintetico(preprocessors, 500, seed=7)[['texto_ementa', 'tributo', 'turma']]
+    X = preparar_features_lote(pd.concat([entradas, sinteticas], ignore_index=True), preprocessors)
+
+    todos_ok = True
+    for nome, modelo in [('provimento', model_provimento), ('votação', model_votacao)]:
+        compilado = compilar_floresta(modelo)
+        esperado = modelo.predict_proba(X)
+
+        casos = {
+            'lote esparso': compilado.predict_proba(X),
+            'lote denso': compilado.predict_proba(X.toarray()),
+            'linha a linha': np.vstack([compilado.predict_proba(X[i]) for i in range(X.shape[0])]),
+        }
+
+        if list(compilado.classes_) != list(modelo.classes_):
+            print(f"   ERRO: {nome} - classes diferentes")
+            todos_ok = False
+
+        for caso, obtido in casos.items():
+            diferenca = np.abs(obtido - esperado).max()
+            if diferenca <= TOLERANCIA:
+                print(f"   OK: {nome} ({caso}) - diferença máxima {diferenca:.2e}")
+            else:
+                print(f"   ERRO: {nome} ({caso}) - diferença máxima {diferenca:.2e}")
+                todos_ok = False
+
+    print("\n" + ("STATUS: TODOS OS TESTES PASSARAM!" if todos_ok else "STATUS: FALHA NA PARIDADE"))
+    sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de Paridade - runtime só com NumPy (lexcarf.inferencia) vs. caminho sklearn
+As features devem ser idênticas às do Featurizador e as probabilidades iguais às
+do predict_proba do sklearn dentro da tolerância de ponto flutuante
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from lexcarf.benchmark import carregar_entradas_exemplo, carregar_modelos_benchmark, gerar_corpus_sintetico
+from lexcarf.featurizador import obter_featurizador
+from lexcarf.inferencia import RuntimeInferencia
+from lexcarf.pacote import salvar_pacote
+
+TOLERANCIA = 1e-12
+MODULOS_PESADOS = ('pandas', 'scipy', 'sklearn', 'joblib')
+
+
+def verificar(descricao, condicao):
+    print(f"   {'OK' if condicao else 'ERRO'}: {descricao}")
+    return condicao
+
+
+def main():
+    print("=" * 70)
+    print("TESTE DE PARIDADE - RUNTIME DE INFERÊNCIA SÓ COM NUMPY")
+    print("=" * 70)
+
+    model_provimento, model_votacao, preprocessors, origem = carregar_modelos_benchmark()
+    print(f"Modelos: {origem}")
+
+    df = gerar_corpus_sintetico(preprocessors, 1500, seed=11)[['texto_ementa', 'tributo', 'turma']]
+    df = df.reset_index(drop=True)
+    df.loc[0, 'texto_ementa'] = None
+    df.loc[1, 'texto_ementa'] = float('nan')
+    df.loc[2, 'tributo'] = 'TRIBUTO INEXISTENTE'
+    df.loc[3, 'turma'] = 'SEM TURMA'
+    df = pd.concat([df, carregar_entradas_exemplo(50)], ignore_index=True)
+    entradas = list(df.itertuples(index=False, name=None))
+    todos_ok = True
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'modelo.pacote')
+        salvar_pacote(caminho, {'provimento': model_provimento, 'votacao': model_votacao}, preprocessors)
+
+        for mmap in (True, False):
+            runtime = RuntimeInferencia(caminho, mmap=mmap)
+            print(f"\nmmap={mmap}")
+
+            # 1. Features: mesmas do Featurizador em float32 (o dtype comparado pelas árvores)
+            X_referencia = obter_featurizador(preprocessors).transformar(df).toarray().astype(np.float32)
+            X_runtime = runtime.features(entradas)
+            todos_ok &= verificar(f"features idênticas ({X_runtime.shape[0]} x {X_runtime.shape[1]})",
+                                  X_runtime.dtype == np.float32 and np.array_equal(X_runtime, X_referencia))
+
+            # 2. Probabilidades vs. predict_proba do sklearn
+            X = obter_featurizador(preprocessors).transformar(df)
+            probabilidades = runtime.prever_probabilidades(entradas)
+            for nome, modelo in [('provimento', model_provimento), ('votacao', model_votacao)]:
+                diferenca = np.abs(probabilidades[nome] - modelo.predict_proba(X)).max()
+                todos_ok &= verificar(f"{nome}: diferença máxima {diferenca:.1e}", diferenca <= TOLERANCIA)
+
+            # 3. Formato de resposta, entradas em dict e linha única
+            resultado = runtime.prever(entradas[:5])
+            dicts = runtime.prever([dict(zip(('texto_ementa', 'tributo', 'turma'), e)) for e in entradas[:5]])
+            linha = runtime.prever_linha(*entradas[4])
+            todos_ok &= verificar("entradas em tupla, dict e linha única dão o mesmo resultado",
+                                  resultado == dicts and resultado[4] == linha)
+            todos_ok &= verificar("classes na resposta iguais às do modelo",
+                                  list(linha['provimento']) == [str(c) for c in model_provimento.classes_]
+                                  and list(linha['votacao']) == [str(c) for c in model_votacao.classes_])
+            todos_ok &= verificar("lote vazio", runtime.prever([]) == [])
+
+        # 4. O processo de pontuação não importa bibliotecas pesadas
+        codigo = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "from lexcarf.inferencia import RuntimeInferencia\n"
+            "RuntimeInferencia(%r).prever_linha('imposto de renda', 'IRPF', '2ª')\n"
+            "print(','.join(m for m in %r if m in sys.modules))"
+        ) % (BASE_DIR, caminho, MODULOS_PESADOS)
+        saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True)
+        todos_ok &= verificar(f"predição sem importar {', '.join(MODULOS_PESADOS)}",
+                              saida.returncode == 0 and saida.stdout.strip() == '')
+
+    print("\n" + ("STATUS: TODOS OS TESTES PASSARAM!" if todos_ok else "STATUS: FALHA NA PARIDADE"))
+    sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de Paridade - TF-IDF leve e pré-processadores sem pickle vs. sklearn
+A matriz do TfidfLeve deve ser idêntica bit a bit à de TfidfVectorizer.transform
+"""
+
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import warnings
+warnings.filterwarnings('ignore')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from lexcarf.benchmark import carregar_entradas_exemplo, carregar_preprocessors, gerar_corpus_sintetico
+from lexcarf.featurizador import (
+    Featurizador, carregar_preprocessors_compactos, limpar_textos, obter_featurizador, preprocessors_serializaveis,
+    salvar_preprocessors_compactos
+)
+from lexcarf.tfidf_leve import TfidfLeve
+
+# Casos de borda somados aos textos reais
+TEXTOS_BORDA = [
+    '',
+    'a',
+    'IMPOSTO Imposto imposto',
+    'Ação, omissão; NÃO-INCIDÊNCIA! Contribuição (PIS/COFINS) 2024.',
+    'palavra ' * 400,
+    'naïve café résumé — “aspas” ½ ﬁ',
+]
+
+VARIANTES = {
+    'sublinear_tf': {'sublinear_tf': True},
+    'binary': {'binary': True},
+    'norm l1': {'norm': 'l1'},
+    'sem norma': {'norm': None},
+    'sem idf': {'use_idf': False},
+    'strip_accents unicode': {'strip_accents': 'unicode'},
+    'strip_accents ascii': {'strip_accents': 'ascii'},
+    'stop_words english': {'stop_words': 'english'},
+    'ngram (1, 3)': {'ngram_range': (1, 3)},
+    'float64': {'dtype': np.float64},
+}
+
+
+def verificar(descricao, condicao):
+    print(f"   {'OK' if condicao else 'ERRO'}: {descricao}")
+    return condicao
+
+
+def identicas(A, B):
+    """Mesma estrutura CSR, mesmo dtype e mesmos bits nos valores"""
+    A, B = A.tocsr(), B.tocsr()
+    return (A.shape == B.shape and A.dtype == B.dtype and np.array_equal(A.indptr, B.indptr)
+            and np.array_equal(A.indices, B.indices) and np.array_equal(A.data.view(np.uint8), B.data.view(np.uint8)))
+
+
+def main():
+    print("=" * 70)
+    print("TESTE DE PARIDADE - TF-IDF LEVE")
+    print("=" * 70)
+
+    preprocessors = carregar_preprocessors()
+    df = gerar_corpus_sintetico(preprocessors, 3000, seed=5)[['texto_ementa', 'tributo', 'turma']]
+    entradas = carregar_entradas_exemplo(20)
+    textos = list(limpar_textos(df['texto_ementa'])) + list(limpar_textos(entradas['texto_ementa'])) + TEXTOS_BORDA
+    todos_ok = True
+
+    # 1. TF-IDF do pacote de pré-processadores salvo
+    tfidf = preprocessors['tfidf']
+    todos_ok &= verificar(f"pré-processadores salvos (dtype {np.dtype(tfidf.dtype).name})",
+                          identicas(TfidfLeve.de_sklearn(tfidf).transform(textos), tfidf.transform(textos)))
+
+    # 2. TF-IDF de treinamento (float32) e variantes de parâmetros
+    base = dict(max_features=1000, ngram_range=(1, 2), min_df=2, max_df=0.95, dtype=np.float32)
+    for nome, parametros in [('treinamento float32', {})] + list(VARIANTES.items()):
+        tfidf = TfidfVectorizer(**dict(base, **parametros)).fit(textos[:2000])
+        todos_ok &= verificar(nome, identicas(TfidfLeve.de_sklearn(tfidf).transform(textos), tfidf.transform(textos)))
+
+    # 3. Pré-processadores sem pickle: mesmas features que o .pkl, sem importar o sklearn
+    featurizador = Featurizador(min_contagem_tributo=30).ajustar(df)
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, pacote in [('salvos', preprocessors), ('treinamento float32', featurizador.para_preprocessors())]:
+            caminho = os.path.join(pasta, f'{nome.split()[0]}.npz')
+            salvar_preprocessors_compactos(pacote, caminho)
+            compactos = carregar_preprocessors_compactos(caminho)
+            X_original = obter_featurizador(pacote).transformar(df)
+            X_compacto = obter_featurizador(compactos).transformar(df)
+            tamanho_pkl = len(pickle.dumps(preprocessors_serializaveis(pacote)))
+            todos_ok &= verificar(f".npz {nome}: features idênticas ({tamanho_pkl / 1024:.0f} KB pickle -> "
+                                  f"{os.path.getsize(caminho) / 1024:.0f} KB)", identicas(X_original, X_compacto))
+
+        codigo = (
+            "import sys; sys.path.insert(0, %r)\n"
+            "from lexcarf.featurizador import carregar_preprocessors_compactos, obter_featurizador\n"
+            "p = carregar_preprocessors_compactos(%r)\n"
+            "obter_featurizador(p).transformar_linha('imposto de renda', 'IRPF', '2ª')\n"
+            "print('sklearn' in sys.modules)"
+        ) % (BASE_DIR, caminho)
+        saida = subprocess.run([sys.executable, '-c', codigo], capture_output=True, text=True).stdout.strip()
+        todos_ok &= verificar("carga do .npz e predição de features sem importar o sklearn", saida == 'False')
+
+    print("\n" + ("STATUS: TODOS OS TESTES PASSARAM!" if todos_ok else "STATUS: FALHA NA PARIDADE"))
+    sys.exit(0 if todos_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,8 +4,14 @@
 Script para verificar se o dataset limpo está correto
 """
 
+import os
+import sys
+
 import pandas as pd
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from lexcarf.vazamento import PALAVRAS_VERIFICACAO, detectar_vazamento, frequencia_termos
+
 def main():
     print("=== VERIFICACAO DO DATASET LIMPO ===")
     
@@ -15,25 +21,9 @@ def main():
     print(f'Colunas: {list(df_limpo.columns)}')
     
     # Verificar se não há mais palavras de vazamento
-    palavras_vazamento = [
-        'provido', 'negado', 'mantém-se', 'mantem-se', 'improcedente', 'procedente',
-        'dar provimento', 'nega-se', 'recurso conhecido', 'decide-se', 'não se conhece',
-        'voto de qualidade', 'unânime', 'maioria', 'qualidade', 'acordam os membros',
-        'por unanimidade', 'por maioria', 'votaram', 'conclusões', 'julgamento',
-        'decisão', 'acórdão', 'sentença', 'resultado', 'provimento', 'negação'
-    ]
-    
-    def verificar_vazamento(texto):
-        if pd.isna(texto):
-            return False
-        texto_lower = str(texto).lower()
-        for palavra in palavras_vazamento:
-            if palavra in texto_lower:
-                return True
-        return False
-    
-    # Verificar se ainda há vazamento
-    df_limpo['tem_vazamento'] = df_limpo['texto_ementa'].apply(verificar_vazamento)
+    deteccao = detectar_vazamento(df_limpo['texto_ementa'], PALAVRAS_VERIFICACAO, termos=True,
+                                  n_processos=os.cpu_count() or 1)
+    df_limpo['tem_vazamento'] = deteccao['possivel_vazamento']
     vazamento_restante = df_limpo['tem_vazamento'].sum()
     
     print(f'Registros com vazamento restante: {vazamento_restante}')
@@ -43,7 +33,9 @@ def main():
         print('\nExemplos de vazamento restante:')
         exemplos = df_limpo[df_limpo['tem_vazamento'] == True].head(3)
         for i, row in exemplos.iterrows():
-            print(f'Registro {i}: {str(row["texto_ementa"])[:100]}...')
+            print(f'Registro {i} ({", ".join(deteccao.at[i, "termos_vazamento"])}): {str(row["texto_ementa"])[:100]}...')
+        print('\nTermos restantes (registros):')
+        print(frequencia_termos(deteccao['termos_vazamento']))
     else:
         print('\nDataset limpo sem vazamento detectado!')
     